@@ -3,19 +3,20 @@
 Complete session scraper that replicates the entire browser request sequence
 """
 
-import requests
 import time
 import random
-from bs4 import BeautifulSoup
+from scraper.counties import BASE_URL, DEFAULT_COUNTY, county_url, roster_url, validate_county
+from scraper.pipeline import FetchStage, PageJob, Pipeline, page_pipeline
+from scraper.pipeline.report import print_page_analysis, print_protection_analysis
 
 class CompleteSessionScraper:
-    def __init__(self):
-        self.base_url = "https://publicindex.sccourts.org"
-        self.target_url = "https://publicindex.sccourts.org/dorchester/courtrosters/RosterSelection.aspx"
-        self.session = requests.Session()
+    def __init__(self, county=DEFAULT_COUNTY):
+        self.county = validate_county(county)
+        self.base_url = BASE_URL
+        self.target_url = roster_url(self.county)
         
         # Set up headers to match your browser exactly
-        self.session.headers.update({
+        self.headers = {
             'accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
             'accept-language': 'en-US,en;q=0.9',
             'cache-control': 'max-age=0',
@@ -29,7 +30,12 @@ class CompleteSessionScraper:
             'sec-fetch-user': '?1',
             'upgrade-insecure-requests': '1',
             'user-agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36'
-        })
+        }
+        
+        # run_one() fetches on this thread, so the main, supporting and data
+        # requests share this thread's session and cookies
+        self.pipeline = page_pipeline(headers=self.headers, parser_backend='lxml', analyze_protection=True,
+                                      fetch_workers=1, parse_workers=1)
         
         # ULTRA FRESH cookies from your working session (just updated!)
         self.cookies = {
@@ -53,26 +59,27 @@ class CompleteSessionScraper:
             print("🎯 Making main page request...")
             
             # Set referer
-            self.session.headers['referer'] = 'https://publicindex.sccourts.org/dorchester/courtrosters/'
+            self.headers['referer'] = county_url(self.county)
             
-            response = self.session.get(
-                self.target_url,
-                cookies=self.cookies,
-                timeout=30
-            )
+            job = self.pipeline.run_one(PageJob(self.target_url, cookies=self.cookies))
+            if job.status_code is None:
+                print(f"❌ Main request error: {job.error}")
+                return False
             
-            print(f"📊 Main request status: {response.status_code}")
-            print(f"📏 Response length: {len(response.text)} characters")
+            print(f"📊 Main request status: {job.status_code}")
+            print(f"📏 Response length: {len(job.html)} characters")
             
-            if response.status_code == 200:
-                if 'Incapsula' in response.text or 'incapsula' in response.text.lower():
+            if job.status_code == 200:
+                if job.blocked:
                     print("⚠️ Incapsula protection still detected")
-                    return self.analyze_protection(response.text)
+                    print_protection_analysis(job)
+                    return False
                 else:
                     print("✅ SUCCESS! Main page loaded without protection!")
-                    return self.parse_successful_response(response.text)
+                    print_page_analysis(job)
+                    return True
             else:
-                print(f"❌ HTTP Error: {response.status_code}")
+                print(f"❌ HTTP Error: {job.status_code}")
                 return False
                 
         except Exception as e:
@@ -87,17 +94,21 @@ class CompleteSessionScraper:
             # List of supporting requests from your browser session
             supporting_urls = [
                 'https://publicindex.sccourts.org/inough-rubie-hen-me-And-And-man-Old-time-to-pain',
-                'https://publicindex.sccourts.org/dorchester/SCJDCommonWebFiles/SCJDStyles.css',
+                f'{self.base_url}/{self.county}/SCJDCommonWebFiles/SCJDStyles.css',
                 'https://publicindex.sccourts.org/Dorchester/CourtRosters/WebResource.axd?d=PTKSqrCBeiX26hSQ-4d2HO_FR0ghsGtDiqM1gGXFYzOAeA75EELpyi1ImH-RuErWDJzsQZ3yYQpIoBwVUE0iUXbRnvZaKUBHXmafo-bbh0boTvfs4vPu1HoADhasVYlX8eUPqQ2&t=637581790915555973',
                 'https://publicindex.sccourts.org/Dorchester/CourtRosters/WebResource.axd?d=yHSk03n8qhGuYU3dqttnQ71qTt_0El3n1mxBXim4Y_-Y3mTP08Bvg1wOhE6CNGMfa0pKDFyPqFYCSLv2UBjX7AKLbHI1&t=638568460745067788'
             ]
             
-            for url in supporting_urls:
-                try:
-                    self.session.get(url, cookies=self.cookies, timeout=10)
-                    self.human_delay(0.1, 0.3)
-                except:
-                    pass  # Ignore errors for supporting resources
+            # Load them all at once, like a browser does (errors are ignored):
+            # all in flight on one event loop, or one thread each without httpx
+            cookies = dict(self.pipeline.stage('fetch').session().cookies)
+            cookies.update(self.cookies)
+            resources = FetchStage(headers=self.headers, use_async=True, workers=len(supporting_urls))
+            try:
+                resources.fetch_many(PageJob(url, cookies=cookies, timeout=10) for url in supporting_urls)
+            finally:
+                if resources.async_engine is not None:
+                    resources.async_engine.close()
             
             print("✅ Supporting resources loaded")
             return True
@@ -119,7 +130,7 @@ class CompleteSessionScraper:
                 'content-type': 'text/plain; charset=utf-8',
                 'origin': 'https://publicindex.sccourts.org',
                 'priority': 'u=1, i',
-                'referer': 'https://publicindex.sccourts.org/dorchester/courtrosters/RosterSelection.aspx',
+                'referer': self.target_url,
                 'sec-ch-ua': '"Not;A=Brand";v="99", "Google Chrome";v="139", "Chromium";v="139"',
                 'sec-ch-ua-mobile': '?0',
                 'sec-ch-ua-platform': '"Linux"',
@@ -132,20 +143,25 @@ class CompleteSessionScraper:
             # The data payload from your request
             data_payload = '"3:txBu7lFW+0YvvlglKJUKnA==:23utpAJS7nuioepyk7wdq2t50ro/pLbX04QmHt8XWlG793BH0QLBQp5mKpjLdf/HNKicG2z3EUIETFkYJPEjKtja6ZX+9eGnFZByWOQJf5/Ld/dTQitlgjd+f7tBW9P9jM+RD1sA1jSMaQ7IvD02Tcyqn149anXwpeDhLFHWWUywUzxRLs0ZIHZUY6ASPT1h0NGFu2h167viWYwuWuocsM68xGuxfjAB5n4mE/stRRwLX+vT2m4VvSvPEOmums6ARpLGWLXjvlbxbFwinkMHNTrY1drluV9EgKzYIwATIBLatUKwy9VCRtUerHzwrohHqOaspX3233eEGPyTURLZQpQPiF4F4SG6fDCLrwNlCbvh2asNM5kfP1QNv+5ZFYZHKL6sLTBtwcDC7AEArvtX0oPoVHqXp88VmvTRVrc7jgxRbhBJ5oIC/weMu58e/yAJa5gUL2YtuuEI3kiJY4OabMGvuwoMZO9QjFv//V7ILcxxpXwyZvTh+FlSjqFk8D8lRPFI03sRuJQHnVpleac2nQ==:us8TL1eG570Tm/x2vDeH1VEFK8W5a3XxiDiWkKnmkCc="'
             
-            response = self.session.post(
+            # Only the fetch stage: the response is JSON, not a page
+            fetch = self.pipeline.stage('fetch')
+            response = Pipeline([fetch]).run_one(PageJob(
                 data_url,
+                method='POST',
                 headers=headers,
                 cookies=self.cookies,
                 data=data_payload,
-                timeout=30
-            )
+            ))
+            if response.status_code is None:
+                print(f"⚠️ Data request error: {response.error}")
+                return None
             
             print(f"📊 Data request status: {response.status_code}")
-            print(f"📏 Data response length: {len(response.text)} characters")
+            print(f"📏 Data response length: {len(response.html)} characters")
             
             if response.status_code == 200:
                 print("✅ Data request successful!")
-                return response.text
+                return response.html
             else:
                 print(f"⚠️ Data request failed: {response.status_code}")
                 return None
@@ -154,66 +170,6 @@ class CompleteSessionScraper:
             print(f"⚠️ Data request error: {e}")
             return None
     
-    def analyze_protection(self, html_content):
-        """Analyze protection page"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        print("\n🔍 PROTECTION ANALYSIS:")
-        print("=" * 40)
-        
-        title = soup.title.get_text(strip=True) if soup.title else 'No title'
-        print(f"📄 Page title: {title}")
-        
-        if 'Request unsuccessful' in html_content:
-            print("❌ 'Request unsuccessful' message detected")
-        
-        if 'incident_id' in html_content:
-            print("🆔 Incident ID found in response")
-        
-        return False
-    
-    def parse_successful_response(self, html_content):
-        """Parse successful response"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        print("\n✅ SUCCESSFUL RESPONSE ANALYSIS:")
-        print("=" * 40)
-        
-        # Count elements
-        forms = soup.find_all('form')
-        inputs = soup.find_all('input')
-        links = soup.find_all('a')
-        scripts = soup.find_all('script')
-        tables = soup.find_all('table')
-        
-        print(f"📝 Forms found: {len(forms)}")
-        print(f"🔍 Inputs found: {len(inputs)}")
-        print(f"🔗 Links found: {len(links)}")
-        print(f"📜 Scripts found: {len(scripts)}")
-        print(f"📊 Tables found: {len(tables)}")
-        
-        # Show page title
-        title = soup.title.get_text(strip=True) if soup.title else 'No title'
-        print(f"📄 Page title: {title}")
-        
-        # Look for court data
-        if tables:
-            print(f"\n🏛️ COURT DATA FOUND:")
-            for i, table in enumerate(tables[:3]):  # Show first 3 tables
-                rows = table.find_all('tr')
-                print(f"   Table {i+1}: {len(rows)} rows")
-                if rows:
-                    # Show first row as example
-                    first_row = rows[0].get_text(strip=True)
-                    print(f"   First row: {first_row[:100]}...")
-        
-        # Look for specific court-related content
-        page_text = soup.get_text()
-        if 'court' in page_text.lower() or 'roster' in page_text.lower():
-            print("🏛️ Court-related content detected!")
-        
-        return True
-    
     def run_complete_session(self):
         """Run the complete session sequence"""
         try:
@@ -3,18 +3,17 @@
 Human-like scraper to bypass Incapsula robot detection
 """
 
-import requests
 import time
 import random
-from bs4 import BeautifulSoup
+from scraper.pipeline import PageJob, page_pipeline
+from scraper.pipeline.report import print_page_analysis, print_protection_analysis
 
 class HumanLikeScraper:
     def __init__(self):
         self.target_url = "https://publicindex.sccourts.org/dorchester/courtrosters/RosterSelection.aspx"
-        self.session = requests.Session()
         
         # Human-like headers
-        self.session.headers.update({
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
             'Accept-Language': 'en-US,en;q=0.9',
@@ -27,7 +26,19 @@ class HumanLikeScraper:
             'Sec-Fetch-Site': 'none',
             'Sec-Fetch-User': '?1',
             'Cache-Control': 'max-age=0',
-        })
+        }
+        
+        # run_one() fetches on this thread, so every step shares this
+        # thread's session and cookies
+        self.pipeline = page_pipeline(headers=self.headers, parser_backend='lxml', analyze_protection=True,
+                                      fetch_workers=1, parse_workers=1)
+    
+    def visit(self, url):
+        """Fetch a page like a browser would; raises if the request failed"""
+        job = self.pipeline.run_one(PageJob(url))
+        if job.status_code is None:
+            raise RuntimeError(job.error)
+        return job
     
     def human_delay(self, min_delay=1, max_delay=3):
         """Add human-like delays"""
@@ -40,21 +51,21 @@ class HumanLikeScraper:
             # Step 1: Visit main SC Courts page first
             print("🌐 Step 1: Visiting main SC Courts page...")
             main_url = "https://publicindex.sccourts.org/"
-            response = self.session.get(main_url, timeout=30)
+            response = self.visit(main_url)
             print(f"   Status: {response.status_code}")
             self.human_delay(2, 4)
             
             # Step 2: Visit Dorchester county page
             print("🌐 Step 2: Visiting Dorchester county page...")
             county_url = "https://publicindex.sccourts.org/dorchester/"
-            response = self.session.get(county_url, timeout=30)
+            response = self.visit(county_url)
             print(f"   Status: {response.status_code}")
             self.human_delay(2, 4)
             
             # Step 3: Visit court rosters page
             print("🌐 Step 3: Visiting court rosters page...")
             rosters_url = "https://publicindex.sccourts.org/dorchester/courtrosters/"
-            response = self.session.get(rosters_url, timeout=30)
+            response = self.visit(rosters_url)
             print(f"   Status: {response.status_code}")
             self.human_delay(3, 5)
             
@@ -81,16 +92,18 @@ class HumanLikeScraper:
             print("🎯 Making target request...")
             self.human_delay(2, 4)
             
-            response = self.session.get(self.target_url, timeout=30)
+            response = self.visit(self.target_url)
             print(f"📊 Response status: {response.status_code}")
             
             if response.status_code == 200:
-                if 'Incapsula' in response.text:
+                if response.blocked:
                     print("⚠️ Still getting Incapsula protection")
-                    return self.analyze_protection(response.text)
+                    print_protection_analysis(response)
+                    return False
                 else:
                     print("✅ SUCCESS! No protection detected!")
-                    return self.parse_successful_response(response.text)
+                    print_page_analysis(response)
+                    return True
             else:
                 print(f"❌ HTTP Error: {response.status_code}")
                 return False
@@ -98,61 +111,6 @@ class HumanLikeScraper:
         except Exception as e:
             print(f"❌ Scraping error: {e}")
             return False
-    
-    def analyze_protection(self, html_content):
-        """Analyze the protection page"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        print("\n🔍 PROTECTION ANALYSIS:")
-        print("=" * 40)
-        
-        # Check for specific protection indicators
-        if 'Incapsula' in html_content:
-            print("🛡️ Incapsula protection detected")
-        
-        if 'incident_id' in html_content:
-            print("🆔 Incident ID found in response")
-        
-        if 'iframe' in html_content:
-            print("🖼️ Iframe-based protection detected")
-        
-        # Extract page title
-        title = soup.title.get_text(strip=True) if soup.title else 'No title'
-        print(f"📄 Page title: {title}")
-        
-        # Check for specific text
-        page_text = soup.get_text()
-        if 'Request unsuccessful' in page_text:
-            print("❌ 'Request unsuccessful' message detected")
-        
-        if 'incident ID' in page_text:
-            print("🆔 Incident ID message detected")
-        
-        return False
-    
-    def parse_successful_response(self, html_content):
-        """Parse successful response"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        print("\n✅ SUCCESSFUL RESPONSE ANALYSIS:")
-        print("=" * 40)
-        
-        # Count elements
-        forms = soup.find_all('form')
-        inputs = soup.find_all('input')
-        links = soup.find_all('a')
-        scripts = soup.find_all('script')
-        
-        print(f"📝 Forms found: {len(forms)}")
-        print(f"🔍 Inputs found: {len(inputs)}")
-        print(f"🔗 Links found: {len(links)}")
-        print(f"📜 Scripts found: {len(scripts)}")
-        
-        # Show page title
-        title = soup.title.get_text(strip=True) if soup.title else 'No title'
-        print(f"📄 Page title: {title}")
-        
-        return True
 
 def main():
     print("🤖 HUMAN-LIKE SCRAPER FOR SC COURTS")
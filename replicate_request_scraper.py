@@ -3,17 +3,16 @@
 Replicate the exact working request from browser
 """
 
-import requests
 import time
-from bs4 import BeautifulSoup
+from scraper.pipeline import PageJob, page_pipeline
+from scraper.pipeline.report import print_page_analysis, print_protection_analysis
 
 class ReplicateRequestScraper:
     def __init__(self):
         self.target_url = "https://publicindex.sccourts.org/dorchester/courtrosters/RosterSelection.aspx"
-        self.session = requests.Session()
         
         # Set up the exact headers from your working request
-        self.session.headers.update({
+        self.headers = {
             'accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
             'accept-language': 'en-US,en;q=0.9',
             'cache-control': 'max-age=0',
@@ -28,7 +27,9 @@ class ReplicateRequestScraper:
             'sec-fetch-user': '?1',
             'upgrade-insecure-requests': '1',
             'user-agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36'
-        })
+        }
+        self.pipeline = page_pipeline(headers=self.headers, parser_backend='lxml', analyze_protection=True,
+                                      fetch_workers=1, parse_workers=1)
         
         # Set the exact cookies from your working request (FRESH COOKIES!)
         self.cookies = {
@@ -48,90 +49,31 @@ class ReplicateRequestScraper:
             print(f"🎯 Target URL: {self.target_url}")
             
             # Make the request with exact cookies and headers
-            response = self.session.get(
-                self.target_url, 
-                cookies=self.cookies,
-                timeout=30
-            )
+            job = self.pipeline.run_one(PageJob(self.target_url, cookies=self.cookies))
+            if job.status_code is None:
+                print(f"❌ Request error: {job.error}")
+                return False
             
-            print(f"📊 Response Status: {response.status_code}")
-            print(f"📏 Response Length: {len(response.text)} characters")
+            print(f"📊 Response Status: {job.status_code}")
+            print(f"📏 Response Length: {len(job.html)} characters")
             
-            if response.status_code == 200:
+            if job.status_code == 200:
                 # Check for Incapsula protection
-                if 'Incapsula' in response.text or 'incapsula' in response.text.lower():
+                if job.blocked:
                     print("⚠️ Incapsula protection still detected")
-                    return self.analyze_protection(response.text)
+                    print_protection_analysis(job)
+                    return False
                 else:
                     print("✅ SUCCESS! No protection detected!")
-                    return self.parse_successful_response(response.text)
+                    print_page_analysis(job)
+                    return True
             else:
-                print(f"❌ HTTP Error: {response.status_code}")
+                print(f"❌ HTTP Error: {job.status_code}")
                 return False
                 
         except Exception as e:
             print(f"❌ Request error: {e}")
             return False
-    
-    def analyze_protection(self, html_content):
-        """Analyze protection page"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        print("\n🔍 PROTECTION ANALYSIS:")
-        print("=" * 40)
-        
-        title = soup.title.get_text(strip=True) if soup.title else 'No title'
-        print(f"📄 Page title: {title}")
-        
-        if 'Request unsuccessful' in html_content:
-            print("❌ 'Request unsuccessful' message detected")
-        
-        if 'incident_id' in html_content:
-            print("🆔 Incident ID found in response")
-        
-        return False
-    
-    def parse_successful_response(self, html_content):
-        """Parse successful response"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        print("\n✅ SUCCESSFUL RESPONSE ANALYSIS:")
-        print("=" * 40)
-        
-        # Count elements
-        forms = soup.find_all('form')
-        inputs = soup.find_all('input')
-        links = soup.find_all('a')
-        scripts = soup.find_all('script')
-        tables = soup.find_all('table')
-        
-        print(f"📝 Forms found: {len(forms)}")
-        print(f"🔍 Inputs found: {len(inputs)}")
-        print(f"🔗 Links found: {len(links)}")
-        print(f"📜 Scripts found: {len(scripts)}")
-        print(f"📊 Tables found: {len(tables)}")
-        
-        # Show page title
-        title = soup.title.get_text(strip=True) if soup.title else 'No title'
-        print(f"📄 Page title: {title}")
-        
-        # Look for court data
-        if tables:
-            print(f"\n🏛️ COURT DATA FOUND:")
-            for i, table in enumerate(tables[:3]):  # Show first 3 tables
-                rows = table.find_all('tr')
-                print(f"   Table {i+1}: {len(rows)} rows")
-                if rows:
-                    # Show first row as example
-                    first_row = rows[0].get_text(strip=True)
-                    print(f"   First row: {first_row[:100]}...")
-        
-        # Look for specific court-related content
-        page_text = soup.get_text()
-        if 'court' in page_text.lower() or 'roster' in page_text.lower():
-            print("🏛️ Court-related content detected!")
-        
-        return True
 
 def main():
     print("🎯 REPLICATE REQUEST SCRAPER")
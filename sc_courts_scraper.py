@@ -5,22 +5,24 @@ Scrapes court roster information from publicindex.sccourts.org
 """
 
 import requests
-from bs4 import BeautifulSoup
 import json
 import time
 from urllib.parse import urljoin, urlparse
 import logging
 import random
+from scraper.counties import BASE_URL, DEFAULT_COUNTY, county_url, roster_url, validate_county
+from scraper.pipeline import PageJob, page_pipeline
+from scraper.pipeline.report import page_summary, print_page_summary
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class SCCourtsScraper:
-    def __init__(self, use_proxy=False, proxy_list=None):
-        self.session = requests.Session()
-        self.base_url = "https://publicindex.sccourts.org"
-        self.target_url = "https://publicindex.sccourts.org/dorchester/courtrosters/RosterSelection.aspx"
+    def __init__(self, use_proxy=False, proxy_list=None, county=DEFAULT_COUNTY):
+        self.county = validate_county(county)
+        self.base_url = BASE_URL
+        self.target_url = roster_url(self.county)
         self.use_proxy = use_proxy
         self.proxy_list = proxy_list or []
         
@@ -40,12 +42,15 @@ class SCCourtsScraper:
             'Sec-Fetch-User': '?1',
             'Upgrade-Insecure-Requests': '1',
             'Priority': 'u=0, i',
-            'Referer': 'https://publicindex.sccourts.org/dorchester/courtrosters/',
+            'Referer': county_url(self.county),
             'DNT': '1',
             'Connection': 'keep-alive'
         }
         
-        self.session.headers.update(self.headers)
+        # One fetch worker: run_one() fetches on this thread, so every
+        # request shares this thread's session and cookies
+        self.pipeline = page_pipeline(headers=self.headers, parser_backend='lxml', analyze_protection=True,
+                                      fetch_workers=1, parse_workers=1)
         
         # Add some delay to be more respectful
         self.delay = 2
@@ -88,23 +93,20 @@ class SCCourtsScraper:
             logger.warning(f"Proxy test failed: {e}")
         return False
     
-    def make_request_with_proxy(self, url, proxy=None):
+    def make_request_with_proxy(self, url, proxy=None, headers=None):
         """
-        Make a request with optional proxy
+        Run url through the pipeline with optional proxy; None if the fetch failed
         """
-        try:
-            if proxy:
-                logger.info(f"Using proxy: {proxy}")
-                response = self.session.get(url, proxies=proxy, timeout=30)
-            else:
-                response = self.session.get(url, timeout=30)
-            
-            logger.info(f"Response status: {response.status_code}")
-            return response
-        except Exception as e:
-            logger.error(f"Request failed: {e}")
+        if proxy:
+            logger.info(f"Using proxy: {proxy}")
+        job = self.pipeline.run_one(PageJob(url, headers=headers, proxies=proxy))
+        if job.status_code is None:
+            logger.error(f"Request failed: {job.error}")
             return None
         
+        logger.info(f"Response status: {job.status_code}")
+        return job
+        
     def make_initial_request(self):
         """
         Make the initial request to RosterSelection.aspx
@@ -121,7 +123,7 @@ class SCCourtsScraper:
                 
                 # First, try to access the main court roster page to establish session
                 logger.info("First, accessing the main court roster page...")
-                main_url = "https://publicindex.sccourts.org/dorchester/courtrosters/"
+                main_url = county_url(self.county)
                 main_response = self.make_request_with_proxy(main_url, proxy)
                 
                 if main_response:
@@ -139,7 +141,7 @@ class SCCourtsScraper:
                     
                     if response:
                         logger.info(f"Response status: {response.status_code}")
-                        logger.info(f"Response headers: {dict(response.headers)}")
+                        logger.info(f"Response headers: {response.response_headers}")
                         
                         if response.status_code == 200:
                             logger.info("Successfully retrieved the page")
@@ -168,60 +170,27 @@ class SCCourtsScraper:
     
     def parse_response(self, response):
         """
-        Parse the HTML response and extract useful information
+        Summarize the parsed page
         """
         if not response:
             return None
-            
-        soup = BeautifulSoup(response.text, 'html.parser')
         
-        # Extract page title
-        title = soup.find('title')
-        title_text = title.get_text().strip() if title else "No title found"
-        logger.info(f"Page title: {title_text}")
+        # The parse stage skips blocked pages, but their summary is still useful
+        parsed = response.parsed or self.pipeline.stage('parse').parser.parse(response.html)
+        summary = page_summary(parsed)
         
-        # Look for forms (ASP.NET pages often have forms)
-        forms = soup.find_all('form')
-        logger.info(f"Found {len(forms)} form(s) on the page")
-        
-        # Look for input fields
-        inputs = soup.find_all('input')
-        logger.info(f"Found {len(inputs)} input field(s)")
-        
-        # Look for select dropdowns
-        selects = soup.find_all('select')
-        logger.info(f"Found {len(selects)} select dropdown(s)")
-        
-        # Look for links
-        links = soup.find_all('a', href=True)
-        logger.info(f"Found {len(links)} link(s)")
-        
-        # Extract any JavaScript that might be relevant
-        scripts = soup.find_all('script')
-        logger.info(f"Found {len(scripts)} script tag(s)")
-        
-        # Look for specific ASP.NET elements
-        viewstate = soup.find('input', {'name': '__VIEWSTATE'})
-        if viewstate:
+        logger.info(f"Page title: {summary['title']}")
+        logger.info(f"Found {summary['forms_count']} form(s) on the page")
+        logger.info(f"Found {summary['inputs_count']} input field(s)")
+        logger.info(f"Found {summary['selects_count']} select dropdown(s)")
+        logger.info(f"Found {summary['links_count']} link(s)")
+        logger.info(f"Found {summary['scripts_count']} script tag(s)")
+        if summary['has_viewstate']:
             logger.info("Found __VIEWSTATE field")
-        
-        event_validation = soup.find('input', {'name': '__EVENTVALIDATION'})
-        if event_validation:
+        if summary['has_event_validation']:
             logger.info("Found __EVENTVALIDATION field")
         
-        return {
-            'title': title_text,
-            'forms_count': len(forms),
-            'inputs_count': len(inputs),
-            'selects_count': len(selects),
-            'links_count': len(links),
-            'scripts_count': len(scripts),
-            'has_viewstate': viewstate is not None,
-            'has_event_validation': event_validation is not None,
-            'forms': [{'action': form.get('action'), 'method': form.get('method')} for form in forms],
-            'inputs': [{'name': inp.get('name'), 'type': inp.get('type'), 'value': inp.get('value')} for inp in inputs],
-            'selects': [{'name': sel.get('name'), 'options': [opt.get('value') for opt in sel.find_all('option')]} for sel in selects]
-        }
+        return summary
     
     def save_response(self, response, filename="response.html"):
         """
@@ -229,7 +198,7 @@ class SCCourtsScraper:
         """
         if response:
             with open(filename, 'w', encoding='utf-8') as f:
-                f.write(response.text)
+                f.write(response.html)
             logger.info(f"Response saved to {filename}")
     
     def try_alternative_approach(self):
@@ -247,28 +216,29 @@ class SCCourtsScraper:
         
         for i, ua in enumerate(user_agents):
             logger.info(f"Trying user agent {i+1}: {ua[:50]}...")
-            self.session.headers.update({'User-Agent': ua})
+            headers = {'User-Agent': ua}
             
             # Try accessing the base URL first
-            try:
-                base_response = self.session.get(self.base_url)
-                logger.info(f"Base URL response: {base_response.status_code}")
-                time.sleep(2)
-                
-                # Now try the target
-                response = self.session.get(self.target_url)
-                logger.info(f"Alternative approach response: {response.status_code}")
-                
-                if response.status_code == 200:
-                    return response
-                else:
-                    self.save_response(response, f"alternative_response_ua{i+1}.html")
-                    if response.status_code != 403:  # If it's not 403, this might be progress
-                        return response
-                    
-            except Exception as e:
-                logger.error(f"Alternative approach {i+1} failed: {e}")
+            base_response = self.make_request_with_proxy(self.base_url, headers=headers)
+            if not base_response:
+                logger.error(f"Alternative approach {i+1} failed")
+                continue
+            logger.info(f"Base URL response: {base_response.status_code}")
+            time.sleep(2)
+            
+            # Now try the target
+            response = self.make_request_with_proxy(self.target_url, headers=headers)
+            if not response:
+                logger.error(f"Alternative approach {i+1} failed")
                 continue
+            logger.info(f"Alternative approach response: {response.status_code}")
+            
+            if response.status_code == 200:
+                return response
+            else:
+                self.save_response(response, f"alternative_response_ua{i+1}.html")
+                if response.status_code != 403:  # If it's not 403, this might be progress
+                    return response
         
         return None
 
@@ -295,34 +265,7 @@ class SCCourtsScraper:
             
             # Print summary
             if parsed_data:
-                print("\n" + "="*50)
-                print("SCRAPING SUMMARY")
-                print("="*50)
-                print(f"Page Title: {parsed_data['title']}")
-                print(f"Forms Found: {parsed_data['forms_count']}")
-                print(f"Input Fields: {parsed_data['inputs_count']}")
-                print(f"Select Dropdowns: {parsed_data['selects_count']}")
-                print(f"Links: {parsed_data['links_count']}")
-                print(f"Scripts: {parsed_data['scripts_count']}")
-                print(f"Has ViewState: {parsed_data['has_viewstate']}")
-                print(f"Has EventValidation: {parsed_data['has_event_validation']}")
-                
-                if parsed_data['forms']:
-                    print("\nForms:")
-                    for i, form in enumerate(parsed_data['forms']):
-                        print(f"  Form {i+1}: Action={form['action']}, Method={form['method']}")
-                
-                if parsed_data['inputs']:
-                    print("\nInput Fields:")
-                    for inp in parsed_data['inputs'][:10]:  # Show first 10
-                        print(f"  Name: {inp['name']}, Type: {inp['type']}, Value: {inp['value']}")
-                    if len(parsed_data['inputs']) > 10:
-                        print(f"  ... and {len(parsed_data['inputs']) - 10} more")
-                
-                if parsed_data['selects']:
-                    print("\nSelect Dropdowns:")
-                    for sel in parsed_data['selects']:
-                        print(f"  Name: {sel['name']}, Options: {sel['options']}")
+                print_page_summary(parsed_data)
             
             return parsed_data
         else:
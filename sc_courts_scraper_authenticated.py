@@ -4,12 +4,13 @@ South Carolina Courts Scraper with Authenticated Proxy Support
 """
 
 import requests
-from bs4 import BeautifulSoup
 import json
 import time
 from urllib.parse import urljoin, urlparse
 import logging
 import random
+from scraper.pipeline import PageJob, page_pipeline
+from scraper.pipeline.report import page_summary, print_page_summary
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -17,7 +18,6 @@ logger = logging.getLogger(__name__)
 
 class SCCourtsScraperAuthenticated:
     def __init__(self, proxy_list=None):
-        self.session = requests.Session()
         self.base_url = "https://publicindex.sccourts.org"
         self.target_url = "https://publicindex.sccourts.org/dorchester/courtrosters/RosterSelection.aspx"
         self.proxy_list = proxy_list or []
@@ -43,7 +43,10 @@ class SCCourtsScraperAuthenticated:
             'Connection': 'keep-alive'
         }
         
-        self.session.headers.update(self.headers)
+        # One fetch worker: run_one() fetches on this thread, so every
+        # request shares this thread's session and cookies
+        self.pipeline = page_pipeline(headers=self.headers, parser_backend='lxml', analyze_protection=True,
+                                      fetch_workers=1, parse_workers=1)
         self.delay = 2
     
     def load_authenticated_proxies(self):
@@ -97,18 +100,15 @@ class SCCourtsScraperAuthenticated:
         """
         Make a request with optional authenticated proxy
         """
-        try:
-            if proxy:
-                logger.info(f"Using authenticated proxy: {proxy['http'][:50]}...")
-                response = self.session.get(url, proxies=proxy, timeout=30)
-            else:
-                response = self.session.get(url, timeout=30)
-            
-            logger.info(f"Response status: {response.status_code}")
-            return response
-        except Exception as e:
-            logger.error(f"Request failed: {e}")
+        if proxy:
+            logger.info(f"Using authenticated proxy: {proxy['http'][:50]}...")
+        job = self.pipeline.run_one(PageJob(url, proxies=proxy))
+        if job.status_code is None:
+            logger.error(f"Request failed: {job.error}")
             return None
+        
+        logger.info(f"Response status: {job.status_code}")
+        return job
     
     def make_initial_request(self):
         """
@@ -145,7 +145,7 @@ class SCCourtsScraperAuthenticated:
                 
                 if response:
                     logger.info(f"Response status: {response.status_code}")
-                    logger.info(f"Response headers: {dict(response.headers)}")
+                    logger.info(f"Response headers: {response.response_headers}")
                     
                     if response.status_code == 200:
                         logger.info("Successfully retrieved the page with authenticated proxy!")
@@ -165,60 +165,27 @@ class SCCourtsScraperAuthenticated:
     
     def parse_response(self, response):
         """
-        Parse the HTML response and extract useful information
+        Summarize the parsed page
         """
         if not response:
             return None
-            
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Extract page title
-        title = soup.find('title')
-        title_text = title.get_text().strip() if title else "No title found"
-        logger.info(f"Page title: {title_text}")
-        
-        # Look for forms (ASP.NET pages often have forms)
-        forms = soup.find_all('form')
-        logger.info(f"Found {len(forms)} form(s) on the page")
-        
-        # Look for input fields
-        inputs = soup.find_all('input')
-        logger.info(f"Found {len(inputs)} input field(s)")
         
-        # Look for select dropdowns
-        selects = soup.find_all('select')
-        logger.info(f"Found {len(selects)} select dropdown(s)")
-        
-        # Look for links
-        links = soup.find_all('a', href=True)
-        logger.info(f"Found {len(links)} link(s)")
-        
-        # Extract any JavaScript that might be relevant
-        scripts = soup.find_all('script')
-        logger.info(f"Found {len(scripts)} script tag(s)")
-        
-        # Look for specific ASP.NET elements
-        viewstate = soup.find('input', {'name': '__VIEWSTATE'})
-        if viewstate:
+        # The parse stage skips blocked pages, but their summary is still useful
+        parsed = response.parsed or self.pipeline.stage('parse').parser.parse(response.html)
+        summary = page_summary(parsed)
+        
+        logger.info(f"Page title: {summary['title']}")
+        logger.info(f"Found {summary['forms_count']} form(s) on the page")
+        logger.info(f"Found {summary['inputs_count']} input field(s)")
+        logger.info(f"Found {summary['selects_count']} select dropdown(s)")
+        logger.info(f"Found {summary['links_count']} link(s)")
+        logger.info(f"Found {summary['scripts_count']} script tag(s)")
+        if summary['has_viewstate']:
             logger.info("Found __VIEWSTATE field")
-        
-        event_validation = soup.find('input', {'name': '__EVENTVALIDATION'})
-        if event_validation:
+        if summary['has_event_validation']:
             logger.info("Found __EVENTVALIDATION field")
         
-        return {
-            'title': title_text,
-            'forms_count': len(forms),
-            'inputs_count': len(inputs),
-            'selects_count': len(selects),
-            'links_count': len(links),
-            'scripts_count': len(scripts),
-            'has_viewstate': viewstate is not None,
-            'has_event_validation': event_validation is not None,
-            'forms': [{'action': form.get('action'), 'method': form.get('method')} for form in forms],
-            'inputs': [{'name': inp.get('name'), 'type': inp.get('type'), 'value': inp.get('value')} for inp in inputs],
-            'selects': [{'name': sel.get('name'), 'options': [opt.get('value') for opt in sel.find_all('option')]} for sel in selects]
-        }
+        return summary
     
     def save_response(self, response, filename="response.html"):
         """
@@ -226,7 +193,7 @@ class SCCourtsScraperAuthenticated:
         """
         if response:
             with open(filename, 'w', encoding='utf-8') as f:
-                f.write(response.text)
+                f.write(response.html)
             logger.info(f"Response saved to {filename}")
     
     def run(self):
@@ -247,34 +214,7 @@ class SCCourtsScraperAuthenticated:
             
             # Print summary
             if parsed_data:
-                print("\n" + "="*50)
-                print("SCRAPING SUMMARY")
-                print("="*50)
-                print(f"Page Title: {parsed_data['title']}")
-                print(f"Forms Found: {parsed_data['forms_count']}")
-                print(f"Input Fields: {parsed_data['inputs_count']}")
-                print(f"Select Dropdowns: {parsed_data['selects_count']}")
-                print(f"Links: {parsed_data['links_count']}")
-                print(f"Scripts: {parsed_data['scripts_count']}")
-                print(f"Has ViewState: {parsed_data['has_viewstate']}")
-                print(f"Has EventValidation: {parsed_data['has_event_validation']}")
-                
-                if parsed_data['forms']:
-                    print("\nForms:")
-                    for i, form in enumerate(parsed_data['forms']):
-                        print(f"  Form {i+1}: Action={form['action']}, Method={form['method']}")
-                
-                if parsed_data['inputs']:
-                    print("\nInput Fields:")
-                    for inp in parsed_data['inputs'][:10]:  # Show first 10
-                        print(f"  Name: {inp['name']}, Type: {inp['type']}, Value: {inp['value']}")
-                    if len(parsed_data['inputs']) > 10:
-                        print(f"  ... and {len(parsed_data['inputs']) - 10} more")
-                
-                if parsed_data['selects']:
-                    print("\nSelect Dropdowns:")
-                    for sel in parsed_data['selects']:
-                        print(f"  Name: {sel['name']}, Options: {sel['options']}")
+                print_page_summary(parsed_data)
             
             return parsed_data
         else:
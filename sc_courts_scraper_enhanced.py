@@ -3,24 +3,26 @@
 Enhanced SC Courts Scraper to handle Incapsula protection
 """
 
-import requests
-from bs4 import BeautifulSoup
 import json
 import time
 from urllib.parse import urljoin, urlparse
 import logging
 import random
 import re
+from scraper.counties import BASE_URL, DEFAULT_COUNTY, county_url, roster_url, validate_county
+from scraper.pipeline import PageJob, page_pipeline
+from scraper.pipeline.report import page_summary, print_page_summary
+from scraper.retry import RetryPolicy
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class SCCourtsScraperEnhanced:
-    def __init__(self):
-        self.session = requests.Session()
-        self.base_url = "https://publicindex.sccourts.org"
-        self.target_url = "https://publicindex.sccourts.org/dorchester/courtrosters/RosterSelection.aspx"
+    def __init__(self, county=DEFAULT_COUNTY):
+        self.county = validate_county(county)
+        self.base_url = BASE_URL
+        self.target_url = roster_url(self.county)
         
         # Enhanced headers to bypass protection
         self.headers = {
@@ -38,75 +40,69 @@ class SCCourtsScraperEnhanced:
             'Sec-Fetch-User': '?1',
             'Upgrade-Insecure-Requests': '1',
             'Priority': 'u=0, i',
-            'Referer': 'https://publicindex.sccourts.org/dorchester/courtrosters/',
+            'Referer': county_url(self.county),
             'DNT': '1',
             'Connection': 'keep-alive'
         }
         
-        self.session.headers.update(self.headers)
         self.delay = 3  # Increased delay
+        
+        # One fetch worker: run_one() fetches on this thread, so every
+        # request shares this thread's session and cookies
+        self.pipeline = page_pipeline(headers=self.headers, parser_backend='lxml', analyze_protection=True,
+                                      fetch_workers=1, parse_workers=1,
+                                      retry_policy=RetryPolicy(max_attempts=3, backoff=self.delay, deadline=60))
+        self.parser = self.pipeline.stage('parse').parser
     
     def handle_incapsula_protection(self, response):
         """
         Handle Incapsula protection page
         """
-        if 'Incapsula' in response.text or 'SWJIYLWA' in response.text:
+        if 'Incapsula' in response.html or 'SWJIYLWA' in response.html:
             logger.info("Detected Incapsula protection page")
             
             # Try to extract and execute the protection script
-            soup = BeautifulSoup(response.text, 'html.parser')
-            script_tag = soup.find('script', src=re.compile(r'_Incapsula_Resource'))
+            script_url = next((script['src'] for script in self.parser.parse(response.html)['scripts']
+                               if re.search(r'_Incapsula_Resource', script['src'])), None)
             
-            if script_tag:
-                script_url = script_tag.get('src')
-                if script_url:
-                    full_script_url = urljoin(self.base_url, script_url)
-                    logger.info(f"Found Incapsula script: {full_script_url}")
-                    
-                    # Try to fetch the script
-                    try:
-                        script_response = self.session.get(full_script_url)
-                        if script_response.status_code == 200:
-                            logger.info("Successfully fetched Incapsula script")
-                            # Wait a bit for the script to execute
-                            time.sleep(5)
-                            return True
-                    except Exception as e:
-                        logger.warning(f"Failed to fetch Incapsula script: {e}")
+            if script_url:
+                full_script_url = urljoin(self.base_url, script_url)
+                logger.info(f"Found Incapsula script: {full_script_url}")
+                
+                # Try to fetch the script
+                script_response = self.pipeline.run_one(PageJob(full_script_url))
+                if script_response.status_code == 200:
+                    logger.info("Successfully fetched Incapsula script")
+                    # Wait a bit for the script to execute
+                    time.sleep(5)
+                    return True
+                logger.warning(f"Failed to fetch Incapsula script: {script_response.error}")
             
             return False
         return True
     
-    def make_request_with_retry(self, url, max_retries=3):
+    def make_request_with_retry(self, url):
         """
-        Make request with retry logic for Incapsula protection
+        Fetch url (the retry policy covers dropped connections, timeouts,
+        429 and 5xx) and handle an Incapsula page if we get one
         """
-        for attempt in range(max_retries):
-            logger.info(f"Attempt {attempt + 1}/{max_retries} for {url}")
-            
-            try:
-                response = self.session.get(url, timeout=30)
-                logger.info(f"Response status: {response.status_code}")
-                
-                if response.status_code == 200:
-                    # Check if we got the actual content or protection page
-                    if self.handle_incapsula_protection(response):
-                        logger.info("Successfully bypassed protection")
-                        return response
-                    else:
-                        logger.warning(f"Still getting protection page on attempt {attempt + 1}")
-                        if attempt < max_retries - 1:
-                            time.sleep(self.delay * (attempt + 1))  # Increasing delay
-                            continue
-                else:
-                    logger.warning(f"Unexpected status code: {response.status_code}")
-                    
-            except Exception as e:
-                logger.error(f"Request failed on attempt {attempt + 1}: {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(self.delay)
+        response = self.pipeline.run_one(PageJob(url))
+        if response.status_code is None:
+            logger.error(f"Request failed after {response.attempts} attempt(s): {response.error}")
+            return None
+        
+        logger.info(f"Response status: {response.status_code} after {response.attempts} attempt(s)")
+        if response.status_code != 200:
+            logger.warning(f"Unexpected status code: {response.status_code}")
+            return None
         
-        logger.error("All attempts failed")
+        # Check if we got the actual content or protection page. Fetching the
+        # same page again right away won't get past it, so this isn't retried
+        if self.handle_incapsula_protection(response):
+            logger.info("Successfully bypassed protection")
+            return response
+        
+        logger.error("Still getting protection page")
         return None
     
     def make_initial_request(self):
@@ -116,7 +112,7 @@ class SCCourtsScraperEnhanced:
         try:
             # First, try to access the main court roster page
             logger.info("Accessing main court roster page...")
-            main_url = "https://publicindex.sccourts.org/dorchester/courtrosters/"
+            main_url = county_url(self.county)
             main_response = self.make_request_with_retry(main_url)
             
             if main_response and main_response.status_code == 200:
@@ -143,20 +139,13 @@ class SCCourtsScraperEnhanced:
     
     def parse_response(self, response):
         """
-        Parse the HTML response and extract useful information
+        Summarize the parsed page
         """
         if not response:
             return None
-            
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Extract page title
-        title = soup.find('title')
-        title_text = title.get_text().strip() if title else "No title found"
-        logger.info(f"Page title: {title_text}")
         
         # Check if we're still on protection page
-        if 'Incapsula' in response.text or 'SWJIYLWA' in response.text:
+        if 'Incapsula' in response.html or 'SWJIYLWA' in response.html:
             logger.warning("Still on Incapsula protection page")
             return {
                 'title': 'Incapsula Protection Page',
@@ -170,49 +159,21 @@ class SCCourtsScraperEnhanced:
                 'protection_detected': True
             }
         
-        # Look for forms (ASP.NET pages often have forms)
-        forms = soup.find_all('form')
-        logger.info(f"Found {len(forms)} form(s) on the page")
-        
-        # Look for input fields
-        inputs = soup.find_all('input')
-        logger.info(f"Found {len(inputs)} input field(s)")
-        
-        # Look for select dropdowns
-        selects = soup.find_all('select')
-        logger.info(f"Found {len(selects)} select dropdown(s)")
-        
-        # Look for links
-        links = soup.find_all('a', href=True)
-        logger.info(f"Found {len(links)} link(s)")
-        
-        # Extract any JavaScript that might be relevant
-        scripts = soup.find_all('script')
-        logger.info(f"Found {len(scripts)} script tag(s)")
+        summary = page_summary(response.parsed or self.parser.parse(response.html))
+        summary['protection_detected'] = False
         
-        # Look for specific ASP.NET elements
-        viewstate = soup.find('input', {'name': '__VIEWSTATE'})
-        if viewstate:
+        logger.info(f"Page title: {summary['title']}")
+        logger.info(f"Found {summary['forms_count']} form(s) on the page")
+        logger.info(f"Found {summary['inputs_count']} input field(s)")
+        logger.info(f"Found {summary['selects_count']} select dropdown(s)")
+        logger.info(f"Found {summary['links_count']} link(s)")
+        logger.info(f"Found {summary['scripts_count']} script tag(s)")
+        if summary['has_viewstate']:
             logger.info("Found __VIEWSTATE field")
-        
-        event_validation = soup.find('input', {'name': '__EVENTVALIDATION'})
-        if event_validation:
+        if summary['has_event_validation']:
             logger.info("Found __EVENTVALIDATION field")
         
-        return {
-            'title': title_text,
-            'forms_count': len(forms),
-            'inputs_count': len(inputs),
-            'selects_count': len(selects),
-            'links_count': len(links),
-            'scripts_count': len(scripts),
-            'has_viewstate': viewstate is not None,
-            'has_event_validation': event_validation is not None,
-            'protection_detected': False,
-            'forms': [{'action': form.get('action'), 'method': form.get('method')} for form in forms],
-            'inputs': [{'name': inp.get('name'), 'type': inp.get('type'), 'value': inp.get('value')} for inp in inputs],
-            'selects': [{'name': sel.get('name'), 'options': [opt.get('value') for opt in sel.find_all('option')]} for sel in selects]
-        }
+        return summary
     
     def save_response(self, response, filename="response_enhanced.html"):
         """
@@ -220,7 +181,7 @@ class SCCourtsScraperEnhanced:
         """
         if response:
             with open(filename, 'w', encoding='utf-8') as f:
-                f.write(response.text)
+                f.write(response.html)
             logger.info(f"Response saved to {filename}")
     
     def run(self):
@@ -241,17 +202,7 @@ class SCCourtsScraperEnhanced:
             
             # Print summary
             if parsed_data:
-                print("\n" + "="*50)
-                print("ENHANCED SCRAPING SUMMARY")
-                print("="*50)
-                print(f"Page Title: {parsed_data['title']}")
-                print(f"Forms Found: {parsed_data['forms_count']}")
-                print(f"Input Fields: {parsed_data['inputs_count']}")
-                print(f"Select Dropdowns: {parsed_data['selects_count']}")
-                print(f"Links: {parsed_data['links_count']}")
-                print(f"Scripts: {parsed_data['scripts_count']}")
-                print(f"Has ViewState: {parsed_data['has_viewstate']}")
-                print(f"Has EventValidation: {parsed_data['has_event_validation']}")
+                print_page_summary(parsed_data, heading="ENHANCED SCRAPING SUMMARY")
                 
                 if parsed_data.get('protection_detected'):
                     print("\n⚠️ PROTECTION DETECTED:")
@@ -264,23 +215,6 @@ class SCCourtsScraperEnhanced:
                     print("4. Wait and try again later")
                 else:
                     print("\n✅ SUCCESS! Real content retrieved!")
-                
-                if parsed_data.get('forms'):
-                    print("\nForms:")
-                    for i, form in enumerate(parsed_data['forms']):
-                        print(f"  Form {i+1}: Action={form['action']}, Method={form['method']}")
-                
-                if parsed_data.get('inputs'):
-                    print("\nInput Fields:")
-                    for inp in parsed_data['inputs'][:10]:  # Show first 10
-                        print(f"  Name: {inp['name']}, Type: {inp['type']}, Value: {inp['value']}")
-                    if len(parsed_data['inputs']) > 10:
-                        print(f"  ... and {len(parsed_data['inputs']) - 10} more")
-                
-                if parsed_data.get('selects'):
-                    print("\nSelect Dropdowns:")
-                    for sel in parsed_data['selects']:
-                        print(f"  Name: {sel['name']}, Options: {sel['options']}")
             
             return parsed_data
         else:
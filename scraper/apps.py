@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class ScraperConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'scraper'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_delete
+        from .db import configure_sqlite
+        from .models import ScrapingSession, release_html_blob, release_session_stats
+
+        connection_created.connect(configure_sqlite, dispatch_uid='scraper.configure_sqlite')
+        post_delete.connect(release_html_blob, sender=ScrapingSession, dispatch_uid='scraper.release_html_blob')
+        post_delete.connect(release_session_stats, sender=ScrapingSession,
+                            dispatch_uid='scraper.release_session_stats')
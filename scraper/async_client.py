@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+asyncio HTTP engine for the scrapers (httpx)
+
+AsyncHttpEngine runs one event loop on a background thread for the life
+of the process, with long-lived httpx clients on it: one for direct
+requests and one per proxy configuration. Callers on other threads
+spawn() coroutines on the loop and get a concurrent.futures.Future back,
+so one thread can keep many fetches in flight (see FetchStage.submit),
+all sharing one loop and one keep-alive connection pool instead of paying
+for a new loop, client and handshake per page.
+
+The clients keep no cookie jar; cookies are sent per request, so jobs
+never see each other's cookies. httpx is optional: when it is missing
+is_available() is False and callers keep using requests. No Django
+dependency, so the standalone scripts can use it too.
+"""
+
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - httpx is optional
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+
+def is_available():
+    return httpx is not None
+
+
+def proxy_key(proxies):
+    """Hashable form of a requests-style proxies dict ({'http': url, 'https': url})"""
+    return tuple(sorted((proxies or {}).items()))
+
+
+def cookie_header(cookies):
+    return '; '.join(f'{name}={value}' for name, value in cookies.items())
+
+
+class AsyncHttpEngine:
+    """Long-lived event loop thread and httpx clients shared by every fetch
+
+    `max_connections` caps connections per client, `max_keepalive` how
+    many idle ones it keeps, for up to `keepalive_expiry` seconds. At most
+    `max_proxy_clients` proxy clients stay open; the least recently used
+    one is closed to make room.
+    """
+
+    def __init__(self, max_connections=100, max_keepalive=10, keepalive_expiry=60, max_proxy_clients=8):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.max_proxy_clients = max_proxy_clients
+        self.loop = None
+        self.thread = None
+        self.lock = threading.Lock()
+        # proxy key -> httpx.AsyncClient; only touched on the loop thread
+        self.clients = OrderedDict()
+
+    def ensure_loop(self):
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self.thread = threading.Thread(target=self.loop.run_forever, name='async-http', daemon=True)
+                self.thread.start()
+            return self.loop
+
+    def new_client(self, proxies):
+        mounts = {
+            f'{scheme}://': httpx.AsyncHTTPTransport(proxy=url, limits=self.limits)
+            for scheme, url in (proxies or {}).items()
+        }
+        return httpx.AsyncClient(
+            limits=self.limits,
+            mounts=mounts or None,
+            follow_redirects=True,
+            # Refuse every cookie, so responses can't leak into other jobs
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+        )
+
+    def client(self, proxies=None):
+        key = proxy_key(proxies)
+        client = self.clients.get(key)
+        if client is None:
+            client = self.clients[key] = self.new_client(proxies)
+            proxied = [other for other in self.clients if other]
+            if len(proxied) > self.max_proxy_clients:
+                self.loop.create_task(self.clients.pop(proxied[0]).aclose())
+        self.clients.move_to_end(key)
+        return client
+
+    async def arequest(self, method, url, data=None, headers=None, cookies=None, proxies=None, timeout=None):
+        headers = dict(headers or {})
+        if cookies:
+            headers['Cookie'] = cookie_header(cookies)
+        return await self.client(proxies).request(method, url, data=data, headers=headers, timeout=timeout)
+
+    def spawn(self, coroutine):
+        """Run a coroutine on the loop from any other thread; returns a concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.ensure_loop())
+
+    def close(self):
+        with self.lock:
+            loop, self.loop = self.loop, None
+        if loop is None:
+            return
+
+        async def close_clients():
+            clients = list(self.clients.values())
+            self.clients.clear()
+            for client in clients:
+                await client.aclose()
+
+        asyncio.run_coroutine_threadsafe(close_clients(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        self.thread.join()
+        loop.close()
+
+
+_async_engine = None
+_async_engine_lock = threading.Lock()
+
+
+def get_async_engine():
+    """Process-wide engine sized from the HTTP pool settings (None without httpx)"""
+    global _async_engine
+    from django.conf import settings
+
+    if httpx is None:
+        return None
+    with _async_engine_lock:
+        if _async_engine is None:
+            maxsize = getattr(settings, 'SCRAPER_HTTP_POOL_MAXSIZE', 10)
+            _async_engine = AsyncHttpEngine(
+                max_connections=getattr(settings, 'SCRAPER_HTTP_POOL_HOSTS', 10) * maxsize,
+                max_keepalive=maxsize,
+                keepalive_expiry=getattr(settings, 'SCRAPER_HTTP_POOL_IDLE_TIMEOUT', 60),
+            )
+        return _async_engine
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Content addressing and compression for stored HTML pages
+
+Pages are keyed by the SHA-256 of their text, so a page that comes back
+unchanged is stored once no matter how many sessions saw it. Bodies are
+zstd-compressed when the zstandard package is installed and gzip-compressed
+otherwise; the codec is stored with each blob so both can be read back.
+Both formats are streams, so the start of a page can be recovered from the
+start of its compressed bytes (decompress_prefix). No Django dependency.
+"""
+
+import zlib
+import gzip
+import codecs
+import hashlib
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard is optional
+    zstandard = None
+
+CODEC_GZIP = 'gzip'
+CODEC_ZSTD = 'zstd'
+
+
+def default_codec():
+    return CODEC_ZSTD if zstandard is not None else CODEC_GZIP
+
+
+def content_digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def compress(text, codec=None):
+    """Return (codec, compressed bytes) for a page"""
+    codec = codec or default_codec()
+    data = text.encode('utf-8')
+    if codec == CODEC_ZSTD:
+        return codec, zstandard.ZstdCompressor(level=10).compress(data)
+    if codec == CODEC_GZIP:
+        # mtime=0 keeps the output deterministic for identical pages
+        return codec, gzip.compress(data, compresslevel=6, mtime=0)
+    raise ValueError(f"Unknown blob codec: {codec}")
+
+
+def decompress(codec, data):
+    data = bytes(data)
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed blobs")
+        return zstandard.ZstdDecompressor().decompress(data).decode('utf-8')
+    if codec == CODEC_GZIP:
+        return gzip.decompress(data).decode('utf-8')
+    raise ValueError(f"Unknown blob codec: {codec}")
+
+
+def decompress_prefix(codec, data, max_chars):
+    """Up to max_chars characters from the start of a page, given a prefix of its compressed bytes
+
+    Returns (text, complete): complete is False when the bytes ran out
+    before max_chars characters were decoded.
+    """
+    data = bytes(data)
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed blobs")
+        decompressor = zstandard.ZstdDecompressor().decompressobj()
+    elif codec == CODEC_GZIP:
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    else:
+        raise ValueError(f"Unknown blob codec: {codec}")
+
+    # A truncated stream may end mid-character; the incremental decoder holds it back
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    text = decoder.decode(decompressor.decompress(data))
+    return text[:max_chars], len(text) >= max_chars
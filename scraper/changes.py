@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Change feed over RecordChange events
+
+Consumers read the feed oldest first and keep the cursor from the last
+page; the next request returns only what happened since. A page always
+carries a cursor (the position it ended at, or the one it was given when
+nothing is new), so polling an idle feed costs one indexed range query.
+"""
+
+import json
+import base64
+from datetime import datetime, time
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from .models import RecordChange
+
+DEFAULT_FEED_LIMIT = 100
+MAX_FEED_LIMIT = 1000
+
+
+def encode_change_cursor(change_id):
+    payload = json.dumps({'c': change_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_change_cursor(cursor):
+    """Return the change id a cursor points after; ValueError for a malformed cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        change_id = int(json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))['c'])
+    except (ValueError, KeyError, TypeError, UnicodeEncodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    return change_id
+
+
+def parse_since(value):
+    """A datetime or date (midnight, local time) to start the feed from"""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid since: {value} (expected YYYY-MM-DD or an ISO datetime)")
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def change_summary(change):
+    return {
+        'id': change.id,
+        'change_type': change.change_type,
+        'county': change.county,
+        'roster': change.roster,
+        'record_key': change.record_key,
+        'case_number': change.case_number,
+        'filing_date': change.filing_date.isoformat() if change.filing_date else None,
+        'changes': change.changes,
+        'session_id': change.session.session_id if change.session else None,
+        'created_at': change.created_at.isoformat(),
+    }
+
+
+def changes_slice(cursor, since, limit, county, change_type):
+    """The bounded query for the page after `cursor`, and the id it starts after"""
+    changes = RecordChange.objects.select_related('session').only(
+        'id', 'change_type', 'county', 'roster', 'record_key', 'case_number', 'filing_date', 'changes',
+        'created_at', 'session__session_id',
+    )
+    if county:
+        changes = changes.filter(county=county)
+    if change_type:
+        if change_type not in dict(RecordChange.CHANGE_CHOICES):
+            raise ValueError(f"Unknown change_type: {change_type}")
+        changes = changes.filter(change_type=change_type)
+
+    last_id = 0
+    if cursor:
+        last_id = decode_change_cursor(cursor)
+        changes = changes.filter(id__gt=last_id)
+    elif since:
+        changes = changes.filter(created_at__gte=parse_since(since))
+    return changes.order_by('id')[:limit + 1], last_id
+
+
+def latest_change_id():
+    return RecordChange.objects.order_by('-id').values_list('id', flat=True)
+
+
+def change_page(rows, last_id, limit):
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if rows:
+        last_id = rows[-1].id
+    return rows, encode_change_cursor(last_id), more
+
+
+def read_changes(cursor=None, since=None, limit=DEFAULT_FEED_LIMIT, county=None, change_type=None):
+    """Return (changes, next cursor, more) for the page after `cursor`
+
+    Without a cursor the feed starts at `since` (or the beginning).
+    """
+    rows, last_id = changes_slice(cursor, since, limit, county, change_type)
+    rows = list(rows)
+    if not rows and not cursor and since:
+        # Nothing since then yet: resume after everything that exists now
+        last_id = latest_change_id().first() or 0
+    return change_page(rows, last_id, limit)
+
+
+async def aread_changes(cursor=None, since=None, limit=DEFAULT_FEED_LIMIT, county=None, change_type=None):
+    """read_changes() for async views, using the async ORM"""
+    rows, last_id = changes_slice(cursor, since, limit, county, change_type)
+    rows = [row async for row in rows]
+    if not rows and not cursor and since:
+        last_id = await latest_change_id().afirst() or 0
+    return change_page(rows, last_id, limit)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+County registry for the SC Courts public index
+
+Every county's rosters live under the same host at /<county>/courtrosters/.
+This module has no Django dependency so the standalone scripts can use it.
+"""
+
+from urllib.parse import urlparse
+
+BASE_URL = "https://publicindex.sccourts.org"
+
+DEFAULT_COUNTY = 'dorchester'
+
+# slug (URL path segment) -> display name
+COUNTIES = {
+    'abbeville': 'Abbeville',
+    'aiken': 'Aiken',
+    'allendale': 'Allendale',
+    'anderson': 'Anderson',
+    'bamberg': 'Bamberg',
+    'barnwell': 'Barnwell',
+    'beaufort': 'Beaufort',
+    'berkeley': 'Berkeley',
+    'calhoun': 'Calhoun',
+    'charleston': 'Charleston',
+    'cherokee': 'Cherokee',
+    'chester': 'Chester',
+    'chesterfield': 'Chesterfield',
+    'clarendon': 'Clarendon',
+    'colleton': 'Colleton',
+    'darlington': 'Darlington',
+    'dillon': 'Dillon',
+    'dorchester': 'Dorchester',
+    'edgefield': 'Edgefield',
+    'fairfield': 'Fairfield',
+    'florence': 'Florence',
+    'georgetown': 'Georgetown',
+    'greenville': 'Greenville',
+    'greenwood': 'Greenwood',
+    'hampton': 'Hampton',
+    'horry': 'Horry',
+    'jasper': 'Jasper',
+    'kershaw': 'Kershaw',
+    'lancaster': 'Lancaster',
+    'laurens': 'Laurens',
+    'lee': 'Lee',
+    'lexington': 'Lexington',
+    'marion': 'Marion',
+    'marlboro': 'Marlboro',
+    'mccormick': 'McCormick',
+    'newberry': 'Newberry',
+    'oconee': 'Oconee',
+    'orangeburg': 'Orangeburg',
+    'pickens': 'Pickens',
+    'richland': 'Richland',
+    'saluda': 'Saluda',
+    'spartanburg': 'Spartanburg',
+    'sumter': 'Sumter',
+    'union': 'Union',
+    'williamsburg': 'Williamsburg',
+    'york': 'York',
+}
+
+COUNTY_CHOICES = list(COUNTIES.items())
+
+
+def validate_county(county):
+    """Return the normalized county slug, or raise ValueError"""
+    slug = (county or '').strip().lower()
+    if slug not in COUNTIES:
+        raise ValueError(f"Unknown county: {county}")
+    return slug
+
+
+def county_url(county=DEFAULT_COUNTY):
+    """Court rosters landing page for a county"""
+    return f"{BASE_URL}/{validate_county(county)}/courtrosters/"
+
+
+def roster_url(county=DEFAULT_COUNTY):
+    """RosterSelection.aspx for a county"""
+    return f"{county_url(county)}RosterSelection.aspx"
+
+
+def host_of(url):
+    return urlparse(url).netloc.lower()
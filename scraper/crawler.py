@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+ASP.NET postback crawler for RosterSelection.aspx
+
+The roster page is a WebForms page: choosing a roster in the <select>
+posts the form back with the hidden __VIEWSTATE / __EVENTVALIDATION state.
+RosterCrawler enumerates the select options and posts each one back in
+turn, carrying the hidden state from every response into the next request.
+
+Every page goes through a page pipeline's fetch -> detect -> parse stages
+with run_one(), so postbacks stay strictly sequential on one thread while
+still getting the pipeline's retry policy, connection pool, rate limiter
+and protection-page detection. The crawl's cookies travel with each job
+(job.cookies in, job.response_cookies out), so it works the same on sync
+or async HTTP, and can pick up from a landing page someone else fetched.
+"""
+
+import time
+import logging
+from urllib.parse import urljoin
+from .pipeline import PageJob
+
+logger = logging.getLogger(__name__)
+
+# Options that are prompts rather than rosters
+PLACEHOLDER_VALUES = ['', '0', '-1']
+
+
+class RosterCrawler:
+    """Fetch every roster on a RosterSelection.aspx page through one pipeline
+
+    `pipeline` should hold only the page stages (see page_pipeline); it
+    may be shared with other crawls. `cookies` are the ASP.NET cookies to
+    start from (those the landing page was served under), carried from
+    one postback to the next. `delay` seconds pass between postbacks when
+    the fetch stage has no rate limiter of its own.
+    """
+
+    def __init__(self, target_url, pipeline, cookies=None, delay=2):
+        self.target_url = target_url
+        self.pipeline = pipeline
+        self.cookies = dict(cookies or {})
+        fetch = pipeline.stage('fetch')
+        self.delay = delay if getattr(fetch, 'rate_limiter', None) is None else 0
+
+    def fetch(self, method, url, data=None):
+        """Fetch and parse a page
+
+        Returns a page dict; for errors and protection pages its 'error'
+        says what went wrong and 'data' is None.
+        """
+        job = self.pipeline.run_one(PageJob(url, method=method, data=data, cookies=self.cookies))
+        error = None
+        if job.error is not None:
+            error = f"Roster request failed ({method} {url}): {job.error}"
+            logger.error(error)
+        elif not job.ok:
+            if job.status_code != 200:
+                error = f"Roster request returned {job.status_code} ({method} {url})"
+            else:
+                error = f"Protection page returned for {method} {url}"
+            logger.warning(error)
+        else:
+            self.cookies = job.response_cookies
+
+        return {
+            'url': job.response_url or url,
+            'html': job.html,
+            'data': job.parsed if error is None else None,
+            'error': error,
+        }
+
+    def roster_select(self, data):
+        """The <select> that lists the rosters (prefers one named like 'roster')"""
+        selects = [select for select in data.get('selects', []) if select.get('name')]
+        for select in selects:
+            if 'roster' in f"{select['name']} {select.get('id', '')}".lower():
+                return select
+        return selects[0] if selects else None
+
+    def roster_options(self, select):
+        return [option for option in select['options'] if option['value'] not in PLACEHOLDER_VALUES]
+
+    def postback_form(self, data):
+        """The form that owns the select (WebForms pages normally have one)"""
+        forms = data.get('forms', [])
+        for form in forms:
+            if (form.get('method') or '').lower() == 'post':
+                return form
+        return forms[0] if forms else {'action': '', 'inputs': []}
+
+    def build_payload(self, data, form, select, option):
+        """Form fields for posting `option` back, including the hidden page state"""
+        payload = {}
+        submit = None
+
+        for field in form.get('inputs', []):
+            name = field.get('name')
+            input_type = (field.get('type') or 'text').lower()
+            if not name:
+                continue
+            if input_type in ('submit', 'image'):
+                # Click the first submit button if the page has one
+                if submit is None:
+                    submit = (name, field.get('value', ''))
+                continue
+            if input_type in ('button', 'reset', 'checkbox', 'radio', 'file'):
+                continue
+            payload[name] = field.get('value', '')
+
+        # Other selects keep their current choice
+        for other in data.get('selects', []):
+            if not other.get('name') or other['name'] == select['name'] or not other['options']:
+                continue
+            selected = [opt for opt in other['options'] if opt['selected']] or other['options'][:1]
+            payload[other['name']] = selected[0]['value']
+
+        payload[select['name']] = option['value']
+
+        if submit:
+            payload[submit[0]] = submit[1]
+            payload['__EVENTTARGET'] = ''
+        else:
+            # AutoPostBack dropdown: the select itself raises the postback
+            payload['__EVENTTARGET'] = select['name']
+        payload.setdefault('__EVENTARGUMENT', '')
+
+        return payload
+
+    def crawl(self, page=None):
+        """Yield the landing page, then one page per roster option
+
+        `page` is an already fetched and parsed landing page ({'url',
+        'html', 'data'}); without one the landing page is fetched first. A
+        failed postback is yielded with its 'error' and ends the crawl.
+        """
+        try:
+            yield from self.crawl_pages(page)
+        finally:
+            # Done with this thread's HTTP session; its connections stay pooled
+            self.pipeline.stage('fetch').worker_done()
+
+    def crawl_pages(self, page=None):
+        if page is None:
+            page = self.fetch('GET', self.target_url)
+        else:
+            page = dict(page, error=None)
+        yield dict(page, roster=None)
+        if page['error'] is not None:
+            return
+
+        select = self.roster_select(page['data'])
+        if select is None:
+            logger.info("No roster select found on the landing page")
+            return
+
+        for option in self.roster_options(select):
+            if self.delay:
+                time.sleep(self.delay)
+
+            form = self.postback_form(page['data'])
+            url = urljoin(page['url'], form.get('action') or '')
+            payload = self.build_payload(page['data'], form, select, option)
+
+            logger.info(f"Posting back roster {option['text'] or option['value']}")
+            roster_page = self.fetch('POST', url, data=payload)
+            yield dict(roster_page, roster=option)
+            if roster_page['error'] is not None:
+                # State is gone; the remaining postbacks would be rejected
+                return
+
+            # Carry the new __VIEWSTATE / __EVENTVALIDATION into the next postback
+            if self.roster_select(roster_page['data']) is not None:
+                page = roster_page
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Per-connection database tuning
+
+SQLite connections get the SCRAPER_SQLITE_PRAGMAS from settings as soon as
+Django opens them (connection_created). Other backends are configured
+entirely through DATABASES.
+"""
+
+import logging
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """connection_created handler: apply the SQLite pragmas"""
+    if connection.vendor != 'sqlite':
+        return
+
+    pragmas = getattr(settings, 'SCRAPER_SQLITE_PRAGMAS', {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Session status pub/sub for the server-sent events endpoint
+
+Status changes are published to a broker on channel 'session:<session_id>'
+once the transaction that made them commits. Two brokers are provided:
+
+- SQLiteEventBroker (default): events are appended to a small SQLite file,
+  so the web process sees what the worker processes publish. Subscribers
+  tail the file by event id, which also lets clients resume with
+  Last-Event-ID.
+- MemoryEventBroker: asyncio queues inside one process, for development
+  and tests, or when the worker runs in the web process.
+
+SCRAPER_EVENT_BROKER picks one ('sqlite', 'memory', or a dotted path to a
+class taking the same arguments), so another backend can be dropped in.
+"""
+
+import json
+import time
+from datetime import datetime
+import asyncio
+import sqlite3
+import logging
+import threading
+import itertools
+from importlib import import_module
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+# Sessions in these states won't change again
+TERMINAL_STATUSES = ['success', 'failed', 'blocked']
+
+
+def session_channel(session_id):
+    return f"session:{session_id}"
+
+
+class MemorySubscription:
+    def __init__(self, broker, channels):
+        self.broker = broker
+        self.channels = set(channels)
+        self.queue = asyncio.Queue()
+        self.loop = asyncio.get_running_loop()
+
+    def deliver(self, event):
+        # publish() may run on any thread; hand the event to our loop
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, event)
+
+    async def next(self, timeout):
+        """Next (event id, channel, payload), or None if nothing arrives within timeout"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class MemoryEventBroker:
+    """In-process broker: events reach subscribers in the same process only"""
+
+    def __init__(self, **options):
+        self.ids = itertools.count(1)
+        self.subscriptions = set()
+        self.lock = threading.Lock()
+
+    def publish(self, channel, payload):
+        with self.lock:
+            event_id = next(self.ids)
+            subscriptions = [sub for sub in self.subscriptions if channel in sub.channels]
+        for subscription in subscriptions:
+            subscription.deliver((event_id, channel, payload))
+        return event_id
+
+    def subscribe(self, channels, last_event_id=None):
+        """Start receiving events for channels (must be called on the event loop)"""
+        subscription = MemorySubscription(self, channels)
+        with self.lock:
+            self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+
+class SQLiteSubscription:
+    def __init__(self, broker, channels, last_event_id):
+        self.broker = broker
+        self.channels = list(channels)
+        self.last_id = last_event_id if last_event_id is not None else broker.latest_id()
+        self.pending = []
+
+    async def next(self, timeout):
+        """Next (event id, channel, payload), or None if nothing arrives within timeout"""
+        deadline = time.monotonic() + timeout
+        while not self.pending:
+            self.pending = await asyncio.to_thread(self.broker.read, self.channels, self.last_id)
+            if self.pending:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            await asyncio.sleep(min(self.broker.poll_interval, remaining))
+
+        event = self.pending.pop(0)
+        self.last_id = event[0]
+        return event
+
+    def close(self):
+        self.pending = []
+
+
+class SQLiteEventBroker:
+    """Cross-process broker: an append-only event log in one SQLite file"""
+
+    def __init__(self, path=None, poll_interval=0.5, retention=3600, prune_interval=60, **options):
+        self.path = str(path)
+        self.poll_interval = poll_interval
+        # Seconds an event is kept for late subscribers / Last-Event-ID resumes
+        self.retention = retention
+        # Expired events are deleted at most this often, not on every publish
+        self.prune_interval = prune_interval
+        self.pruned_at = 0.0
+        self.initialized = False
+        self.lock = threading.Lock()
+
+    def connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        if not self.initialized:
+            with self.lock:
+                connection.execute(
+                    'CREATE TABLE IF NOT EXISTS events ('
+                    'id INTEGER PRIMARY KEY AUTOINCREMENT, channel TEXT NOT NULL, '
+                    'payload TEXT NOT NULL, created_at REAL NOT NULL)'
+                )
+                connection.execute('CREATE INDEX IF NOT EXISTS events_created_at ON events (created_at)')
+                connection.commit()
+                self.initialized = True
+        return connection
+
+    def publish(self, channel, payload):
+        now = time.time()
+        connection = self.connect()
+        try:
+            cursor = connection.execute(
+                'INSERT INTO events (channel, payload, created_at) VALUES (?, ?, ?)',
+                (channel, json.dumps(payload), now),
+            )
+            if now - self.pruned_at >= self.prune_interval:
+                self.pruned_at = now
+                connection.execute('DELETE FROM events WHERE created_at < ?', (now - self.retention,))
+            connection.commit()
+            return cursor.lastrowid
+        finally:
+            connection.close()
+
+    def latest_id(self):
+        connection = self.connect()
+        try:
+            return connection.execute('SELECT COALESCE(MAX(id), 0) FROM events').fetchone()[0]
+        finally:
+            connection.close()
+
+    def read(self, channels, after_id, limit=100):
+        placeholders = ', '.join('?' for _ in channels)
+        connection = self.connect()
+        try:
+            rows = connection.execute(
+                f'SELECT id, channel, payload FROM events WHERE id > ? AND channel IN ({placeholders}) '
+                f'ORDER BY id LIMIT ?',
+                (after_id, *channels, limit),
+            ).fetchall()
+        finally:
+            connection.close()
+        return [(event_id, channel, json.loads(payload)) for event_id, channel, payload in rows]
+
+    def subscribe(self, channels, last_event_id=None):
+        return SQLiteSubscription(self, channels, last_event_id)
+
+
+EVENT_BROKERS = {
+    'memory': MemoryEventBroker,
+    'sqlite': SQLiteEventBroker,
+}
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_event_broker():
+    """Process-wide broker configured from settings"""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            backend = getattr(settings, 'SCRAPER_EVENT_BROKER', 'sqlite')
+            if backend in EVENT_BROKERS:
+                broker_class = EVENT_BROKERS[backend]
+            else:
+                module_name, _, class_name = backend.rpartition('.')
+                broker_class = getattr(import_module(module_name), class_name)
+            _broker = broker_class(
+                path=getattr(settings, 'SCRAPER_EVENT_DB', None),
+                poll_interval=getattr(settings, 'SCRAPER_EVENT_POLL_INTERVAL', 0.5),
+            )
+        return _broker
+
+
+def publish_session_status(session):
+    """Publish a session's new status once the current transaction commits"""
+    payload = {
+        'session_id': session.session_id,
+        'county': session.county,
+        'status': session.status,
+        'error_message': session.error_message,
+        'updated_at': session.updated_at.isoformat() if session.updated_at else None,
+    }
+
+    def publish():
+        try:
+            get_event_broker().publish(session_channel(session.session_id), payload)
+        except Exception as e:
+            # Status updates are best-effort; the session itself is saved
+            logger.error(f"Failed to publish status for session {session.session_id}: {e}")
+
+    transaction.on_commit(publish)
+
+
+def sse_message(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+def parse_timestamp(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+def is_stale(payload, snapshot_times):
+    """True if the event is no newer than the session status already sent in the snapshot"""
+    sent_at = snapshot_times.get(payload.get('session_id'))
+    updated_at = parse_timestamp(payload.get('updated_at'))
+    return sent_at is not None and updated_at is not None and updated_at <= sent_at
+
+
+async def session_event_stream(subscription, session_ids, snapshot, heartbeat=15):
+    """SSE stream for several sessions: current status first, then every change
+
+    Events no newer than the snapshot (replayed after a Last-Event-ID
+    reconnect, or published between subscribing and reading the snapshot)
+    are dropped, so a client never sees a session's status go backwards.
+    Ends with a 'done' event once every session has reached a terminal status.
+    """
+    try:
+        yield "retry: 3000\n\n"
+
+        waiting = set(session_ids)
+        snapshot_times = {row['session_id']: parse_timestamp(row['updated_at']) for row in snapshot}
+        for row in snapshot:
+            yield sse_message('status', row)
+            if row['status'] in TERMINAL_STATUSES:
+                waiting.discard(row['session_id'])
+
+        missing = set(session_ids) - {row['session_id'] for row in snapshot}
+        for session_id in missing:
+            yield sse_message('missing', {'session_id': session_id})
+            waiting.discard(session_id)
+
+        while waiting:
+            event = await subscription.next(heartbeat)
+            if event is None:
+                # Comment line keeps proxies from closing an idle connection
+                yield ": keepalive\n\n"
+                continue
+
+            event_id, channel, payload = event
+            if is_stale(payload, snapshot_times):
+                continue
+            yield sse_message('status', payload, event_id)
+            if payload.get('status') in TERMINAL_STATUSES:
+                waiting.discard(payload.get('session_id'))
+
+        yield sse_message('done', {'session_ids': session_ids})
+    finally:
+        subscription.close()
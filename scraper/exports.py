@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Streaming CourtRecord export (CSV / NDJSON / Parquet)
+
+Records are read with a server-side iterator in fixed-size chunks and each
+chunk is serialized and handed on before the next is fetched, so memory
+use does not depend on how many rows match. ASGI responses wrap the stream
+in astream_chunks so it isn't buffered. Used by the export endpoint
+and the export_records management command.
+"""
+
+import io
+import csv
+import json
+import logging
+from itertools import islice
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.dateparse import parse_date
+from .counties import validate_county
+from .models import CourtRecord
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - pyarrow is optional
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+# (output column, queryset lookup)
+EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('session_id', 'session__session_id'),
+    ('county', 'county'),
+    ('record_type', 'record_type'),
+    ('case_number', 'case_number'),
+    ('party_name', 'party_name'),
+    ('filing_date', 'filing_date'),
+    ('status', 'status'),
+    ('created_at', 'created_at'),
+    ('removed_at', 'removed_at'),
+    ('raw_data', 'raw_data'),
+]
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+
+def parse_filter_date(value, name):
+    if not value:
+        return None
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ValueError(f"Invalid {name}: {value} (expected YYYY-MM-DD)")
+    return parsed
+
+
+def export_queryset(county=None, date_from=None, date_to=None, status=None, include_removed=False):
+    """CourtRecords matching the export filters; dates bound filing_date (inclusive)"""
+    records = CourtRecord.objects.all()
+    if not include_removed:
+        records = records.filter(removed_at__isnull=True)
+    if county:
+        records = records.filter(county=validate_county(county))
+    date_from = parse_filter_date(date_from, 'date_from')
+    if date_from:
+        records = records.filter(filing_date__gte=date_from)
+    date_to = parse_filter_date(date_to, 'date_to')
+    if date_to:
+        records = records.filter(filing_date__lte=date_to)
+    if status:
+        records = records.filter(status__iexact=status)
+    return records
+
+
+def iter_rows(records, chunk_size=None):
+    """Yield one tuple per record (EXPORT_COLUMNS order), fetched chunk_size at a time"""
+    chunk_size = chunk_size or getattr(settings, 'SCRAPER_EXPORT_CHUNK_SIZE', 2000)
+    lookups = [lookup for _, lookup in EXPORT_COLUMNS]
+    return records.order_by('id').values_list(*lookups).iterator(chunk_size=chunk_size)
+
+
+def iter_chunks(rows, chunk_size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def stream_csv(rows, chunk_size):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column for column, _ in EXPORT_COLUMNS])
+
+    raw_data_index = len(EXPORT_COLUMNS) - 1
+    for chunk in iter_chunks(rows, chunk_size):
+        for row in chunk:
+            row = list(row)
+            row[raw_data_index] = json.dumps(row[raw_data_index], cls=DjangoJSONEncoder)
+            writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_ndjson(rows, chunk_size):
+    columns = [column for column, _ in EXPORT_COLUMNS]
+    for chunk in iter_chunks(rows, chunk_size):
+        yield ''.join(
+            json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder) + '\n'
+            for row in chunk
+        )
+
+
+class ParquetSink:
+    """Write-only file object that hands written bytes back between row groups"""
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.parts.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def parquet_schema():
+    return pyarrow.schema([
+        ('id', pyarrow.int64()),
+        ('session_id', pyarrow.string()),
+        ('county', pyarrow.string()),
+        ('record_type', pyarrow.string()),
+        ('case_number', pyarrow.string()),
+        ('party_name', pyarrow.string()),
+        ('filing_date', pyarrow.date32()),
+        ('status', pyarrow.string()),
+        ('created_at', pyarrow.timestamp('us', tz='UTC')),
+        ('removed_at', pyarrow.timestamp('us', tz='UTC')),
+        ('raw_data', pyarrow.string()),
+    ])
+
+
+def stream_parquet(rows, chunk_size):
+    """One Parquet row group per chunk"""
+    if pyarrow is None:
+        raise RuntimeError("Parquet export requires pyarrow")
+
+    schema = parquet_schema()
+    sink = ParquetSink()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema)
+    try:
+        for chunk in iter_chunks(rows, chunk_size):
+            columns = [list(values) for values in zip(*chunk)]
+            columns[-1] = [json.dumps(value, cls=DjangoJSONEncoder) for value in columns[-1]]
+            writer.write_table(pyarrow.Table.from_arrays(columns, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+STREAMERS = {
+    'csv': stream_csv,
+    'ndjson': stream_ndjson,
+    'parquet': stream_parquet,
+}
+
+
+def stream_export(records, export_format='csv', chunk_size=None):
+    """Serialized export chunks (str for csv/ndjson, bytes for parquet)"""
+    if export_format not in STREAMERS:
+        raise ValueError(f"Unknown export format: {export_format}")
+    if export_format == 'parquet' and pyarrow is None:
+        raise ValueError("Parquet export requires pyarrow")
+
+    chunk_size = chunk_size or getattr(settings, 'SCRAPER_EXPORT_CHUNK_SIZE', 2000)
+    return STREAMERS[export_format](iter_rows(records, chunk_size), chunk_size)
+
+
+async def astream_chunks(chunks):
+    """Async iterator over a sync export stream, one chunk per thread hop
+
+    For ASGI responses: Django 4.2 collects a sync streaming iterator into
+    a list before sending any of it. Every next() (database fetch and
+    serialization) runs in the same worker thread, so the server-side
+    cursor stays on one connection; the stream is closed there too if the
+    client goes away.
+    """
+    # StopIteration can't cross into a Future, so the end is a sentinel
+    done = object()
+    next_chunk = sync_to_async(next)
+    try:
+        while True:
+            chunk = await next_chunk(chunks, done)
+            if chunk is done:
+                return
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close)()
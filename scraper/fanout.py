@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Multi-county fan-out
+
+Each county gets its own ScrapingSession. The sessions are either left in
+the queue for run_scraper_worker or scraped right away by streaming them
+through one page pipeline: `concurrency` fetch workers download while
+earlier pages are parsed and stored. The fetch stage takes the per-host
+slot, so the per-host concurrency cap applies either way.
+"""
+
+import logging
+from django.conf import settings
+from .counties import validate_county
+from .job_queue import claim_session, enqueue_scraping
+from .scraper_service import SCCourtsScraperService
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_counties(counties):
+    """Queue one pending session per county"""
+    return [enqueue_scraping(county) for county in counties]
+
+
+def run_counties(counties, concurrency=None):
+    """Scrape several counties at once; returns [(session, success), ...]"""
+    counties = [validate_county(county) for county in counties]
+    concurrency = concurrency or getattr(settings, 'SCRAPER_WORKER_CONCURRENCY', 4)
+
+    # Claim the sessions ourselves so a running worker doesn't pick them up too
+    sessions = [claim_session(session.pk) for session in enqueue_counties(counties)]
+    sessions = [session for session in sessions if session is not None]
+
+    logger.info(f"Scraping {len(sessions)} counties with concurrency {concurrency}")
+    results = dict(
+        (session.pk, (session, success))
+        for session, success in SCCourtsScraperService().run_sessions(sessions, workers=concurrency)
+    )
+    return [results[session.pk] for session in sessions]
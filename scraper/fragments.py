@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Paginated sections of a session for the lazily loaded detail page
+
+The detail page renders the session's summary row only; forms, inputs,
+selects, links and the raw HTML preview are fetched afterwards as JSON
+fragments. A page of a section is read with one JSON path per element
+(parsed_data -> section -> index), so the database returns just those
+elements, never the whole parsed_data document.
+"""
+
+from django.db.models.fields.json import KeyTransform
+from .models import HtmlBlob, ScrapingSession
+
+# Section -> session column holding its length
+FRAGMENT_SECTIONS = {
+    'forms': 'forms_count',
+    'inputs': 'inputs_count',
+    'selects': 'selects_count',
+    'links': 'links_count',
+}
+
+DEFAULT_FRAGMENT_LIMIT = 20
+MAX_FRAGMENT_LIMIT = 100
+
+# Longer strings (ViewState and the like) are cut in fragments
+MAX_VALUE_CHARS = 200
+
+DEFAULT_PREVIEW_CHARS = 2000
+MAX_PREVIEW_CHARS = 100000
+
+# Small parsed_data keys the summary of a blocked session shows
+SUMMARY_KEYS = ['protection_indicators', 'protection_elements', 'page_title', 'meta_description',
+                'page_text_preview']
+
+
+def truncate_values(value, max_chars=MAX_VALUE_CHARS):
+    """Copy of a JSON value with long strings cut to max_chars"""
+    if isinstance(value, str):
+        return value if len(value) <= max_chars else value[:max_chars] + '…'
+    if isinstance(value, dict):
+        return {key: truncate_values(item, max_chars) for key, item in value.items()}
+    if isinstance(value, list):
+        return [truncate_values(item, max_chars) for item in value]
+    return value
+
+
+def summary_fields():
+    """Annotations pulling the summary keys out of parsed_data"""
+    return {
+        f'summary_{key}': KeyTransform(key, 'parsed_data')
+        for key in SUMMARY_KEYS
+    }
+
+
+def section_items(section, offset, limit):
+    """Annotations for elements offset..offset+limit-1 of a parsed_data section"""
+    return {
+        f'item_{index}': KeyTransform(str(offset + index), KeyTransform(section, 'parsed_data'))
+        for index in range(limit)
+    }
+
+
+async def read_section(session_id, section, offset=0, limit=DEFAULT_FRAGMENT_LIMIT):
+    """One page of a section, or None if there is no such session"""
+    if section not in FRAGMENT_SECTIONS:
+        raise ValueError(f"Unknown section: {section}")
+    count_field = FRAGMENT_SECTIONS[section]
+
+    row = await (ScrapingSession.objects
+                 .filter(session_id=session_id)
+                 .values(count_field)
+                 .afirst())
+    if row is None:
+        return None
+    total = row[count_field]
+
+    limit = max(0, min(limit, total - offset))
+    items = []
+    if limit:
+        annotations = section_items(section, offset, limit)
+        page = await (ScrapingSession.objects
+                      .filter(session_id=session_id)
+                      .values(**annotations)
+                      .afirst())
+        items = [truncate_values(page[name]) for name in annotations if page[name] is not None]
+
+    next_offset = offset + len(items)
+    return {
+        'section': section,
+        'offset': offset,
+        'total': total,
+        'items': items,
+        'next_offset': next_offset if next_offset < total else None,
+    }
+
+
+def read_html_preview(session_id, max_chars=DEFAULT_PREVIEW_CHARS):
+    """Start of a session's page HTML, or None if there is no such session"""
+    row = (ScrapingSession.objects
+           .filter(session_id=session_id)
+           .values('html_blob_id', 'html_blob__length')
+           .first())
+    if row is None:
+        return None
+    if row['html_blob_id'] is None:
+        return {'length': 0, 'html': '', 'truncated': False}
+    html = HtmlBlob.preview(row['html_blob_id'], max_chars)
+    return {
+        'length': row['html_blob__length'],
+        'html': html,
+        'truncated': row['html_blob__length'] > len(html),
+    }
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+On-disk HTTP cache with conditional GET for roster pages and static assets
+
+Entries live in one SQLite file so every worker process shares them. A
+fresh entry (younger than its URL's TTL) is served without touching the
+network; a stale one is revalidated with If-None-Match / If-Modified-Since
+and a 304 reuses the stored body. Entries are evicted least-recently-used
+first once the cache grows past its size cap. No Django dependency.
+"""
+
+import re
+import json
+import time
+import asyncio
+import sqlite3
+import logging
+import threading
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+logger = logging.getLogger(__name__)
+
+# Headers that describe the wire format rather than the stored (decoded) body
+HOP_HEADERS = ['content-encoding', 'content-length', 'transfer-encoding', 'connection']
+
+
+class CacheEntry:
+    def __init__(self, url, status, headers, body, stored_at):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+
+    @property
+    def etag(self):
+        return self.headers.get('etag')
+
+    @property
+    def last_modified(self):
+        return self.headers.get('last-modified')
+
+    def conditional_headers(self):
+        """Validators to send when revalidating this entry"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def to_response(self):
+        """Rebuild a requests.Response from the stored entry"""
+        response = requests.Response()
+        response.status_code = self.status
+        response.url = self.url
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.body
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.from_cache = True
+        return response
+
+
+class HttpCache:
+    """SQLite-backed response cache with per-pattern TTLs and LRU eviction"""
+
+    def __init__(self, path, max_bytes=50 * 1024 * 1024, ttl_rules=None, default_ttl=0):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        # [(compiled regex, ttl seconds)], first match wins
+        self.ttl_rules = [(re.compile(pattern), ttl) for pattern, ttl in (ttl_rules or [])]
+        self.default_ttl = default_ttl
+        self.initialized = False
+        self.lock = threading.Lock()
+
+    def connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        if not self.initialized:
+            with self.lock:
+                connection.execute(
+                    'CREATE TABLE IF NOT EXISTS entries ('
+                    'url TEXT PRIMARY KEY, status INTEGER NOT NULL, headers TEXT NOT NULL, '
+                    'body BLOB NOT NULL, size INTEGER NOT NULL, '
+                    'stored_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+                )
+                connection.execute('CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)')
+                connection.commit()
+                self.initialized = True
+        return connection
+
+    def ttl_for(self, url):
+        for pattern, ttl in self.ttl_rules:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    def get(self, url):
+        """Return the stored entry for url (and mark it recently used), or None"""
+        connection = self.connect()
+        try:
+            row = connection.execute(
+                'SELECT status, headers, body, stored_at FROM entries WHERE url = ?', (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute('UPDATE entries SET accessed_at = ? WHERE url = ?', (time.time(), url))
+            connection.commit()
+        finally:
+            connection.close()
+
+        status, headers, body, stored_at = row
+        return CacheEntry(url, status, json.loads(headers), bytes(body), stored_at)
+
+    def is_fresh(self, entry):
+        return time.time() - entry.stored_at < self.ttl_for(entry.url)
+
+    def is_cacheable(self, url, status, headers):
+        if status != 200:
+            return False
+        cache_control = headers.get('cache-control', '').lower()
+        if 'no-store' in cache_control:
+            return False
+        # Without a TTL or a validator the entry could never be reused
+        return self.ttl_for(url) > 0 or 'etag' in headers or 'last-modified' in headers
+
+    def store(self, url, status, headers, body):
+        headers = {key.lower(): value for key, value in headers.items() if key.lower() not in HOP_HEADERS}
+        if not self.is_cacheable(url, status, headers):
+            return False
+
+        now = time.time()
+        connection = self.connect()
+        try:
+            connection.execute(
+                'INSERT OR REPLACE INTO entries (url, status, headers, body, size, stored_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (url, status, json.dumps(headers), sqlite3.Binary(body), len(body), now, now),
+            )
+            self.evict(connection)
+            connection.commit()
+        finally:
+            connection.close()
+        return True
+
+    def revalidated(self, entry, headers):
+        """Record a 304: the entry is fresh again, with any updated validators"""
+        for key, value in headers.items():
+            if key.lower() in ('etag', 'last-modified', 'cache-control', 'expires'):
+                entry.headers[key.lower()] = value
+        entry.stored_at = time.time()
+
+        connection = self.connect()
+        try:
+            connection.execute(
+                'UPDATE entries SET headers = ?, stored_at = ?, accessed_at = ? WHERE url = ?',
+                (json.dumps(entry.headers), entry.stored_at, entry.stored_at, entry.url),
+            )
+            connection.commit()
+        finally:
+            connection.close()
+        return entry
+
+    def evict(self, connection):
+        """Drop least-recently-used entries until the cache fits in max_bytes"""
+        total = connection.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for url, size in connection.execute('SELECT url, size FROM entries ORDER BY accessed_at').fetchall():
+            connection.execute('DELETE FROM entries WHERE url = ?', (url,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+def cache_lookup(cache, url, headers):
+    """(fresh hit or None, stored entry or None, headers to send on a miss)"""
+    entry = cache.get(url)
+    if entry is not None and cache.is_fresh(entry):
+        logger.debug(f"HTTP cache hit: {url}")
+        return entry.to_response(), entry, None
+
+    headers = dict(headers or {})
+    if entry is not None:
+        headers.update(entry.conditional_headers())
+    return None, entry, headers
+
+
+def cache_response(cache, url, entry, response):
+    """Store a network response (or apply a 304 to `entry`); returns the response to use"""
+    if response.status_code == 304 and entry is not None:
+        logger.debug(f"HTTP cache revalidated: {url}")
+        return cache.revalidated(entry, response.headers).to_response()
+
+    cache.store(url, response.status_code, response.headers, response.content)
+    response.from_cache = False
+    return response
+
+
+def cached_get(cache, url, headers, send):
+    """GET url through the cache; send(headers) performs the request on a miss
+
+    Works with any response that has status_code, headers and content
+    (requests or httpx); hits and revalidations come back as requests
+    Responses.
+    """
+    hit, entry, headers = cache_lookup(cache, url, headers)
+    if hit is not None:
+        return hit
+    return cache_response(cache, url, entry, send(headers))
+
+
+async def acached_get(cache, url, headers, send):
+    """cached_get() for a coroutine function `send`; the cache's disk I/O runs off the event loop"""
+    hit, entry, headers = await asyncio.to_thread(cache_lookup, cache, url, headers)
+    if hit is not None:
+        return hit
+    response = await send(headers)
+    return await asyncio.to_thread(cache_response, cache, url, entry, response)
+
+
+class CachingSession(requests.Session):
+    """requests.Session that serves plain GETs through an HttpCache"""
+
+    def __init__(self, cache):
+        super().__init__()
+        self.cache = cache
+
+    def request(self, method, url, *args, **kwargs):
+        if method.upper() != 'GET' or any(kwargs.get(key) for key in ('params', 'data', 'json')):
+            return super().request(method, url, *args, **kwargs)
+
+        def send(headers):
+            return super(CachingSession, self).request(method, url, *args, **dict(kwargs, headers=headers))
+
+        return cached_get(self.cache, url, kwargs.pop('headers', None), send)
+
+
+_http_cache = None
+_http_cache_lock = threading.Lock()
+
+
+def get_http_cache():
+    """Process-wide cache configured from Django settings, or None if disabled"""
+    global _http_cache
+    from django.conf import settings
+
+    if not getattr(settings, 'SCRAPER_HTTP_CACHE_ENABLED', False):
+        return None
+
+    with _http_cache_lock:
+        if _http_cache is None:
+            _http_cache = HttpCache(
+                settings.SCRAPER_HTTP_CACHE_PATH,
+                max_bytes=getattr(settings, 'SCRAPER_HTTP_CACHE_MAX_BYTES', 50 * 1024 * 1024),
+                ttl_rules=getattr(settings, 'SCRAPER_HTTP_CACHE_TTLS', []),
+                default_ttl=getattr(settings, 'SCRAPER_HTTP_CACHE_DEFAULT_TTL', 0),
+            )
+        return _http_cache
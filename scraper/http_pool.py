@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Process-wide HTTP connection pool for the requests-based scrapers
+
+Every scrape used to build its own requests.Session, so each job paid a
+fresh DNS lookup, TCP connect and TLS handshake before fetching one small
+roster page. HttpPool owns one pair of HTTPAdapters (http and https) and
+mounts them on every session it hands out: jobs borrow a session with an
+isolated cookie jar and headers, while the keep-alive connections
+underneath are shared. Hosts whose connections sit idle longer than
+idle_timeout are closed. No Django dependency.
+"""
+
+import time
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+from .http_cache import CachingSession
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def pool_key(url):
+    """(scheme, host, port) of a URL, as urllib3 keys its per-host pools"""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    return scheme, (parts.hostname or '').lower(), parts.port or DEFAULT_PORTS.get(scheme)
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter owned by an HttpPool
+
+    Sessions close their adapters when they are closed; a pooled adapter
+    outlives the sessions it is mounted on, so close() leaves the
+    connections alone and HttpPool.close() shuts them down instead.
+    """
+
+    def __init__(self, http_pool, **kwargs):
+        self.http_pool = http_pool
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        self.http_pool.touch(request.url)
+        return super().send(request, **kwargs)
+
+    def close(self):
+        pass
+
+    def shutdown(self):
+        super().close()
+
+
+class HttpPool:
+    """Keep-alive connections shared by every session borrowed from the pool
+
+    `hosts` is how many hosts keep a connection pool (pool_connections),
+    `maxsize` how many keep-alive connections each host keeps
+    (pool_maxsize). With `block`, a request waits for a free connection
+    instead of opening a throwaway one past maxsize.
+    """
+
+    def __init__(self, hosts=10, maxsize=10, block=False, idle_timeout=60):
+        self.hosts = hosts
+        self.maxsize = maxsize
+        self.block = block
+        self.idle_timeout = idle_timeout
+        self.adapters = {
+            scheme: PooledAdapter(self, pool_connections=hosts, pool_maxsize=maxsize, pool_block=block)
+            for scheme in ('http://', 'https://')
+        }
+        self.lock = threading.Lock()
+        self.last_used = {}
+        self.last_sweep = time.monotonic()
+
+    def mount(self, session):
+        for prefix, adapter in self.adapters.items():
+            session.mount(prefix, adapter)
+        return session
+
+    def session(self, headers=None, cache=None):
+        """A new session (own cookie jar) on the pooled connections
+
+        With an HttpCache, plain GETs go through it (see CachingSession).
+        """
+        session = CachingSession(cache) if cache is not None else requests.Session()
+        session.headers.update(headers or {})
+        return self.mount(session)
+
+    def touch(self, url):
+        """Record use of url's host; closes idle hosts now and then"""
+        now = time.monotonic()
+        idle = set()
+        with self.lock:
+            # Sweep before recording this request, so a host that sat idle
+            # gets a fresh connection rather than a stale one
+            if self.idle_timeout is not None and now - self.last_sweep >= min(self.idle_timeout, 30):
+                self.last_sweep = now
+                idle = {key for key, used in self.last_used.items() if now - used > self.idle_timeout}
+                for key in idle:
+                    del self.last_used[key]
+            self.last_used[pool_key(url)] = now
+        if idle:
+            self.evict(idle)
+
+    def evict(self, keys):
+        """Close the connections of the given (scheme, host, port) pools"""
+        for adapter in self.adapters.values():
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                if (key.key_scheme, key.key_host, key.key_port) in keys:
+                    # RecentlyUsedContainer closes the pool as it drops it
+                    pools.pop(key, None)
+        logger.debug(f"Closed idle connections to {sorted(host for _, host, _ in keys)}")
+
+    def close(self):
+        for adapter in self.adapters.values():
+            adapter.shutdown()
+        with self.lock:
+            self.last_used.clear()
+
+
+_http_pool = None
+_http_pool_lock = threading.Lock()
+
+
+def get_http_pool():
+    """Process-wide pool configured from Django settings"""
+    global _http_pool
+    from django.conf import settings
+
+    with _http_pool_lock:
+        if _http_pool is None:
+            _http_pool = HttpPool(
+                hosts=getattr(settings, 'SCRAPER_HTTP_POOL_HOSTS', 10),
+                maxsize=getattr(settings, 'SCRAPER_HTTP_POOL_MAXSIZE', 10),
+                block=getattr(settings, 'SCRAPER_HTTP_POOL_BLOCK', False),
+                idle_timeout=getattr(settings, 'SCRAPER_HTTP_POOL_IDLE_TIMEOUT', 60),
+            )
+        return _http_pool
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+DB-backed job queue for scraping sessions
+
+Sessions are queued by creating a ScrapingSession with status 'pending'.
+Workers claim pending sessions by atomically flipping them to 'running'
+(stamping claimed_at) and then run the scraper service against them. A
+session left 'running' by a worker that died is claimed again once its
+claim is older than SCRAPER_CLAIM_TIMEOUT seconds.
+"""
+
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from datetime import timedelta
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from .counties import DEFAULT_COUNTY
+from .events import publish_session_status
+from .models import ScrapingSession, SessionStats
+from .scraper_service import SCCourtsScraperService
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_scraping(county=DEFAULT_COUNTY):
+    """Queue a new scraping session and return it without running it"""
+    return SCCourtsScraperService(county=county).create_session()
+
+
+def stale_claims(now=None):
+    """Running sessions whose claim is older than SCRAPER_CLAIM_TIMEOUT"""
+    timeout = getattr(settings, 'SCRAPER_CLAIM_TIMEOUT', 30 * 60)
+    cutoff = (now or timezone.now()) - timedelta(seconds=timeout)
+    # Sessions from before claims were stamped fall back to updated_at
+    return Q(status='running') & (Q(claimed_at__lt=cutoff) | Q(claimed_at__isnull=True, updated_at__lt=cutoff))
+
+
+def claim_next_session():
+    """Claim the oldest pending session, else the oldest abandoned running one
+
+    Returns None if there is nothing to claim.
+    """
+    for stale in (False, True):
+        sessions = ScrapingSession.objects.filter(stale_claims() if stale else Q(status='pending'))
+        candidates = sessions.order_by('created_at', 'id').values_list('id', flat=True)[:10]
+        for pk in candidates:
+            session = claim_session(pk, stale=stale)
+            if session is not None:
+                return session
+    return None
+
+
+def claim_session(pk, stale=False):
+    """Claim one session by primary key; None if someone else got it
+
+    Claims a pending session, or with stale=True a running one whose
+    claim has timed out.
+    """
+    now = timezone.now()
+    # Only one worker wins the update
+    with transaction.atomic():
+        sessions = ScrapingSession.objects.filter(pk=pk)
+        if stale:
+            claimed = sessions.filter(stale_claims(now)).update(claimed_at=now, updated_at=now)
+        else:
+            claimed = sessions.filter(status='pending').update(status='running', claimed_at=now, updated_at=now)
+        if not claimed:
+            return None
+        session = ScrapingSession.objects.get(pk=pk)
+        if stale:
+            logger.warning(f"Reclaimed session {session.session_id}: its worker stopped responding")
+        else:
+            # update() bypasses save(), so count the transition here
+            SessionStats.record_transition('pending', 'running', session.created_at)
+            publish_session_status(session)
+    return session
+
+
+def process_session(session):
+    """Run one claimed session through the scraper service"""
+    try:
+        logger.info(f"Worker processing session {session.session_id} ({session.county})")
+        # The pipeline's fetch stage holds the per-host slot while it downloads
+        return SCCourtsScraperService(county=session.county).run_session(session)
+    finally:
+        # Each worker thread owns its own connection; don't leak it
+        connection.close()
+
+
+class ScrapingWorker:
+    """Drains pending sessions with a fixed-size thread pool"""
+
+    def __init__(self, concurrency=None, poll_interval=None):
+        self.concurrency = concurrency or getattr(settings, 'SCRAPER_WORKER_CONCURRENCY', 4)
+        self.poll_interval = poll_interval or getattr(settings, 'SCRAPER_WORKER_POLL_INTERVAL', 2.0)
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        self.in_flight = set()
+
+    def fill_slots(self):
+        """Claim pending sessions until every worker slot is busy"""
+        self.in_flight = {future for future in self.in_flight if not future.done()}
+
+        claimed = 0
+        while len(self.in_flight) < self.concurrency:
+            session = claim_next_session()
+            if session is None:
+                break
+            self.in_flight.add(self.executor.submit(process_session, session))
+            claimed += 1
+        return claimed
+
+    def run(self, once=False):
+        """Run the worker loop; with once=True, drain the queue and exit"""
+        logger.info(f"Scraping worker started (concurrency={self.concurrency})")
+        try:
+            while True:
+                claimed = self.fill_slots()
+
+                if once and not claimed and not self.in_flight:
+                    break
+
+                if not claimed:
+                    time.sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            logger.info("Scraping worker interrupted, waiting for running jobs")
+        finally:
+            self.executor.shutdown(wait=True)
+            logger.info("Scraping worker stopped")
@@ -0,0 +1,135 @@
+import time
+import uuid
+import random
+import asyncio
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+from scraper.models import ScrapingSession, SessionStats
+
+ENDPOINTS = {
+    'status': '/api/session/{session_id}/status/',
+    'data': '/api/session/{session_id}/data/',
+}
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = 'Load-test the session status and data endpoints (sync vs async deployments)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='Base URL of a running server, e.g. http://localhost:8000')
+        parser.add_argument('--in-process', choices=['asgi', 'wsgi'],
+                            help='Serve the app inside this process instead of hitting --url')
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Worker threads for --in-process wsgi (what sync gunicorn workers cap)')
+        parser.add_argument('--concurrency', type=int, default=50, help='Clients polling at once')
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per endpoint')
+        parser.add_argument('--sessions', type=int, default=20, help='Benchmark sessions to look up')
+        parser.add_argument('--endpoint', choices=list(ENDPOINTS), action='append',
+                            help='Endpoint to test (repeatable; default: all)')
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark sessions afterwards')
+
+    def create_sessions(self, prefix, count):
+        """Successful sessions with a few KB of parsed data each"""
+        session_ids = []
+        for index in range(count):
+            session = ScrapingSession.objects.create(
+                session_id=f'{prefix}-{uuid.uuid4()}',
+                status='success',
+                parsed_data={'records': [{'case_number': f'B{index}-{n}', 'party_name': 'Benchmark'}
+                                         for n in range(50)]},
+            )
+            session_ids.append(session.session_id)
+        return session_ids
+
+    def client(self, options):
+        if options['in_process'] == 'asgi':
+            from django.core.asgi import get_asgi_application
+            transport = httpx.ASGITransport(app=get_asgi_application())
+            return httpx.AsyncClient(transport=transport, base_url='http://localhost'), None
+
+        if options['in_process'] == 'wsgi':
+            from django.core.wsgi import get_wsgi_application
+            transport = httpx.WSGITransport(app=get_wsgi_application())
+            client = httpx.Client(transport=transport, base_url='http://localhost')
+            return client, ThreadPoolExecutor(max_workers=options['workers'])
+
+        limits = httpx.Limits(max_connections=options['concurrency'], max_keepalive_connections=options['concurrency'])
+        return httpx.AsyncClient(base_url=options['url'], limits=limits, timeout=30), None
+
+    async def run_endpoint(self, client, executor, path, session_ids, options):
+        """Fire options['requests'] lookups with options['concurrency'] in flight"""
+        latencies, errors = [], []
+        remaining = iter(range(options['requests']))
+        loop = asyncio.get_running_loop()
+
+        async def get(url):
+            if executor is not None:
+                return await loop.run_in_executor(executor, client.get, url)
+            return await client.get(url)
+
+        async def poller():
+            for _ in remaining:
+                url = path.format(session_id=random.choice(session_ids))
+                start = time.perf_counter()
+                try:
+                    response = await get(url)
+                except httpx.HTTPError as e:
+                    errors.append(str(e))
+                    continue
+                if response.status_code != 200:
+                    errors.append(f'HTTP {response.status_code}')
+                    continue
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(poller() for _ in range(options['concurrency'])))
+        return latencies, errors, time.perf_counter() - start
+
+    async def run(self, session_ids, options):
+        client, executor = self.client(options)
+        results = {}
+        try:
+            for name in options['endpoint'] or list(ENDPOINTS):
+                results[name] = await self.run_endpoint(client, executor, ENDPOINTS[name], session_ids, options)
+        finally:
+            if executor is not None:
+                client.close()
+                executor.shutdown()
+            else:
+                await client.aclose()
+        return results
+
+    def handle(self, *args, **options):
+        if bool(options['url']) == bool(options['in_process']):
+            raise CommandError('Give either --url or --in-process')
+
+        prefix = f'bench-api-{uuid.uuid4().hex[:8]}'
+        session_ids = self.create_sessions(prefix, options['sessions'])
+        target = options['url'] or f'in-process {options["in_process"]}'
+        if options['in_process'] == 'wsgi':
+            target += f' ({options["workers"]} workers)'
+        self.stdout.write(f'Target: {target}, {options["concurrency"]} concurrent clients, '
+                          f'{options["requests"]} requests per endpoint')
+
+        try:
+            results = asyncio.run(self.run(session_ids, options))
+        finally:
+            if not options['keep']:
+                ScrapingSession.objects.filter(session_id__startswith=prefix).delete()
+                SessionStats.rebuild()
+
+        for name, (latencies, errors, elapsed) in results.items():
+            line = f'{name:>6}: {len(latencies)} ok in {elapsed:.2f}s ({len(latencies) / elapsed:.1f} req/s)'
+            if latencies:
+                latencies.sort()
+                line += (f', p50 {statistics.median(latencies) * 1000:.1f} ms, '
+                         f'p99 {percentile(latencies, 0.99) * 1000:.1f} ms')
+            self.stdout.write(line)
+            if errors:
+                self.stdout.write(self.style.ERROR(f'        errors: {len(errors)} (first: {errors[0]})'))
@@ -0,0 +1,113 @@
+import time
+import uuid
+import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections
+from scraper.job_queue import claim_session
+from scraper.models import ScrapingSession, SessionStats
+from scraper.records import sync_court_records
+
+# SQLite as it behaves without the tuning in SCRAPER_SQLITE_PRAGMAS (the
+# journal mode is switched once up front; it is stored in the database file)
+SQLITE_DEFAULT_PRAGMAS = {
+    'synchronous': 'FULL',
+    'busy_timeout': 5000,
+}
+
+class Command(BaseCommand):
+    help = 'Measure session write throughput under concurrent workers for the current DB_PROFILE'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent writer threads')
+        parser.add_argument('--sessions', type=int, default=50, help='Sessions written per thread')
+        parser.add_argument('--records', type=int, default=50, help='Court records saved per session')
+        parser.add_argument('--readers', type=int, default=2,
+                            help='Threads reading session listings while the writers run')
+        parser.add_argument('--sqlite-defaults', action='store_true',
+                            help='Use stock SQLite settings (rollback journal, FULL sync) for comparison')
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark sessions afterwards')
+
+    def write_session(self, prefix, records_per_session):
+        """One worker lifecycle: queue, claim, finish, save records"""
+        session = ScrapingSession.objects.create(session_id=f'{prefix}-{uuid.uuid4()}', status='pending')
+        session = claim_session(session.pk)
+        session.status = 'success'
+        session.save()
+        # Fresh case numbers each time, so every record is a write
+        sync_court_records(session, (
+            {'case_number': f'{session.session_id}-{index}', 'party_name': 'Benchmark', 'status': '',
+             'record_type': 'Benchmark', 'filing_date': None, 'raw_data': {}}
+            for index in range(records_per_session)
+        ), mark_missing=False)
+
+    def writer(self, prefix, options, latencies, errors):
+        try:
+            for _ in range(options['sessions']):
+                start = time.perf_counter()
+                try:
+                    self.write_session(prefix, options['records'])
+                except OperationalError as e:
+                    errors.append(str(e))
+                    continue
+                latencies.append(time.perf_counter() - start)
+        finally:
+            connection.close()
+
+    def reader(self, stop, reads):
+        try:
+            while not stop.is_set():
+                list(ScrapingSession.objects.for_listing()[:20])
+                reads.append(1)
+        finally:
+            connection.close()
+
+    def handle(self, *args, **options):
+        vendor = connections['default'].vendor
+        if options['sqlite_defaults']:
+            if vendor != 'sqlite':
+                self.stdout.write(self.style.WARNING('--sqlite-defaults only applies to the sqlite profile'))
+            else:
+                settings.SCRAPER_SQLITE_PRAGMAS = SQLITE_DEFAULT_PRAGMAS
+                connections.close_all()
+                with connection.cursor() as cursor:
+                    cursor.execute('PRAGMA journal_mode = DELETE')
+                connections.close_all()
+
+        prefix = f'bench-{uuid.uuid4().hex[:8]}'
+        latencies, errors, reads = [], [], []
+        stop = threading.Event()
+        total = options['threads'] * options['sessions']
+        self.stdout.write(f'Profile: {settings.DB_PROFILE} ({vendor}), {options["threads"]} writers x '
+                          f'{options["sessions"]} sessions x {options["records"]} records, '
+                          f'{options["readers"]} readers')
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['threads'] + options['readers']) as executor:
+            readers = [executor.submit(self.reader, stop, reads) for _ in range(options['readers'])]
+            writers = [executor.submit(self.writer, prefix, options, latencies, errors)
+                       for _ in range(options['threads'])]
+            for future in writers:
+                future.result()
+            stop.set()
+            for future in readers:
+                future.result()
+        elapsed = time.perf_counter() - start
+
+        done = len(latencies)
+        self.stdout.write(f'Sessions: {done}/{total} in {elapsed:.2f}s ({done / elapsed:.1f}/s, '
+                          f'{done * options["records"] / elapsed:.0f} records/s)')
+        if latencies:
+            latencies.sort()
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            self.stdout.write(f'Latency per session: median {statistics.median(latencies) * 1000:.1f} ms, '
+                              f'p95 {p95 * 1000:.1f} ms')
+        self.stdout.write(f'Listing reads: {len(reads)} ({len(reads) / elapsed:.1f}/s)')
+        style = self.style.SUCCESS if not errors else self.style.ERROR
+        self.stdout.write(style(f'Errors: {len(errors)}' + (f' (first: {errors[0]})' if errors else '')))
+
+        if not options['keep']:
+            ScrapingSession.objects.filter(session_id__startswith=prefix).delete()
+            SessionStats.rebuild()
@@ -0,0 +1,61 @@
+import time
+from django.core.management.base import BaseCommand
+from scraper.models import HtmlBlob
+from scraper.parsers import PARSER_BACKENDS, get_parser
+
+class Command(BaseCommand):
+    help = 'Compare parser backends on stored raw_html and/or HTML files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='*',
+                            help='Extra HTML files to include in the corpus')
+        parser.add_argument('--limit', type=int, default=200,
+                            help='Maximum number of stored sessions to load (0 to skip the database)')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Number of passes over the corpus per backend')
+
+    def load_corpus(self, options):
+        corpus = []
+        if options['limit']:
+            # Each distinct stored page once
+            blobs = HtmlBlob.objects.order_by('-created_at')[:options['limit']]
+            corpus.extend(blob.text for blob in blobs)
+
+        for path in options['files']:
+            with open(path, 'r', encoding='utf-8') as f:
+                corpus.append(f.read())
+        return corpus
+
+    def handle(self, *args, **options):
+        corpus = self.load_corpus(options)
+        if not corpus:
+            self.stdout.write(self.style.WARNING('No HTML to benchmark'))
+            return
+
+        total_bytes = sum(len(html) for html in corpus)
+        self.stdout.write(f'Corpus: {len(corpus)} pages, {total_bytes / 1024:.1f} KiB, {options["repeat"]} passes')
+
+        results = {}
+        for backend in PARSER_BACKENDS:
+            parser = get_parser(backend)
+            if parser.name != backend:
+                self.stdout.write(self.style.WARNING(f'{backend}: not available, skipped'))
+                continue
+
+            start = time.perf_counter()
+            for _ in range(options['repeat']):
+                outputs = [parser.parse(html) for html in corpus]
+            elapsed = time.perf_counter() - start
+
+            results[backend] = outputs
+            per_page = elapsed / (len(corpus) * options['repeat']) * 1000
+            self.stdout.write(f'{backend:>12}: {elapsed:.3f}s total, {per_page:.3f} ms/page')
+
+        # html.parser is the reference output every other backend must match
+        baseline = results.get('html.parser')
+        for backend, outputs in results.items():
+            if baseline is None or outputs is baseline:
+                continue
+            mismatches = sum(1 for a, b in zip(baseline, outputs) if a != b)
+            style = self.style.SUCCESS if not mismatches else self.style.WARNING
+            self.stdout.write(style(f'{backend}: {mismatches} page(s) differ from html.parser'))
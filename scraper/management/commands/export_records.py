@@ -0,0 +1,53 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from scraper.exports import EXPORT_FORMATS, export_queryset, stream_export
+
+class Command(BaseCommand):
+    help = 'Stream court records to a CSV, NDJSON or Parquet file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', '-o', help='Output file (default: stdout; required for parquet)')
+        parser.add_argument('--county', help='Only records from this county')
+        parser.add_argument('--date-from', help='Earliest filing date (YYYY-MM-DD)')
+        parser.add_argument('--date-to', help='Latest filing date (YYYY-MM-DD)')
+        parser.add_argument('--status', help='Only records with this status')
+        parser.add_argument('--include-removed', action='store_true',
+                            help='Also export records that have dropped off their roster')
+        parser.add_argument('--chunk-size', type=int, default=None,
+                            help='Rows per database fetch (default: SCRAPER_EXPORT_CHUNK_SIZE)')
+
+    def handle(self, *args, **options):
+        export_format = options['format']
+        if export_format == 'parquet' and not options['output']:
+            raise CommandError('--output is required for parquet exports')
+
+        try:
+            records = export_queryset(
+                county=options['county'],
+                date_from=options['date_from'],
+                date_to=options['date_to'],
+                status=options['status'],
+                include_removed=options['include_removed'],
+            )
+            chunks = stream_export(records, export_format, chunk_size=options['chunk_size'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if export_format == 'parquet':
+            output = open(options['output'], 'wb')
+        elif options['output']:
+            # csv.writer already emits \r\n line endings
+            output = open(options['output'], 'w', encoding='utf-8', newline='')
+        else:
+            output = sys.stdout
+
+        try:
+            for chunk in chunks:
+                output.write(chunk)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+        if options['output']:
+            self.stderr.write(self.style.SUCCESS(f'Exported records to {options["output"]}'))
@@ -0,0 +1,21 @@
+from django.db.models import Sum
+from django.core.management.base import BaseCommand
+from scraper.models import HtmlBlob
+
+class Command(BaseCommand):
+    help = 'Delete stored page HTML that no scraping session points at any more'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted')
+
+    def handle(self, *args, **options):
+        orphans = HtmlBlob.orphans()
+        if options['dry_run']:
+            totals = orphans.aggregate(characters=Sum('length'))
+            self.stdout.write(
+                f'{orphans.count()} orphaned blobs ({totals["characters"] or 0} characters of HTML)'
+            )
+            return
+
+        deleted = HtmlBlob.prune()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} orphaned blobs'))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from scraper.models import SessionStats
+
+class Command(BaseCommand):
+    help = 'Recount the session statistics table from the sessions table'
+
+    def handle(self, *args, **options):
+        rows = SessionStats.rebuild()
+        totals = SessionStats.totals()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {rows} stats rows: {totals.sessions} sessions, {totals.success} successful'
+        ))
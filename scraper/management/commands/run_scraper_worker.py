@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from scraper.job_queue import ScrapingWorker
+
+class Command(BaseCommand):
+    help = 'Run a worker that drains pending scraping sessions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=None,
+                            help='Number of sessions to scrape in parallel (default: SCRAPER_WORKER_CONCURRENCY)')
+        parser.add_argument('--poll-interval', type=float, default=None,
+                            help='Seconds to wait between queue polls when idle (default: SCRAPER_WORKER_POLL_INTERVAL)')
+        parser.add_argument('--once', action='store_true',
+                            help='Drain the queue and exit instead of polling forever')
+
+    def handle(self, *args, **options):
+        worker = ScrapingWorker(
+            concurrency=options['concurrency'],
+            poll_interval=options['poll_interval'],
+        )
+        self.stdout.write(f'Starting scraping worker with concurrency {worker.concurrency}...')
+        worker.run(once=options['once'])
+        self.stdout.write(self.style.SUCCESS('Scraping worker stopped'))
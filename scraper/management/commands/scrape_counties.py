@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from scraper.counties import COUNTIES, validate_county
+from scraper.fanout import enqueue_counties, run_counties
+
+class Command(BaseCommand):
+    help = 'Scrape several counties at once, one session per county'
+
+    def add_arguments(self, parser):
+        parser.add_argument('counties', nargs='*', help='County slugs, e.g. dorchester charleston')
+        parser.add_argument('--all', action='store_true', help='Scrape every county in the registry')
+        parser.add_argument('--concurrency', type=int, default=None,
+                            help='Counties to scrape in parallel (default: SCRAPER_WORKER_CONCURRENCY)')
+        parser.add_argument('--queue', action='store_true',
+                            help='Only queue the sessions for run_scraper_worker')
+
+    def handle(self, *args, **options):
+        counties = list(COUNTIES) if options['all'] else options['counties']
+        if not counties:
+            raise CommandError('Give one or more counties, or --all')
+
+        try:
+            counties = [validate_county(county) for county in counties]
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['queue']:
+            sessions = enqueue_counties(counties)
+            self.stdout.write(self.style.SUCCESS(f'Queued {len(sessions)} county sessions'))
+            return
+
+        results = run_counties(counties, concurrency=options['concurrency'])
+        for session, success in results:
+            style = self.style.SUCCESS if success else self.style.WARNING
+            self.stdout.write(style(f'{session.county}: {session.status} ({session.session_id})'))
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingsession',
+            name='county',
+            field=models.CharField(choices=[('abbeville', 'Abbeville'), ('aiken', 'Aiken'), ('allendale', 'Allendale'), ('anderson', 'Anderson'), ('bamberg', 'Bamberg'), ('barnwell', 'Barnwell'), ('beaufort', 'Beaufort'), ('berkeley', 'Berkeley'), ('calhoun', 'Calhoun'), ('charleston', 'Charleston'), ('cherokee', 'Cherokee'), ('chester', 'Chester'), ('chesterfield', 'Chesterfield'), ('clarendon', 'Clarendon'), ('colleton', 'Colleton'), ('darlington', 'Darlington'), ('dillon', 'Dillon'), ('dorchester', 'Dorchester'), ('edgefield', 'Edgefield'), ('fairfield', 'Fairfield'), ('florence', 'Florence'), ('georgetown', 'Georgetown'), ('greenville', 'Greenville'), ('greenwood', 'Greenwood'), ('hampton', 'Hampton'), ('horry', 'Horry'), ('jasper', 'Jasper'), ('kershaw', 'Kershaw'), ('lancaster', 'Lancaster'), ('laurens', 'Laurens'), ('lee', 'Lee'), ('lexington', 'Lexington'), ('marion', 'Marion'), ('marlboro', 'Marlboro'), ('mccormick', 'McCormick'), ('newberry', 'Newberry'), ('oconee', 'Oconee'), ('orangeburg', 'Orangeburg'), ('pickens', 'Pickens'), ('richland', 'Richland'), ('saluda', 'Saluda'), ('spartanburg', 'Spartanburg'), ('sumter', 'Sumter'), ('union', 'Union'), ('williamsburg', 'Williamsburg'), ('york', 'York')], default='dorchester', max_length=50),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:34
+#
+# Adding the blob column, copying pages into blobs (0004) and dropping
+# raw_html (0005) are separate migrations: PostgreSQL refuses to alter a
+# table in the transaction that just updated its rows (pending trigger events).
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0002_scrapingsession_county'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HtmlBlob',
+            fields=[
+                ('digest', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('codec', models.CharField(max_length=10)),
+                ('data', models.BinaryField()),
+                ('length', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='scrapingsession',
+            name='html_blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='sessions', to='scraper.htmlblob'),
+        ),
+    ]
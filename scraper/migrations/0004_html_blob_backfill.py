@@ -0,0 +1,39 @@
+# Copy every session's page HTML into the blob store (see 0003)
+
+from django.db import migrations
+from scraper.blobs import compress, content_digest, decompress
+
+
+def move_html_to_blobs(apps, schema_editor):
+    """Copy every session's raw_html into a (deduplicated) compressed blob"""
+    ScrapingSession = apps.get_model('scraper', 'ScrapingSession')
+    HtmlBlob = apps.get_model('scraper', 'HtmlBlob')
+
+    sessions = ScrapingSession.objects.exclude(raw_html='').only('id', 'raw_html')
+    for session in sessions.iterator(chunk_size=100):
+        digest = content_digest(session.raw_html)
+        if not HtmlBlob.objects.filter(digest=digest).exists():
+            codec, data = compress(session.raw_html)
+            HtmlBlob.objects.create(digest=digest, codec=codec, data=data, length=len(session.raw_html))
+        ScrapingSession.objects.filter(pk=session.pk).update(html_blob_id=digest)
+
+
+def restore_html_from_blobs(apps, schema_editor):
+    ScrapingSession = apps.get_model('scraper', 'ScrapingSession')
+    HtmlBlob = apps.get_model('scraper', 'HtmlBlob')
+
+    for blob in HtmlBlob.objects.iterator(chunk_size=100):
+        ScrapingSession.objects.filter(html_blob_id=blob.digest).update(
+            raw_html=decompress(blob.codec, blob.data)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0003_html_blob_store'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_html_to_blobs, restore_html_from_blobs),
+    ]
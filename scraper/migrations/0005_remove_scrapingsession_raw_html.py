@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:34
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0004_html_blob_backfill'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='scrapingsession',
+            name='raw_html',
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:35
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0005_remove_scrapingsession_raw_html'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='scrapingsession',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='scrapingsession',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('success', 'Success'), ('failed', 'Failed'), ('blocked', 'Blocked')], db_index=True, default='pending', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='scrapingsession',
+            index=models.Index(fields=['status', 'created_at'], name='scraper_session_status_created'),
+        ),
+    ]
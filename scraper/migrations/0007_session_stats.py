@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:36
+
+from collections import Counter
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_session_stats(apps, schema_editor):
+    """Count existing sessions into the total and per-day rows"""
+    ScrapingSession = apps.get_model('scraper', 'ScrapingSession')
+    SessionStats = apps.get_model('scraper', 'SessionStats')
+
+    counts = Counter()
+    for status, created_at in ScrapingSession.objects.order_by().values_list('status', 'created_at').iterator():
+        for period in ('total', timezone.localdate(created_at).isoformat()):
+            counts[period, 'sessions'] += 1
+            counts[period, status] += 1
+
+    rows = {}
+    for (period, column), count in counts.items():
+        rows.setdefault(period, SessionStats(period=period))
+        setattr(rows[period], column, count)
+    SessionStats.objects.bulk_create(rows.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0006_session_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(max_length=10, unique=True)),
+                ('sessions', models.IntegerField(default=0)),
+                ('pending', models.IntegerField(default=0)),
+                ('running', models.IntegerField(default=0)),
+                ('success', models.IntegerField(default=0)),
+                ('failed', models.IntegerField(default=0)),
+                ('blocked', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'session stats',
+            },
+        ),
+        migrations.RunPython(backfill_session_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Full-text search indexes (SQLite FTS5) kept in sync by triggers
+
+from django.db import migrations
+from ._fts import drop_fts_trigger_sql, fts_rebuild_sql, fts_table_sql, fts_trigger_sql
+
+# name -> (content table, indexed columns)
+FTS_TABLES = {
+    'scraper_session_fts': ('scraper_scrapingsession', ['session_id', 'status', 'error_message']),
+    'scraper_record_fts': ('scraper_courtrecord', ['case_number', 'party_name']),
+}
+
+
+def fts_sql(name, table, columns):
+    return [
+        fts_table_sql(name, table, columns),
+        *fts_trigger_sql(name, table, columns),
+        # Index rows that already exist
+        fts_rebuild_sql(name),
+    ]
+
+
+def create_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for name, (table, columns) in FTS_TABLES.items():
+        for statement in fts_sql(name, table, columns):
+            schema_editor.execute(statement)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for name in FTS_TABLES:
+        for statement in drop_fts_trigger_sql(name):
+            schema_editor.execute(statement)
+        schema_editor.execute(f"DROP TABLE IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0007_session_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
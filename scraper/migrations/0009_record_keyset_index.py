@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0008_fulltext_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='courtrecord',
+            index=models.Index(fields=['created_at', 'id'], name='scraper_record_created_id'),
+        ),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:46
+
+from django.db import migrations, models
+import django.utils.timezone
+from scraper.record_keys import content_hash, record_key
+
+
+def backfill_record_keys(apps, schema_editor):
+    """Key and hash existing records; older duplicates of a key are marked removed"""
+    CourtRecord = apps.get_model('scraper', 'CourtRecord')
+    now = django.utils.timezone.now()
+
+    seen = set()
+    superseded = []
+    batch = []
+    records = (CourtRecord.objects
+               .select_related('session')
+               .order_by('-created_at', '-id')
+               .iterator(chunk_size=1000))
+    for record in records:
+        record.county = record.session.county
+        record.content_hash = content_hash({
+            'party_name': record.party_name,
+            'status': record.status,
+            'record_type': record.record_type,
+            'raw_data': record.raw_data,
+        })
+        record.updated_at = record.created_at
+        key = record_key(record.county, record.case_number, record.filing_date)
+        if key in seen:
+            # Newest row wins the key; earlier copies from older sessions stay as history
+            record.record_key = None
+            record.removed_at = now
+            superseded.append(record.pk)
+        else:
+            seen.add(key)
+            record.record_key = key
+        batch.append(record)
+
+        if len(batch) >= 1000:
+            CourtRecord.objects.bulk_update(batch, ['county', 'content_hash', 'updated_at', 'record_key', 'removed_at'])
+            batch = []
+
+    if batch:
+        CourtRecord.objects.bulk_update(batch, ['county', 'content_hash', 'updated_at', 'record_key', 'removed_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0009_record_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='courtrecord',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='courtrecord',
+            name='county',
+            field=models.CharField(choices=[('abbeville', 'Abbeville'), ('aiken', 'Aiken'), ('allendale', 'Allendale'), ('anderson', 'Anderson'), ('bamberg', 'Bamberg'), ('barnwell', 'Barnwell'), ('beaufort', 'Beaufort'), ('berkeley', 'Berkeley'), ('calhoun', 'Calhoun'), ('charleston', 'Charleston'), ('cherokee', 'Cherokee'), ('chester', 'Chester'), ('chesterfield', 'Chesterfield'), ('clarendon', 'Clarendon'), ('colleton', 'Colleton'), ('darlington', 'Darlington'), ('dillon', 'Dillon'), ('dorchester', 'Dorchester'), ('edgefield', 'Edgefield'), ('fairfield', 'Fairfield'), ('florence', 'Florence'), ('georgetown', 'Georgetown'), ('greenville', 'Greenville'), ('greenwood', 'Greenwood'), ('hampton', 'Hampton'), ('horry', 'Horry'), ('jasper', 'Jasper'), ('kershaw', 'Kershaw'), ('lancaster', 'Lancaster'), ('laurens', 'Laurens'), ('lee', 'Lee'), ('lexington', 'Lexington'), ('marion', 'Marion'), ('marlboro', 'Marlboro'), ('mccormick', 'McCormick'), ('newberry', 'Newberry'), ('oconee', 'Oconee'), ('orangeburg', 'Orangeburg'), ('pickens', 'Pickens'), ('richland', 'Richland'), ('saluda', 'Saluda'), ('spartanburg', 'Spartanburg'), ('sumter', 'Sumter'), ('union', 'Union'), ('williamsburg', 'Williamsburg'), ('york', 'York')], default='dorchester', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='courtrecord',
+            name='record_key',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='courtrecord',
+            name='removed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='courtrecord',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='courtrecord',
+            index=models.Index(fields=['county', 'removed_at'], name='scraper_record_county_active'),
+        ),
+        migrations.RunPython(backfill_record_keys, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='courtrecord',
+            name='record_key',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0010_record_upsert_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecordChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('county', models.CharField(choices=[('abbeville', 'Abbeville'), ('aiken', 'Aiken'), ('allendale', 'Allendale'), ('anderson', 'Anderson'), ('bamberg', 'Bamberg'), ('barnwell', 'Barnwell'), ('beaufort', 'Beaufort'), ('berkeley', 'Berkeley'), ('calhoun', 'Calhoun'), ('charleston', 'Charleston'), ('cherokee', 'Cherokee'), ('chester', 'Chester'), ('chesterfield', 'Chesterfield'), ('clarendon', 'Clarendon'), ('colleton', 'Colleton'), ('darlington', 'Darlington'), ('dillon', 'Dillon'), ('dorchester', 'Dorchester'), ('edgefield', 'Edgefield'), ('fairfield', 'Fairfield'), ('florence', 'Florence'), ('georgetown', 'Georgetown'), ('greenville', 'Greenville'), ('greenwood', 'Greenwood'), ('hampton', 'Hampton'), ('horry', 'Horry'), ('jasper', 'Jasper'), ('kershaw', 'Kershaw'), ('lancaster', 'Lancaster'), ('laurens', 'Laurens'), ('lee', 'Lee'), ('lexington', 'Lexington'), ('marion', 'Marion'), ('marlboro', 'Marlboro'), ('mccormick', 'McCormick'), ('newberry', 'Newberry'), ('oconee', 'Oconee'), ('orangeburg', 'Orangeburg'), ('pickens', 'Pickens'), ('richland', 'Richland'), ('saluda', 'Saluda'), ('spartanburg', 'Spartanburg'), ('sumter', 'Sumter'), ('union', 'Union'), ('williamsburg', 'Williamsburg'), ('york', 'York')], default='dorchester', max_length=50)),
+                ('change_type', models.CharField(choices=[('added', 'Added'), ('removed', 'Removed'), ('modified', 'Modified')], max_length=10)),
+                ('record_key', models.CharField(max_length=64)),
+                ('case_number', models.CharField(blank=True, max_length=100)),
+                ('filing_date', models.DateField(blank=True, null=True)),
+                ('changes', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='scraper.scrapingsession')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['county', 'id'], name='scraper_change_county_id')],
+            },
+        ),
+    ]
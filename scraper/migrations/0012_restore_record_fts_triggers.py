@@ -0,0 +1,19 @@
+# 0010 rebuilt scraper_courtrecord on SQLite (new columns, unique
+# record_key), which dropped the search triggers created in 0008: records
+# saved since then never reached the index. Recreate them and reindex.
+
+from django.db import migrations
+from ._fts import recreate_fts_triggers
+
+RECORD_FTS = ('scraper_record_fts', 'scraper_courtrecord', ['case_number', 'party_name'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0011_record_changes'),
+    ]
+
+    operations = [
+        migrations.RunPython(recreate_fts_triggers(*RECORD_FTS), migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:19
+
+from django.db import migrations, models
+from ._fts import recreate_fts_triggers
+
+RECORD_FTS = ('scraper_record_fts', 'scraper_courtrecord', ['case_number', 'party_name'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0012_restore_record_fts_triggers'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='courtrecord',
+            name='scraper_record_county_active',
+        ),
+        migrations.AddField(
+            model_name='courtrecord',
+            name='roster',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='recordchange',
+            name='roster',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='courtrecord',
+            index=models.Index(fields=['county', 'roster', 'removed_at'], name='scraper_record_roster_active'),
+        ),
+        # Adding roster rebuilds scraper_courtrecord on SQLite, dropping its search triggers
+        migrations.RunPython(recreate_fts_triggers(*RECORD_FTS), migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0013_record_rosters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingsession',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0014_session_claimed_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingsession',
+            name='roster_results',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+from ._fts import recreate_fts_triggers
+
+RECORD_FTS = ('scraper_record_fts', 'scraper_courtrecord', ['case_number', 'party_name'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0015_session_roster_results'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='courtrecord',
+            name='session',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='records', to='scraper.scrapingsession'),
+        ),
+        migrations.AlterField(
+            model_name='recordchange',
+            name='session',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='changes', to='scraper.scrapingsession'),
+        ),
+        # Making session nullable rebuilds scraper_courtrecord on SQLite, dropping its search triggers
+        migrations.RunPython(recreate_fts_triggers(*RECORD_FTS), migrations.RunPython.noop),
+    ]
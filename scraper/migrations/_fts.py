@@ -0,0 +1,49 @@
+# SQLite FTS5 DDL shared by the full-text search migrations
+#
+# SQLite can't alter most columns in place, so Django rebuilds the table
+# (create new, copy, drop old, rename) and the triggers on the old table go
+# with it. A migration that rebuilds an indexed table recreates its
+# triggers with recreate_fts_triggers() afterwards.
+
+
+def fts_table_sql(name, table, columns):
+    # External-content table: the index only, text stays in the model table.
+    # '-' is a token character so case numbers like 2025-CV-0001 stay whole
+    return (f"CREATE VIRTUAL TABLE {name} USING fts5({', '.join(columns)}, content='{table}', content_rowid='id', "
+            f"tokenize=\"unicode61 remove_diacritics 2 tokenchars '-'\", prefix='2 3')")
+
+
+def fts_trigger_sql(name, table, columns):
+    """Triggers that mirror inserts, deletes and updates of table into name"""
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+    return [
+        f"CREATE TRIGGER {name}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {name}(rowid, {column_list}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER {name}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {name}({name}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER {name}_au AFTER UPDATE OF {column_list} ON {table} BEGIN "
+        f"INSERT INTO {name}({name}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {name}(rowid, {column_list}) VALUES (new.id, {new_values}); END",
+    ]
+
+
+def drop_fts_trigger_sql(name):
+    return [f"DROP TRIGGER IF EXISTS {name}_{suffix}" for suffix in ('ai', 'ad', 'au')]
+
+
+def fts_rebuild_sql(name):
+    """Reindex every row of the content table"""
+    return f"INSERT INTO {name}({name}) VALUES ('rebuild')"
+
+
+def recreate_fts_triggers(name, table, columns):
+    """RunPython function that restores name's triggers and reindexes table"""
+    def recreate(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in drop_fts_trigger_sql(name) + fts_trigger_sql(name, table, columns):
+            schema_editor.execute(statement)
+        schema_editor.execute(fts_rebuild_sql(name))
+    return recreate
@@ -1,5 +1,92 @@
-from django.db import models
+import logging
+from collections import Counter
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Length, Substr
 from django.utils import timezone
+from .blobs import compress, content_digest, decompress, decompress_prefix
+from .counties import COUNTY_CHOICES, DEFAULT_COUNTY
+from .events import publish_session_status
+
+logger = logging.getLogger(__name__)
+
+class HtmlBlob(models.Model):
+    """Compressed page HTML, stored once per distinct content"""
+    
+    digest = models.CharField(max_length=64, primary_key=True)
+    codec = models.CharField(max_length=10)
+    data = models.BinaryField()
+    length = models.IntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    @classmethod
+    def store(cls, html):
+        """Return the blob for this HTML, creating it only if the content is new"""
+        digest = content_digest(html)
+        blob = cls.objects.filter(digest=digest).only('digest', 'length').first()
+        if blob is None:
+            codec, data = compress(html)
+            blob, _ = cls.objects.get_or_create(
+                digest=digest,
+                defaults={'codec': codec, 'data': data, 'length': len(html)},
+            )
+        return blob
+    
+    @property
+    def text(self):
+        return decompress(self.codec, self.data)
+    
+    @classmethod
+    def orphans(cls, digests=None):
+        """Blobs no session points at (only among `digests`, if given)"""
+        blobs = cls.objects.filter(sessions__isnull=True)
+        if digests is not None:
+            blobs = blobs.filter(digest__in=list(digests))
+        return blobs
+    
+    @classmethod
+    def prune(cls, digests=None):
+        """Delete orphaned blobs; returns how many were deleted"""
+        deleted, _ = cls.orphans(digests).delete()
+        return deleted
+    
+    @classmethod
+    def preview(cls, digest, max_chars, chunk_size=16 * 1024):
+        """The first max_chars characters of a page, reading only a prefix of its blob
+        
+        The compressed bytes are sliced in the database with Substr and
+        decompressed as a stream; the slice doubles until it holds enough text.
+        """
+        size = chunk_size
+        while True:
+            blob = (cls.objects
+                    .filter(digest=digest)
+                    .annotate(head=Substr('data', 1, size), stored=Length('data'))
+                    .values('codec', 'head', 'stored', 'length')
+                    .first())
+            if blob is None:
+                return ''
+            text, complete = decompress_prefix(blob['codec'], blob['head'], max_chars)
+            if complete or size >= blob['stored']:
+                return text
+            size *= 2
+    
+    def __str__(self):
+        return f"{self.digest[:12]} ({self.length} characters)"
+
+# Marks a session whose status wasn't loaded, so a transition can't be counted
+STATUS_UNKNOWN = object()
+
+class ScrapingSessionQuerySet(models.QuerySet):
+    # Columns the listing templates (home, dashboard, sessions list) render
+    LISTING_FIELDS = [
+        'session_id', 'county', 'status', 'created_at', 'updated_at', 'ip_address', 'error_message',
+        'forms_count', 'inputs_count', 'selects_count', 'links_count', 'scripts_count',
+    ]
+    
+    def for_listing(self):
+        """Sessions without the heavy columns (parsed data, page HTML)"""
+        return self.only(*self.LISTING_FIELDS)
 
 class ScrapingSession(models.Model):
     """Model to store scraping sessions and results"""
@@ -13,12 +100,16 @@ class ScrapingSession(models.Model):
     ]
     
     session_id = models.CharField(max_length=100, unique=True)
-    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
-    created_at = models.DateTimeField(default=timezone.now)
+    county = models.CharField(max_length=50, choices=COUNTY_CHOICES, default=DEFAULT_COUNTY)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', db_index=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
     error_message = models.TextField(blank=True)
+    # When a worker claimed the running session, refreshed as the scrape makes
+    # progress; a running session whose claim is too old is reclaimed (job_queue)
+    claimed_at = models.DateTimeField(null=True, blank=True)
     
     # Scraping results
     forms_count = models.IntegerField(default=0)
@@ -28,29 +119,247 @@ class ScrapingSession(models.Model):
     scripts_count = models.IntegerField(default=0)
     
     # Raw data
-    raw_html = models.TextField(blank=True)
+    html_blob = models.ForeignKey(HtmlBlob, on_delete=models.PROTECT, null=True, blank=True, related_name='sessions')
     parsed_data = models.JSONField(default=dict, blank=True)
+    # Roster crawl outcome: roster -> sync counts, or {'error': ...} for a
+    # roster that couldn't be fetched or synced (None if no crawl ran)
+    roster_results = models.JSONField(null=True, blank=True)
+    
+    objects = ScrapingSessionQuerySet.as_manager()
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='scraper_session_status_created'),
+        ]
     
     def __str__(self):
         return f"Session {self.session_id} - {self.status}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Status as loaded, so save() can tell whether it changed
+        instance._loaded_status = instance.__dict__.get('status', STATUS_UNKNOWN)
+        return instance
+    
+    def save(self, *args, **kwargs):
+        previous = None if self._state.adding else getattr(self, '_loaded_status', STATUS_UNKNOWN)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if previous is not STATUS_UNKNOWN and previous != self.status:
+                SessionStats.record_transition(previous, self.status, self.created_at)
+                publish_session_status(self)
+        self._loaded_status = self.status
+    
+    def heartbeat(self):
+        """Refresh the claim of a running session, so it isn't taken for abandoned"""
+        self.claimed_at = timezone.now()
+        ScrapingSession.objects.filter(pk=self.pk, status='running').update(claimed_at=self.claimed_at)
+    
+    @property
+    def raw_html(self):
+        """Page HTML, decompressed from the session's blob on first access"""
+        if self.html_blob_id is None:
+            return ''
+        if not hasattr(self, '_raw_html'):
+            self._raw_html = self.html_blob.text
+        return self._raw_html
+    
+    @property
+    def raw_html_length(self):
+        return self.html_blob.length if self.html_blob_id else 0
+    
+    def set_raw_html(self, html):
+        """Point the session at the (possibly shared) blob for this HTML"""
+        self.html_blob = HtmlBlob.store(html) if html else None
+        self._raw_html = html or ''
+
+def release_html_blob(sender, instance, **kwargs):
+    """post_delete: drop the deleted session's blob once no session uses it
+    
+    Runs after commit, so sessions deleted together that share a page are
+    all gone before the blob is checked. prune_html_blobs sweeps up blobs
+    orphaned any other way (raw SQL deletes, sessions pointed at a new page).
+    """
+    # A deferred column can't be loaded from a deleted row; prune_html_blobs gets those
+    digest = instance.__dict__.get('html_blob_id')
+    if digest:
+        transaction.on_commit(lambda: HtmlBlob.prune([digest]))
+
+def release_session_stats(sender, instance, **kwargs):
+    """post_delete: take the deleted session out of SessionStats"""
+    status = instance.__dict__.get('status')
+    created_at = instance.__dict__.get('created_at')
+    if status is None or created_at is None:
+        # Deferred fields can't be loaded from a deleted row
+        logger.warning(f"Session {instance.pk} deleted without its status loaded; "
+                       f"run rebuild_session_stats to recount")
+        return
+    SessionStats.record_removal(status, created_at)
 
 class CourtRecord(models.Model):
-    """Model to store individual court records"""
+    """Model to store individual court records
+    
+    One row per (county, case number, hearing date), kept up to date by
+    records.sync_court_records: `session` is the session that last created
+    or changed the row, `roster` the roster it was last listed on ('' for
+    the county's landing page), and rows missing from a later scrape of
+    that roster get removed_at. Records belong to their county, not to a
+    session: deleting the session only clears `session`.
+    """
     
-    session = models.ForeignKey(ScrapingSession, on_delete=models.CASCADE, related_name='records')
+    session = models.ForeignKey(ScrapingSession, on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='records')
+    county = models.CharField(max_length=50, choices=COUNTY_CHOICES, default=DEFAULT_COUNTY)
+    roster = models.CharField(max_length=100, blank=True, default='')
     record_type = models.CharField(max_length=100, blank=True)
     case_number = models.CharField(max_length=100, blank=True)
     party_name = models.CharField(max_length=200, blank=True)
     filing_date = models.DateField(null=True, blank=True)
     status = models.CharField(max_length=100, blank=True)
     raw_data = models.JSONField(default=dict, blank=True)
+    # sha256 of the natural key, and of the content (see record_keys)
+    record_key = models.CharField(max_length=64, unique=True, null=True, blank=True)
+    content_hash = models.CharField(max_length=64, blank=True)
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(default=timezone.now)
+    removed_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination order
+            models.Index(fields=['created_at', 'id'], name='scraper_record_created_id'),
+            # Active records of a roster (removal sweep)
+            models.Index(fields=['county', 'roster', 'removed_at'], name='scraper_record_roster_active'),
+        ]
+    
+    @property
+    def is_removed(self):
+        return self.removed_at is not None
     
     def __str__(self):
-        return f"{self.record_type} - {self.party_name}"
\ No newline at end of file
+        return f"{self.record_type} - {self.party_name}"
+
+class RecordChange(models.Model):
+    """One added / removed / modified court record, as seen by a sync
+    
+    Written by records.sync_court_records when a roster is compared with
+    its previous snapshot, and read in id order by the change
+    feed. `changes` holds the new content for an added record, the last
+    content for a removed one, and {field: [old, new]} for a modified one.
+    """
+    
+    ADDED = 'added'
+    REMOVED = 'removed'
+    MODIFIED = 'modified'
+    CHANGE_CHOICES = [
+        (ADDED, 'Added'),
+        (REMOVED, 'Removed'),
+        (MODIFIED, 'Modified'),
+    ]
+    
+    # The change history outlives the session that observed it
+    session = models.ForeignKey(ScrapingSession, on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='changes')
+    county = models.CharField(max_length=50, choices=COUNTY_CHOICES, default=DEFAULT_COUNTY)
+    roster = models.CharField(max_length=100, blank=True, default='')
+    change_type = models.CharField(max_length=10, choices=CHANGE_CHOICES)
+    record_key = models.CharField(max_length=64)
+    case_number = models.CharField(max_length=100, blank=True)
+    filing_date = models.DateField(null=True, blank=True)
+    changes = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # Change feed filtered by county
+            models.Index(fields=['county', 'id'], name='scraper_change_county_id'),
+        ]
+    
+    def __str__(self):
+        return f"{self.change_type} {self.case_number} ({self.county})"
+
+class SessionStats(models.Model):
+    """Session counters per status, kept up to date as sessions change status
+    
+    One row holds the all-time totals (period 'total') and one row per day
+    (period 'YYYY-MM-DD', by session creation date), so dashboards read a
+    single row instead of counting the sessions table.
+    
+    Saves and deletes through the ORM keep the counters right (queryset
+    deletes included: they send post_delete for every session). Changes
+    that bypass the ORM's signals, such as raw SQL, QuerySet.update() of
+    status or QuerySet._raw_delete(), need a rebuild() afterwards
+    (manage.py rebuild_session_stats).
+    """
+    
+    TOTAL = 'total'
+    
+    period = models.CharField(max_length=10, unique=True)
+    sessions = models.IntegerField(default=0)
+    pending = models.IntegerField(default=0)
+    running = models.IntegerField(default=0)
+    success = models.IntegerField(default=0)
+    failed = models.IntegerField(default=0)
+    blocked = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = 'session stats'
+    
+    def __str__(self):
+        return f"{self.period}: {self.success}/{self.sessions} successful"
+    
+    @classmethod
+    def day_period(cls, created_at):
+        return timezone.localdate(created_at).isoformat()
+    
+    @classmethod
+    def record_transition(cls, previous, status, created_at):
+        """Move one session from `previous` (None for a new session) to `status`"""
+        changes = {status: F(status) + 1}
+        if previous is None:
+            changes['sessions'] = F('sessions') + 1
+        else:
+            changes[previous] = F(previous) - 1
+        
+        cls.apply(changes, created_at)
+    
+    @classmethod
+    def record_removal(cls, status, created_at):
+        """Take one deleted session out of the counters"""
+        cls.apply({'sessions': F('sessions') - 1, status: F(status) - 1}, created_at)
+    
+    @classmethod
+    def apply(cls, changes, created_at):
+        for period in (cls.TOTAL, cls.day_period(created_at)):
+            cls.objects.get_or_create(period=period)
+            cls.objects.filter(period=period).update(**changes)
+    
+    @classmethod
+    def totals(cls):
+        """All-time counters (an empty, unsaved row if nothing was recorded yet)"""
+        return cls.objects.filter(period=cls.TOTAL).first() or cls(period=cls.TOTAL)
+    
+    @classmethod
+    def rebuild(cls):
+        """Recount every row from the sessions table"""
+        counts = Counter()
+        sessions = ScrapingSession.objects.order_by().values_list('status', 'created_at')
+        for status, created_at in sessions.iterator():
+            for period in (cls.TOTAL, cls.day_period(created_at)):
+                counts[period, 'sessions'] += 1
+                counts[period, status] += 1
+        
+        rows = {}
+        for (period, column), count in counts.items():
+            rows.setdefault(period, cls(period=period))
+            setattr(rows[period], column, count)
+        
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(rows.values())
+        return len(rows)
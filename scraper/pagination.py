@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Keyset (cursor) pagination on (created_at, id), newest first
+
+Each page is one indexed range query: there is no OFFSET and no
+COUNT(*) (unless the caller asks for a total), so page 10,000 costs the
+same as page 1. Cursors are opaque, URL-safe tokens that encode the
+boundary row and the direction to read in.
+"""
+
+import json
+import base64
+from datetime import datetime
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(item, direction):
+    payload = json.dumps({'t': item.created_at.isoformat(), 'id': item.pk, 'd': direction}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (created_at, id, direction); ValueError for a malformed cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        created_at = datetime.fromisoformat(payload['t'])
+        pk = int(payload['id'])
+        direction = payload['d']
+    except (ValueError, KeyError, TypeError, UnicodeEncodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if direction not in ('next', 'prev'):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return created_at, pk, direction
+
+
+def page_size_from(value, default=DEFAULT_PAGE_SIZE):
+    try:
+        return min(max(int(value), 1), MAX_PAGE_SIZE)
+    except (TypeError, ValueError):
+        return default
+
+
+class KeysetPage:
+    """One page of results plus cursors for the pages either side"""
+
+    def __init__(self, items, next_cursor=None, previous_cursor=None, total=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.total = total
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+def keyset_slice(queryset, cursor, page_size):
+    """The bounded, ordered query for the page `cursor` points at, and its direction"""
+    if not cursor:
+        return queryset.order_by('-created_at', '-id')[:page_size + 1], 'next', False
+
+    created_at, pk, direction = decode_cursor(cursor)
+    if direction == 'next':
+        # Rows older than the boundary, newest first
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+        return queryset.order_by('-created_at', '-id')[:page_size + 1], direction, True
+
+    # Rows newer than the boundary: read them oldest first, then flip
+    queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+    return queryset.order_by('created_at', 'id')[:page_size + 1], direction, True
+
+
+def keyset_page(rows, direction, has_cursor, page_size, total=None):
+    more = len(rows) > page_size
+    if direction == 'next':
+        items = rows[:page_size]
+        has_next, has_previous = more, has_cursor
+    else:
+        items = list(reversed(rows[:page_size]))
+        has_next, has_previous = True, more
+
+    return KeysetPage(
+        items,
+        next_cursor=encode_cursor(items[-1], 'next') if items and has_next else None,
+        previous_cursor=encode_cursor(items[0], 'prev') if items and has_previous else None,
+        total=total,
+    )
+
+
+def paginate(queryset, cursor=None, page_size=DEFAULT_PAGE_SIZE, with_total=False):
+    """Return the KeysetPage of queryset (newest first) that `cursor` points at"""
+    total = queryset.count() if with_total else None
+    rows, direction, has_cursor = keyset_slice(queryset, cursor, page_size)
+    return keyset_page(list(rows), direction, has_cursor, page_size, total)
+
+
+async def apaginate(queryset, cursor=None, page_size=DEFAULT_PAGE_SIZE, with_total=False):
+    """paginate() for async views, using the async ORM"""
+    total = await queryset.acount() if with_total else None
+    rows, direction, has_cursor = keyset_slice(queryset, cursor, page_size)
+    return keyset_page([row async for row in rows], direction, has_cursor, page_size, total)
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+HTML parser backends for SCCourtsScraperService.parse_content
+
+Both backends return the same dict (forms, inputs, selects, links, scripts,
+tables, title, meta_description). The lxml backend walks the tree once; the
+BeautifulSoup backend is kept as the reference implementation and as a
+fallback when lxml is not installed.
+"""
+
+import logging
+from bs4 import BeautifulSoup
+from django.conf import settings
+
+try:
+    from lxml import etree
+except ImportError:  # pragma: no cover - lxml is optional
+    etree = None
+
+logger = logging.getLogger(__name__)
+
+if etree is not None:
+    VISIBLE_TEXT = etree.XPath('.//text()[not(ancestor::script or ancestor::style or ancestor::template)]')
+
+
+class BeautifulSoupParser:
+    """Reference parser built on BeautifulSoup's html.parser"""
+
+    name = 'html.parser'
+
+    def parse(self, html_content):
+        soup = BeautifulSoup(html_content, 'html.parser')
+
+        # Extract forms
+        forms = []
+        for form in soup.find_all('form'):
+            form_data = {
+                'action': form.get('action', ''),
+                'method': form.get('method', ''),
+                'id': form.get('id', ''),
+                'class': form.get('class', []),
+                'inputs': []
+            }
+
+            # Extract form inputs
+            for input_tag in form.find_all('input'):
+                form_data['inputs'].append(self.input_data(input_tag))
+
+            forms.append(form_data)
+
+        # Extract all inputs
+        inputs = [self.input_data(input_tag) for input_tag in soup.find_all('input')]
+
+        # Extract select elements
+        selects = []
+        for select in soup.find_all('select'):
+            select_data = {
+                'name': select.get('name', ''),
+                'id': select.get('id', ''),
+                'class': select.get('class', []),
+                'options': []
+            }
+
+            for option in select.find_all('option'):
+                option_data = {
+                    'value': option.get('value', ''),
+                    'text': option.get_text(strip=True),
+                    'selected': option.get('selected') is not None
+                }
+                select_data['options'].append(option_data)
+
+            selects.append(select_data)
+
+        # Extract links
+        links = []
+        for link in soup.find_all('a'):
+            link_data = {
+                'href': link.get('href', ''),
+                'text': link.get_text(strip=True),
+                'id': link.get('id', ''),
+                'class': link.get('class', [])
+            }
+            links.append(link_data)
+
+        # Extract scripts
+        scripts = []
+        for script in soup.find_all('script'):
+            content = script.get_text(strip=True)
+            script_data = {
+                'src': script.get('src', ''),
+                'type': script.get('type', ''),
+                'content': content[:500] if content else ''
+            }
+            scripts.append(script_data)
+
+        # Extract tables (row counts include nested tables, like find_all)
+        tables = []
+        for table in soup.find_all('table'):
+            rows = table.find_all('tr')
+            tables.append({
+                'id': table.get('id', ''),
+                'class': table.get('class', []),
+                'rows': len(rows),
+                'first_row': rows[0].get_text(strip=True)[:100] if rows else ''
+            })
+
+        meta_description = soup.find('meta', attrs={'name': 'description'})
+
+        return {
+            'forms': forms,
+            'inputs': inputs,
+            'selects': selects,
+            'links': links,
+            'scripts': scripts,
+            'tables': tables,
+            'title': soup.title.get_text(strip=True) if soup.title else '',
+            'meta_description': meta_description.get('content', '') if meta_description else ''
+        }
+
+    def input_data(self, input_tag):
+        return {
+            'type': input_tag.get('type', ''),
+            'name': input_tag.get('name', ''),
+            'value': input_tag.get('value', ''),
+            'id': input_tag.get('id', ''),
+            'class': input_tag.get('class', [])
+        }
+
+
+class LxmlParser:
+    """Single-pass parser built on lxml's HTML parser"""
+
+    name = 'lxml'
+
+    def parse(self, html_content):
+        root = self.build_tree(html_content)
+
+        forms = []
+        inputs = []
+        selects = []
+        links = []
+        scripts = []
+        tables = []
+        title = None
+        meta_description = None
+
+        # Open <form>/<select>/<table> elements, so nested inputs/options/rows
+        # land in the right parent without re-searching each subtree
+        open_forms = []
+        open_selects = []
+        open_tables = []
+
+        if root is not None:
+            for event, element in etree.iterwalk(root, events=('start', 'end')):
+                tag = element.tag
+                if not isinstance(tag, str):
+                    # Comments and processing instructions
+                    continue
+
+                if event == 'end':
+                    if tag == 'form':
+                        open_forms.pop()
+                    elif tag == 'select':
+                        open_selects.pop()
+                    elif tag == 'table':
+                        open_tables.pop()
+                    continue
+
+                if tag == 'input':
+                    input_data = self.input_data(element)
+                    inputs.append(input_data)
+                    for form_data in open_forms:
+                        form_data['inputs'].append(dict(input_data))
+                elif tag == 'option':
+                    option_data = {
+                        'value': element.get('value', ''),
+                        'text': self.text(element),
+                        'selected': element.get('selected') is not None
+                    }
+                    for select_data in open_selects:
+                        select_data['options'].append(dict(option_data))
+                elif tag == 'a':
+                    links.append({
+                        'href': element.get('href', ''),
+                        'text': self.text(element),
+                        'id': element.get('id', ''),
+                        'class': self.classes(element)
+                    })
+                elif tag == 'form':
+                    form_data = {
+                        'action': element.get('action', ''),
+                        'method': element.get('method', ''),
+                        'id': element.get('id', ''),
+                        'class': self.classes(element),
+                        'inputs': []
+                    }
+                    forms.append(form_data)
+                    open_forms.append(form_data)
+                elif tag == 'select':
+                    select_data = {
+                        'name': element.get('name', ''),
+                        'id': element.get('id', ''),
+                        'class': self.classes(element),
+                        'options': []
+                    }
+                    selects.append(select_data)
+                    open_selects.append(select_data)
+                elif tag == 'table':
+                    table_data = {
+                        'id': element.get('id', ''),
+                        'class': self.classes(element),
+                        'rows': 0,
+                        'first_row': None
+                    }
+                    tables.append(table_data)
+                    open_tables.append(table_data)
+                elif tag == 'tr':
+                    for table_data in open_tables:
+                        table_data['rows'] += 1
+                        if table_data['first_row'] is None:
+                            table_data['first_row'] = self.text(element)[:100]
+                elif tag == 'script':
+                    content = self.text(element)
+                    scripts.append({
+                        'src': element.get('src', ''),
+                        'type': element.get('type', ''),
+                        'content': content[:500] if content else ''
+                    })
+                elif tag == 'title' and title is None:
+                    title = self.text(element)
+                elif tag == 'meta' and meta_description is None and element.get('name') == 'description':
+                    meta_description = element.get('content', '')
+
+        for table_data in tables:
+            table_data['first_row'] = table_data['first_row'] or ''
+
+        return {
+            'forms': forms,
+            'inputs': inputs,
+            'selects': selects,
+            'links': links,
+            'scripts': scripts,
+            'tables': tables,
+            'title': title or '',
+            'meta_description': meta_description or ''
+        }
+
+    def build_tree(self, html_content):
+        parser = etree.HTMLParser()
+        try:
+            return etree.fromstring(html_content, parser)
+        except ValueError:
+            # Unicode strings with an encoding declaration must be passed as bytes
+            return etree.fromstring(html_content.encode('utf-8'), parser)
+
+    def input_data(self, element):
+        return {
+            'type': element.get('type', ''),
+            'name': element.get('name', ''),
+            'value': element.get('value', ''),
+            'id': element.get('id', ''),
+            'class': self.classes(element)
+        }
+
+    def classes(self, element):
+        return element.get('class', '').split()
+
+    def text(self, element):
+        """Equivalent of BeautifulSoup's get_text(strip=True)"""
+        if element.tag in ('script', 'style', 'template'):
+            return (element.text or '').strip()
+        # BeautifulSoup leaves script/style/template strings out of get_text()
+        return ''.join(part.strip() for part in VISIBLE_TEXT(element))
+
+
+PARSER_BACKENDS = {
+    BeautifulSoupParser.name: BeautifulSoupParser,
+    LxmlParser.name: LxmlParser,
+}
+
+
+def get_parser(backend=None):
+    """Return a parser instance for the given (or configured) backend"""
+    backend = backend or getattr(settings, 'SCRAPER_PARSER_BACKEND', LxmlParser.name)
+
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend: {backend}")
+
+    if backend == LxmlParser.name and etree is None:
+        logger.warning("lxml is not installed, falling back to html.parser")
+        backend = BeautifulSoupParser.name
+
+    return PARSER_BACKENDS[backend]()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Cached, pre-compressed JSON payloads for api_session_data
+
+A successful session's data never changes, so its JSON is serialized and
+compressed once and kept in the Django cache, keyed by session and
+updated_at (any save moves the key). Only the compressed variants of a
+body are stored (identity is decompressed from gzip when asked for), and
+payloads over SCRAPER_PAYLOAD_CACHE_MAX_BYTES aren't cached at all, so a
+few large sessions can't fill the cache. The strong ETag is the SHA-256 of
+the serialized body; compressed variants carry an encoding suffix, as each
+is a different representation.
+"""
+
+import gzip
+import json
+import hashlib
+import logging
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Bodies smaller than this aren't worth compressing
+MIN_COMPRESS_SIZE = 512
+
+
+def payload_cache():
+    return caches[getattr(settings, 'SCRAPER_PAYLOAD_CACHE', 'default')]
+
+
+def cache_key(session):
+    return f"session-data:{session.session_id}:{session.updated_at.timestamp()}"
+
+
+def session_payload(session):
+    return {
+        'session_id': session.session_id,
+        'status': session.status,
+        'parsed_data': session.parsed_data,
+        'forms_count': session.forms_count,
+        'inputs_count': session.inputs_count,
+        'selects_count': session.selects_count,
+        'links_count': session.links_count,
+        'scripts_count': session.scripts_count,
+    }
+
+
+def build_payload(session):
+    """Content hash of the serialized body and the body in its stored encodings
+
+    Small bodies are kept as they are; larger ones only compressed.
+    """
+    body = json.dumps(session_payload(session), cls=DjangoJSONEncoder).encode('utf-8')
+    if len(body) < MIN_COMPRESS_SIZE:
+        encodings = {'identity': body}
+    else:
+        encodings = {'gzip': gzip.compress(body, compresslevel=6, mtime=0)}
+        if brotli is not None:
+            encodings['br'] = brotli.compress(body)
+    return {
+        'digest': hashlib.sha256(body).hexdigest(),
+        'encodings': encodings,
+    }
+
+
+def payload_body(payload, encoding):
+    """Body in the given encoding (one negotiate_encoding() picked)"""
+    encodings = payload['encodings']
+    if encoding in encodings:
+        return encodings[encoding]
+    return gzip.decompress(encodings['gzip'])
+
+
+def is_cacheable(payload):
+    size = sum(len(body) for body in payload['encodings'].values())
+    return size <= getattr(settings, 'SCRAPER_PAYLOAD_CACHE_MAX_BYTES', 128 * 1024)
+
+
+def get_payload(session, load_session):
+    """Cached payload for a session; load_session() fetches the full row on a miss"""
+    cache = payload_cache()
+    key = cache_key(session)
+    payload = cache.get(key)
+    if payload is None:
+        payload = build_payload(load_session())
+        if is_cacheable(payload):
+            cache.set(key, payload, getattr(settings, 'SCRAPER_PAYLOAD_CACHE_TIMEOUT', 24 * 60 * 60))
+    return payload
+
+
+async def aget_payload(session, load_session):
+    """get_payload() for async views; load_session is a coroutine function"""
+    cache = payload_cache()
+    key = cache_key(session)
+    payload = await cache.aget(key)
+    if payload is None:
+        payload = build_payload(await load_session())
+        if is_cacheable(payload):
+            await cache.aset(key, payload, getattr(settings, 'SCRAPER_PAYLOAD_CACHE_TIMEOUT', 24 * 60 * 60))
+    return payload
+
+
+def etag_for(digest, encoding):
+    if encoding == 'identity':
+        return f'"{digest}"'
+    return f'"{digest}-{encoding}"'
+
+
+def etag_matches(if_none_match, digest):
+    """If-None-Match uses weak comparison: any encoding of the same content matches"""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag == '*':
+            return True
+        tag = tag.removeprefix('W/').strip('"')
+        if tag.split('-', 1)[0] == digest:
+            return True
+    return False
+
+
+def negotiate_encoding(accept_encoding, available):
+    """Best encoding the client accepts among those we have (br > gzip > identity)"""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name] = quality
+
+    for encoding in ('br', 'gzip'):
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if encoding in available and quality > 0:
+            return encoding
+    return 'identity'
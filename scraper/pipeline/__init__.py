@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Fetch -> detect -> parse -> store pipeline shared by every entry point
+
+The scraper service, the multi-county fan-out and the standalone scripts
+all build their scraping from these stages, so session setup, fetching
+and parsing live in one place. The core and the standard stages don't
+need Django; the Django store stage lives in pipeline.store.
+"""
+
+from .core import DEFAULT_QUEUE_SIZE, PageJob, Pipeline, Stage
+from .stages import (BLOCK_MARKERS, DetectStage, FetchStage, ParseStage, SaveHtmlStage,
+                     page_pipeline_stages)
+
+
+def page_pipeline(extra_stages=(), queue_size=DEFAULT_QUEUE_SIZE, **options):
+    """Pipeline of the standard page stages plus any extra (store) stages"""
+    return Pipeline(page_pipeline_stages(**options) + list(extra_stages), queue_size=queue_size)
+
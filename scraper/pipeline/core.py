@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Pipeline core: jobs, stages and the threaded runner
+
+A Pipeline is a list of stages. run_one() takes a single job through them
+on the calling thread. run() streams many jobs: every stage gets its own
+worker threads and a bounded input queue, so a slow stage (say, fetching)
+holds back the stages before it instead of piling up pages in memory, and
+a CPU-bound stage (parsing) works on one page while the next is fetched.
+An async stage (one that submits its work to an event loop) gets a single
+thread instead, which keeps up to `workers` of its jobs in flight.
+"""
+
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 8
+
+# Marks the end of the job stream on a queue
+STOP = object()
+
+
+class PageJob:
+    """One page on its way through the pipeline, filled in by each stage"""
+
+    def __init__(self, url, method='GET', data=None, headers=None, cookies=None, proxies=None, timeout=None,
+                 context=None):
+        self.url = url
+        self.method = method
+        self.data = data
+        self.headers = headers or {}
+        self.cookies = cookies or {}
+        self.proxies = proxies
+        # None means the fetch stage's timeout
+        self.timeout = timeout
+        # Whatever the caller needs back with the job (e.g. its ScrapingSession)
+        self.context = context or {}
+
+        # Fetch
+        self.attempts = 0
+        self.status_code = None
+        # Where the page came from after redirects
+        self.response_url = None
+        self.html = ''
+        self.response_headers = {}
+        # Cookies the page was served under: the job's own, the fetching
+        # session's and any the response set (for follow-up postbacks)
+        self.response_cookies = {}
+        # Detect
+        self.blocked = False
+        self.protection = None
+        # Parse
+        self.parsed = None
+        # Store
+        self.result = None
+
+        self.error = None
+        self.timings = {}
+
+    @property
+    def ok(self):
+        """Fetched a 200 page that isn't a protection page"""
+        return self.error is None and self.status_code == 200 and not self.blocked
+
+    def __repr__(self):
+        return f"<PageJob {self.method} {self.url} status={self.status_code} error={self.error!r}>"
+
+
+class Stage:
+    """One step of a pipeline
+
+    Subclasses implement process(job), which updates the job in place.
+    `workers` threads run it when the pipeline streams jobs; `queue_size`
+    bounds how many jobs may wait for this stage (the pipeline's default if
+    None). A stage whose is_async is true also implements submit(job),
+    which starts the work without blocking and returns a
+    concurrent.futures.Future; streamed, up to `workers` of its jobs are
+    then in flight at once from one thread.
+    """
+
+    name = 'stage'
+    # Stages that record failures (e.g. storing a failed session) set this
+    handles_failures = False
+
+    def __init__(self, workers=1, queue_size=None):
+        self.workers = workers
+        self.queue_size = queue_size
+
+    def accepts(self, job):
+        return self.handles_failures or job.error is None
+
+    @property
+    def is_async(self):
+        return False
+
+    def process(self, job):
+        raise NotImplementedError
+
+    def submit(self, job):
+        raise NotImplementedError
+
+    def worker_done(self):
+        """Called on each worker thread before it exits"""
+
+
+class Pipeline:
+    """Runs jobs through a list of stages, one at a time or streamed"""
+
+    def __init__(self, stages, queue_size=DEFAULT_QUEUE_SIZE):
+        self.stages = list(stages)
+        self.queue_size = queue_size
+
+    def stage(self, name):
+        return next(stage for stage in self.stages if stage.name == name)
+
+    def stage_failed(self, stage, job, error):
+        logger.error(f"{stage.name} failed for {job.url}: {error}")
+        job.error = f"{stage.name}: {error}"
+
+    def run_stage(self, stage, job):
+        if not stage.accepts(job):
+            return
+        start = time.perf_counter()
+        try:
+            stage.process(job)
+        except Exception as e:
+            self.stage_failed(stage, job, e)
+        finally:
+            job.timings[stage.name] = time.perf_counter() - start
+
+    def submit_stage(self, stage, job):
+        """Start an async stage on the job; returns a Future of the job, done once the stage is
+
+        The Future is only resolved after the job's timing and any error
+        have been recorded, so whoever waits on it sees the finished job.
+        """
+        done = Future()
+        if not stage.accepts(job):
+            done.set_result(job)
+            return done
+
+        start = time.perf_counter()
+
+        def finish(future):
+            job.timings[stage.name] = time.perf_counter() - start
+            error = future.exception() if not future.cancelled() else 'cancelled'
+            if error is not None:
+                self.stage_failed(stage, job, error)
+            done.set_result(job)
+
+        try:
+            stage.submit(job).add_done_callback(finish)
+        except Exception as e:
+            self.stage_failed(stage, job, e)
+            job.timings[stage.name] = time.perf_counter() - start
+            done.set_result(job)
+        return done
+
+    def run_one(self, job):
+        """Take one job through every stage on this thread"""
+        for stage in self.stages:
+            self.run_stage(stage, job)
+        return job
+
+    def run(self, jobs):
+        """Stream jobs through the stages; yields them as they finish (any order)"""
+        stopping = threading.Event()
+        queues = [queue.Queue(maxsize=stage.queue_size or self.queue_size) for stage in self.stages]
+        output = queue.Queue(maxsize=self.queue_size)
+        queues.append(output)
+        # Threads reading each stage's queue (an async stage has one)
+        readers = [1 if stage.is_async else stage.workers for stage in self.stages]
+
+        def put(target, item):
+            # Bounded put that gives up once the consumer has gone away
+            while not stopping.is_set():
+                try:
+                    target.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def feed():
+            try:
+                for job in jobs:
+                    if not put(queues[0], job):
+                        return
+            finally:
+                for _ in range(readers[0]):
+                    put(queues[0], STOP)
+
+        def work_async(stage, inbox, outbox, next_workers):
+            # A slot is taken per job in flight and given back once the job is
+            # passed on, so a slow next stage still holds this one back
+            slots = threading.Semaphore(stage.workers)
+            finished = queue.SimpleQueue()
+
+            def pass_on():
+                while True:
+                    job = finished.get()
+                    if job is STOP:
+                        break
+                    put(outbox, job)
+                    slots.release()
+                for _ in range(next_workers):
+                    put(outbox, STOP)
+
+            passer = threading.Thread(target=pass_on, name=f'pipeline-{stage.name}-out', daemon=True)
+            passer.start()
+            try:
+                while True:
+                    job = inbox.get()
+                    if job is STOP:
+                        break
+                    while not slots.acquire(timeout=0.1):
+                        if stopping.is_set():
+                            return
+                    self.submit_stage(stage, job).add_done_callback(lambda done: finished.put(done.result()))
+                # Every job is in only once all the slots are back
+                for _ in range(stage.workers):
+                    while not slots.acquire(timeout=0.1):
+                        if stopping.is_set():
+                            return
+            finally:
+                stage.worker_done()
+                finished.put(STOP)
+
+        threads = [threading.Thread(target=feed, name='pipeline-feed', daemon=True)]
+        for index, stage in enumerate(self.stages):
+            next_workers = readers[index + 1] if index + 1 < len(self.stages) else 1
+            if stage.is_async:
+                threads.append(threading.Thread(
+                    target=work_async, args=(stage, queues[index], queues[index + 1], next_workers),
+                    name=f'pipeline-{stage.name}', daemon=True,
+                ))
+                continue
+
+            remaining = [stage.workers]
+            lock = threading.Lock()
+
+            def work(stage=stage, inbox=queues[index], outbox=queues[index + 1],
+                     remaining=remaining, lock=lock, next_workers=next_workers):
+                try:
+                    while True:
+                        job = inbox.get()
+                        if job is STOP:
+                            break
+                        self.run_stage(stage, job)
+                        if not put(outbox, job):
+                            break
+                finally:
+                    stage.worker_done()
+                    with lock:
+                        remaining[0] -= 1
+                        last = remaining[0] == 0
+                    if last:
+                        # The last worker out passes the end of the stream on
+                        for _ in range(next_workers):
+                            put(outbox, STOP)
+
+            threads.extend(
+                threading.Thread(target=work, name=f'pipeline-{stage.name}-{n}', daemon=True)
+                for n in range(stage.workers)
+            )
+
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                job = output.get()
+                if job is STOP:
+                    break
+                yield job
+        finally:
+            stopping.set()
+            # Unblock workers waiting on an inbox so they can see `stopping`
+            for inbox, count in zip(queues, readers):
+                for _ in range(count):
+                    try:
+                        inbox.put_nowait(STOP)
+                    except queue.Full:
+                        pass
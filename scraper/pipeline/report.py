@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Console summaries of pipeline jobs for the standalone scripts
+"""
+
+ROSTER_KEYWORDS = ('court', 'roster')
+
+
+def page_summary(parsed):
+    """Counts and ASP.NET markers of a parsed page"""
+    input_names = {inp['name'] for inp in parsed['inputs']}
+    return {
+        'title': parsed['title'] or 'No title found',
+        'forms_count': len(parsed['forms']),
+        'inputs_count': len(parsed['inputs']),
+        'selects_count': len(parsed['selects']),
+        'links_count': len(parsed['links']),
+        'scripts_count': len(parsed['scripts']),
+        'tables_count': len(parsed['tables']),
+        'has_viewstate': '__VIEWSTATE' in input_names,
+        'has_event_validation': '__EVENTVALIDATION' in input_names,
+        'forms': [{'action': form['action'], 'method': form['method']} for form in parsed['forms']],
+        'inputs': [{'name': inp['name'], 'type': inp['type'], 'value': inp['value']} for inp in parsed['inputs']],
+        'selects': [{'name': sel['name'], 'options': [opt['value'] for opt in sel['options']]}
+                    for sel in parsed['selects']],
+        'tables': [{'rows': table['rows'], 'first_row': table['first_row']} for table in parsed['tables']],
+    }
+
+
+def print_page_summary(summary, heading='SCRAPING SUMMARY'):
+    print("\n" + "="*50)
+    print(heading)
+    print("="*50)
+    print(f"Page Title: {summary['title']}")
+    print(f"Forms Found: {summary['forms_count']}")
+    print(f"Input Fields: {summary['inputs_count']}")
+    print(f"Select Dropdowns: {summary['selects_count']}")
+    print(f"Links: {summary['links_count']}")
+    print(f"Scripts: {summary['scripts_count']}")
+    print(f"Tables: {summary['tables_count']}")
+    print(f"Has ViewState: {summary['has_viewstate']}")
+    print(f"Has EventValidation: {summary['has_event_validation']}")
+
+    if summary.get('forms'):
+        print("\nForms:")
+        for i, form in enumerate(summary['forms']):
+            print(f"  Form {i+1}: Action={form['action']}, Method={form['method']}")
+
+    if summary.get('inputs'):
+        print("\nInput Fields:")
+        for inp in summary['inputs'][:10]:  # Show first 10
+            print(f"  Name: {inp['name']}, Type: {inp['type']}, Value: {inp['value']}")
+        if len(summary['inputs']) > 10:
+            print(f"  ... and {len(summary['inputs']) - 10} more")
+
+    if summary.get('selects'):
+        print("\nSelect Dropdowns:")
+        for sel in summary['selects']:
+            print(f"  Name: {sel['name']}, Options: {sel['options']}")
+
+    if summary.get('tables'):
+        print("\nTables:")
+        for i, table in enumerate(summary['tables'][:3]):  # Show first 3 tables
+            print(f"  Table {i+1}: {table['rows']} rows")
+
+
+def print_protection_analysis(job):
+    """What the protection page of a blocked job shows"""
+    print("\n🔍 PROTECTION ANALYSIS:")
+    print("=" * 40)
+
+    protection = job.protection or {}
+    if protection.get('protection_indicators', {}).get('incapsula'):
+        print("🛡️ Incapsula protection detected")
+    if 'incident_id' in job.html:
+        print("🆔 Incident ID found in response")
+    if 'iframe' in job.html:
+        print("🖼️ Iframe-based protection detected")
+    if 'Request unsuccessful' in job.html:
+        print("❌ 'Request unsuccessful' message detected")
+
+    print(f"📄 Page title: {protection.get('page_title') or 'No title'}")
+
+
+def print_page_analysis(job):
+    """Element counts of a successfully parsed job"""
+    parsed = job.parsed
+
+    print("\n✅ SUCCESSFUL RESPONSE ANALYSIS:")
+    print("=" * 40)
+    print(f"📝 Forms found: {len(parsed['forms'])}")
+    print(f"🔍 Inputs found: {len(parsed['inputs'])}")
+    print(f"🔗 Links found: {len(parsed['links'])}")
+    print(f"📜 Scripts found: {len(parsed['scripts'])}")
+    print(f"📊 Tables found: {len(parsed['tables'])}")
+    print(f"📄 Page title: {parsed['title'] or 'No title'}")
+
+    # Look for court data
+    if parsed['tables']:
+        print(f"\n🏛️ COURT DATA FOUND:")
+        for i, table in enumerate(parsed['tables'][:3]):  # Show first 3 tables
+            print(f"   Table {i+1}: {table['rows']} rows")
+            if table['rows']:
+                # Show first row as example
+                print(f"   First row: {table['first_row']}...")
+
+    if any(keyword in job.html.lower() for keyword in ROSTER_KEYWORDS):
+        print("🏛️ Court-related content detected!")
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Standard stages: fetch, detect, parse, save
+
+None of these need Django, so the standalone scripts build their
+pipelines from the same stages as the scraper service.
+"""
+
+import logging
+import threading
+from concurrent.futures import wait
+from contextlib import nullcontext
+import requests
+from ..async_client import AsyncHttpEngine, is_available as async_available
+from ..counties import host_of
+from ..http_cache import acached_get, cached_get
+from ..parsers import get_parser
+from ..protection import analyze_protection_page
+from ..retry import NO_RETRY
+from .core import Pipeline, Stage
+
+logger = logging.getLogger(__name__)
+
+# A 200 page containing any of these is a protection page, not the roster
+BLOCK_MARKERS = ('Incapsula',)
+
+
+def cookie_values(cookies):
+    """name -> value for a requests cookie jar or httpx Cookies (None gives {})"""
+    jar = getattr(cookies, 'jar', cookies)
+    return {cookie.name: cookie.value for cookie in jar} if jar is not None else {}
+
+
+class FetchStage(Stage):
+    """Download job.url; one requests session per worker thread
+
+    With an HttpPool the worker sessions are borrowed from it: each keeps
+    its own cookies, but connections are reused across sessions and jobs.
+    Honors the shared rate limiter (wait per host) and host limiter (cap on
+    requests in flight per host) when given; every request the retry policy
+    sends goes through both. Plain GETs are served through the HTTP cache
+    first, and a fresh hit spends neither a token nor a slot. With use_async, pages are fetched through
+    httpx on a long-lived AsyncHttpEngine (its own, unless one is shared
+    in): the stage is async, so a pipeline keeps up to `workers` jobs in
+    flight on the engine's event loop from one thread, and fetch_many()
+    does the same for a batch of jobs; retries, limiter waits and cache
+    I/O never hold a thread either. That path keeps no cookies between
+    jobs; a job's own cookies are still sent. Either way
+    job.response_cookies ends up with the cookies a follow-up request for
+    the page should send.
+    """
+
+    name = 'fetch'
+
+    def __init__(self, headers=None, session_factory=None, http_pool=None, http_cache=None, rate_limiter=None,
+                 host_limiter=None, retry_policy=None, timeout=30, use_async=False, async_engine=None, workers=4,
+                 queue_size=None):
+        super().__init__(workers=workers, queue_size=queue_size)
+        self.headers = headers or {}
+        self.session_factory = session_factory
+        self.http_pool = http_pool
+        self.http_cache = http_cache
+        self.rate_limiter = rate_limiter
+        self.host_limiter = host_limiter
+        self.retry_policy = retry_policy or NO_RETRY
+        self.timeout = timeout
+        self.use_async = use_async
+        if self.use_async and not async_available():
+            logger.warning("httpx is not installed, falling back to sync HTTP")
+            self.use_async = False
+        self.async_engine = async_engine
+        if self.use_async and self.async_engine is None:
+            self.async_engine = AsyncHttpEngine()
+        self.local = threading.local()
+
+    def new_session(self):
+        if self.session_factory is not None:
+            return self.session_factory()
+        if self.http_pool is not None:
+            return self.http_pool.session(self.headers)
+        session = requests.Session()
+        session.headers.update(self.headers)
+        return session
+
+    def session(self):
+        """This thread's HTTP session (also handy for a script's side requests)"""
+        if getattr(self.local, 'session', None) is None:
+            self.local.session = self.new_session()
+        return self.local.session
+
+    @property
+    def is_async(self):
+        return self.use_async
+
+    def process(self, job):
+        if self.use_async:
+            # One job from this thread (run_one); streams go through submit()
+            future = self.submit(job)
+            try:
+                future.result()
+            finally:
+                future.cancel()
+            return
+
+        host = host_of(job.url)
+
+        def attempt(timeout):
+            job.attempts += 1
+
+            def send(headers):
+                # Only a request that goes out takes a token and a host slot
+                if self.rate_limiter is not None:
+                    self.rate_limiter.wait(host)
+                with self.host_limiter.slot(host) if self.host_limiter is not None else nullcontext():
+                    return self.fetch(job, headers, timeout)
+
+            if self.caches(job):
+                return cached_get(self.http_cache, job.url, dict(self.headers, **job.headers), send)
+            return send(job.headers)
+
+        # Backoff waits happen between attempts, outside the host slot
+        result = self.retry_policy.run(attempt, timeout=job.timeout or self.timeout, label=job.url)
+        self.record_response(job, result)
+
+    def caches(self, job):
+        return self.http_cache is not None and job.method == 'GET' and not job.data
+
+    def record_response(self, job, result):
+        job.status_code = result.status_code
+        job.response_url = str(getattr(result, 'url', None) or job.url)
+        job.html = result.text
+        job.response_headers = dict(result.headers)
+        job.response_cookies = dict(job.cookies)
+        if not self.use_async:
+            job.response_cookies.update(cookie_values(getattr(self.session(), 'cookies', None)))
+        job.response_cookies.update(cookie_values(getattr(result, 'cookies', None)))
+
+    def fetch(self, job, headers, timeout):
+        return self.session().request(
+            job.method, job.url, data=job.data, headers=headers or None,
+            cookies=job.cookies or None, proxies=job.proxies, timeout=timeout,
+        )
+
+    def submit(self, job):
+        """Start fetching the job on the engine's event loop; returns a concurrent.futures.Future"""
+        return self.async_engine.spawn(self.process_async(job))
+
+    async def process_async(self, job):
+        host = host_of(job.url)
+
+        async def attempt(timeout):
+            job.attempts += 1
+
+            async def send(headers):
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.wait_async(host)
+                async with self.host_limiter.aslot(host) if self.host_limiter is not None else nullcontext():
+                    return await self.async_engine.arequest(
+                        job.method, job.url, data=job.data, headers=headers, cookies=job.cookies,
+                        proxies=job.proxies, timeout=timeout,
+                    )
+
+            headers = dict(self.headers, **job.headers)
+            if self.caches(job):
+                return await acached_get(self.http_cache, job.url, headers, send)
+            return await send(headers)
+
+        result = await self.retry_policy.arun(attempt, timeout=job.timeout or self.timeout, label=job.url)
+        self.record_response(job, result)
+
+    def fetch_many(self, jobs):
+        """Fetch a batch of jobs at once; returns them, in order, once all are done
+
+        Async, every job is in flight together from this thread. Otherwise
+        they go through this stage's worker threads. Failures end up in
+        each job's error, as in a pipeline.
+        """
+        jobs = list(jobs)
+        pipeline = Pipeline([self])
+        if self.use_async:
+            wait([pipeline.submit_stage(self, job) for job in jobs])
+        else:
+            for _ in pipeline.run(jobs):
+                pass
+        return jobs
+
+    def worker_done(self):
+        session = getattr(self.local, 'session', None)
+        if session is not None:
+            session.close()
+            self.local.session = None
+
+
+class DetectStage(Stage):
+    """Flag non-200 responses and protection pages; optionally classify them"""
+
+    name = 'detect'
+
+    def __init__(self, analyze=False, markers=BLOCK_MARKERS, workers=1, queue_size=None):
+        super().__init__(workers=workers, queue_size=queue_size)
+        self.analyze = analyze
+        self.markers = markers
+
+    def process(self, job):
+        job.blocked = job.status_code != 200 or any(marker in job.html for marker in self.markers)
+        if job.blocked and self.analyze and job.html:
+            job.protection = analyze_protection_page(job.html)
+
+
+class ParseStage(Stage):
+    """Parse good pages with the configured parser backend (one tree per page)"""
+
+    name = 'parse'
+
+    def __init__(self, parser=None, parser_backend=None, workers=2, queue_size=None):
+        super().__init__(workers=workers, queue_size=queue_size)
+        self.parser = parser or get_parser(parser_backend)
+
+    def accepts(self, job):
+        return job.ok
+
+    def process(self, job):
+        job.parsed = self.parser.parse(job.html)
+
+
+class SaveHtmlStage(Stage):
+    """Write each fetched page to a file (path may use {status} and {county})"""
+
+    name = 'save'
+    handles_failures = True
+
+    def __init__(self, path='response.html', workers=1, queue_size=None):
+        super().__init__(workers=workers, queue_size=queue_size)
+        self.path = path
+
+    def process(self, job):
+        if not job.html:
+            return
+        path = self.path.format(status=job.status_code, county=job.context.get('county', ''))
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(job.html)
+        logger.info(f"Response saved to {path}")
+        job.context['saved_to'] = path
+
+
+def page_pipeline_stages(headers=None, parser_backend=None, analyze_protection=False, fetch_workers=4,
+                         parse_workers=2, **fetch_options):
+    """The fetch -> detect -> parse stages every entry point starts from"""
+    return [
+        FetchStage(headers=headers, workers=fetch_workers, **fetch_options),
+        DetectStage(analyze=analyze_protection),
+        ParseStage(parser_backend=parser_backend, workers=parse_workers),
+    ]
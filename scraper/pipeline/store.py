@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Django stages: write a fetched page into its ScrapingSession, then crawl
+and sync the rosters it lists
+"""
+
+import logging
+from concurrent.futures import Future
+from django.db import connection
+from ..records import iter_roster_records, sync_court_records
+from .core import Stage
+
+logger = logging.getLogger(__name__)
+
+# parsed_data section -> ScrapingSession counter
+COUNTED_SECTIONS = {
+    'forms': 'forms_count',
+    'inputs': 'inputs_count',
+    'selects': 'selects_count',
+    'links': 'links_count',
+    'scripts': 'scripts_count',
+}
+
+
+class SessionStoreStage(Stage):
+    """Save the outcome of job.context['session']: success, blocked or failed
+
+    A successful page also has its roster records synced (job.result holds
+    the counts). With defer_success its page is saved but the session stays
+    'running' for a later stage (the roster crawl) to finish, so watchers
+    don't see it done early. job.context['ip_address'] may be a Future,
+    resolved here so the IP lookup can overlap the fetch.
+    """
+
+    name = 'store'
+    handles_failures = True
+
+    def __init__(self, batch_size=None, defer_success=False, workers=1, queue_size=None):
+        super().__init__(workers=workers, queue_size=queue_size)
+        self.batch_size = batch_size
+        self.defer_success = defer_success
+
+    def process(self, job):
+        session = job.context['session']
+        ip_address = job.context.get('ip_address')
+        if isinstance(ip_address, Future):
+            ip_address = ip_address.result()
+        session.ip_address = ip_address
+
+        if job.error is not None:
+            session.status = 'failed'
+            session.error_message = job.error
+            session.save()
+            return
+        if not job.ok:
+            session.status = 'blocked'
+            session.error_message = 'Complete session failed - likely IP blocking'
+            session.save()
+            return
+
+        data = job.parsed or {}
+        if not self.defer_success:
+            session.status = 'success'
+        session.set_raw_html(job.html)
+        session.parsed_data = data
+        for section, counter in COUNTED_SECTIONS.items():
+            setattr(session, counter, len(data.get(section, [])))
+        session.save()
+        job.result = self.extract_court_records(session, job.html)
+
+    def extract_court_records(self, session, html_content):
+        """Extract roster records from the page and sync them into the county's records"""
+        try:
+            result = sync_court_records(session, iter_roster_records(html_content), batch_size=self.batch_size)
+            logger.info(f"Synced court records for session {session.session_id}: "
+                        f"{result['created']} new, {result['updated']} changed, "
+                        f"{result['unchanged']} unchanged, {result['removed']} removed")
+            return result
+
+        except Exception as e:
+            logger.error(f"Error extracting court records: {e}")
+            return None
+
+    def worker_done(self):
+        # Each worker thread owns its own connection; don't leak it
+        connection.close()
+
+
+class RosterCrawlStage(Stage):
+    """Post back every roster of a stored landing page, sync its records and finish the session
+
+    `crawl_rosters(county, page=..., cookies=...)` yields crawled pages (see
+    RosterCrawler), starting from the landing page and cookies the fetch
+    stage already has. The landing page itself was synced by the store
+    stage, so only the roster pages are synced here, each against its own
+    roster's snapshot. Each roster's sync counts, or {'error': ...} if it
+    couldn't be fetched or synced, end up in job.context['rosters'] and the
+    session's roster_results; only then is the session marked 'success'.
+    """
+
+    name = 'crawl'
+
+    def __init__(self, crawl_rosters, batch_size=None, workers=1, queue_size=None):
+        super().__init__(workers=workers, queue_size=queue_size)
+        self.crawl_rosters = crawl_rosters
+        self.batch_size = batch_size
+
+    def accepts(self, job):
+        return job.ok
+
+    def process(self, job):
+        session = job.context['session']
+        rosters = job.context['rosters'] = {}
+        try:
+            # Nothing to crawl from if the landing page couldn't be synced
+            if job.result is not None:
+                self.crawl(job, session, rosters)
+        finally:
+            session.status = 'success'
+            session.roster_results = rosters
+            session.save()
+
+    def crawl(self, job, session, rosters):
+        landing = {'url': job.response_url or job.url, 'html': job.html, 'data': job.parsed}
+        for page in self.crawl_rosters(session.county, page=landing, cookies=job.response_cookies):
+            if page['roster'] is None:
+                continue
+            # A long crawl keeps the session's claim fresh
+            session.heartbeat()
+            roster = page['roster']['value'][:100]
+            if page['error'] is not None:
+                rosters[roster] = {'error': page['error']}
+                continue
+            try:
+                rosters[roster] = sync_court_records(session, iter_roster_records(page['html']), roster=roster,
+                                                     batch_size=self.batch_size)
+            except Exception as e:
+                logger.error(f"Error syncing roster {roster} for session {session.session_id}: {e}")
+                rosters[roster] = {'error': str(e)}
+                continue
+            result = rosters[roster]
+            logger.info(f"Synced roster {roster} for session {session.session_id}: "
+                        f"{result['created']} new, {result['updated']} changed, "
+                        f"{result['unchanged']} unchanged, {result['removed']} removed")
+
+    def worker_done(self):
+        connection.close()
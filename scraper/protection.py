@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Protection-page classifier
+
+Keyword indicators are table-driven and evaluated against a single
+lowercased copy of the page (the old code lowercased the page once per
+keyword). Tiny interstitials (like the Incapsula challenge page) are
+classified with regexes only, without building a soup at all.
+"""
+
+import re
+import html
+import logging
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+# Pages at or below this size with no forms/inputs/buttons/title/meta
+# description and no inline script are classified with regexes only
+INTERSTITIAL_MAX_LENGTH = 4096
+
+# indicator name -> (keyword, exact case required)
+PAGE_INDICATORS = {
+    'incapsula': [('Incapsula', True)],
+    'cloudflare': [('Cloudflare', True)],
+    'ddos_guard': [('DDoS-Guard', True)],
+    'sucuri': [('Sucuri', True)],
+    'recaptcha': [('recaptcha', False)],
+    'hcaptcha': [('hcaptcha', False)],
+    'challenge': [('challenge', False)],
+    'verification': [('verification', False)],
+    'robot_check': [('robot', False), ('bot', False)],
+    'captcha': [('captcha', False)],
+}
+
+TEXT_INDICATORS = {
+    'access_denied': 'access denied',
+    'blocked': 'blocked',
+    'forbidden': 'forbidden',
+    'not_authorized': 'not authorized',
+    'security_check': 'security check',
+    'verification_required': 'verification required',
+}
+
+CHALLENGE_FORM_KEYWORDS = ('challenge', 'verify', 'captcha', 'robot')
+CAPTCHA_INPUT_KEYWORDS = ('captcha', 'challenge', 'verify')
+VERIFICATION_BUTTON_KEYWORDS = ('verify', 'continue', 'proceed', 'submit')
+PROTECTION_SCRIPT_KEYWORDS = ('incapsula', 'cloudflare', 'challenge', 'captcha')
+
+# Anything that needs a real tree to analyze
+STRUCTURE_PATTERN = re.compile(
+    r'<(?:form|input|button|title)\b|<meta\b[^>]*\bname\s*=\s*["\']?description\b',
+    re.IGNORECASE,
+)
+SCRIPT_PATTERN = re.compile(r'<script\b[^>]*>(.*?)</script\s*>', re.IGNORECASE | re.DOTALL)
+ASCII_SPACES = ' \t\n\r\f'
+NON_TEXT_PATTERN = re.compile(
+    r'<!--.*?-->|<!\w[^>]*>|<(script|style)\b[^>]*>.*?</\1\s*>|<[^>]*>',
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def page_indicators(html_content):
+    """Evaluate every PAGE_INDICATORS entry against the raw HTML"""
+    lowered = html_content.lower()
+    return {
+        name: any((keyword in html_content) if exact else (keyword in lowered)
+                  for keyword, exact in keywords)
+        for name, keywords in PAGE_INDICATORS.items()
+    }
+
+
+def text_indicators(page_text):
+    lowered = page_text.lower()
+    return {name: phrase in lowered for name, phrase in TEXT_INDICATORS.items()}
+
+
+def interstitial_text(html_content):
+    """Equivalent of soup.get_text() for pages accepted by is_tiny_interstitial"""
+    parts = []
+    for chunk in NON_TEXT_PATTERN.sub('\x00', html_content).split('\x00'):
+        if not chunk:
+            continue
+        # BeautifulSoup collapses whitespace-only strings the same way
+        if not chunk.strip(ASCII_SPACES):
+            chunk = '\n' if '\n' in chunk else ' '
+        parts.append(html.unescape(chunk))
+    return ''.join(parts)
+
+
+def contains_any(text, keywords):
+    text = text.lower()
+    return any(keyword in text for keyword in keywords)
+
+
+def is_tiny_interstitial(html_content):
+    """True for small pages with no structure worth building a tree for"""
+    if len(html_content) > INTERSTITIAL_MAX_LENGTH:
+        return False
+    if STRUCTURE_PATTERN.search(html_content):
+        return False
+    # Inline script bodies would have to be checked for protection keywords
+    return all(not body.strip() for body in SCRIPT_PATTERN.findall(html_content))
+
+
+def preview(page_text):
+    return page_text[:500] + '...' if len(page_text) > 500 else page_text
+
+
+def analyze_interstitial(html_content):
+    """Regex-only analysis for pages accepted by is_tiny_interstitial"""
+    page_text = interstitial_text(html_content)
+
+    return {
+        'protection_indicators': page_indicators(html_content),
+        'protection_elements': {
+            'challenge_forms': [],
+            'captcha_inputs': [],
+            'verification_buttons': [],
+            'protection_scripts': [],
+        },
+        'protection_texts': text_indicators(page_text),
+        'page_title': '',
+        'meta_description': '',
+        'total_forms': 0,
+        'total_inputs': 0,
+        'total_buttons': 0,
+        'total_scripts': len(SCRIPT_PATTERN.findall(html_content)),
+        'page_text_preview': preview(page_text),
+    }
+
+
+def analyze_protection_page(html_content):
+    """Classify a (probably blocked) page; see SCCourtsScraperService.analyze_protection_page"""
+    if is_tiny_interstitial(html_content):
+        return analyze_interstitial(html_content)
+
+    soup = BeautifulSoup(html_content, 'html.parser')
+
+    forms = []
+    inputs = []
+    buttons = []
+    scripts = []
+    collectors = {'form': forms, 'input': inputs, 'button': buttons, 'script': scripts}
+    for tag in soup.find_all(list(collectors)):
+        collectors[tag.name].append(tag)
+
+    protection_elements = {
+        'challenge_forms': [str(form) for form in forms
+                            if contains_any(form.get_text(), CHALLENGE_FORM_KEYWORDS)],
+        # Match against the attributes without serializing every input
+        'captcha_inputs': [str(input_tag) for input_tag in inputs
+                           if input_tag.get('type') in ['text', 'hidden']
+                           and contains_any(' '.join(f'{key} {value}' for key, value in input_tag.attrs.items()),
+                                            CAPTCHA_INPUT_KEYWORDS)],
+        'verification_buttons': [str(button) for button in buttons
+                                 if contains_any(button.get_text(), VERIFICATION_BUTTON_KEYWORDS)],
+        'protection_scripts': [str(script) for script in scripts
+                               if contains_any(script.get_text(), PROTECTION_SCRIPT_KEYWORDS)],
+    }
+
+    title = soup.title.get_text(strip=True) if soup.title else ''
+    meta_description = soup.find('meta', attrs={'name': 'description'})
+    meta_description = meta_description.get('content', '') if meta_description else ''
+
+    page_text = soup.get_text()
+
+    return {
+        'protection_indicators': page_indicators(html_content),
+        'protection_elements': protection_elements,
+        'protection_texts': text_indicators(page_text),
+        'page_title': title,
+        'meta_description': meta_description,
+        'total_forms': len(forms),
+        'total_inputs': len(inputs),
+        'total_buttons': len(buttons),
+        'total_scripts': len(scripts),
+        'page_text_preview': preview(page_text),
+    }
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Natural keys and content hashes for court records
+
+A record is identified by (county, case number, hearing date); its content
+hash covers everything else that can change between scrapes. No Django
+dependency, so migrations can use these too.
+"""
+
+import json
+import hashlib
+
+# Fields that make up a record's content (everything but the natural key)
+CONTENT_FIELDS = ['party_name', 'status', 'record_type', 'raw_data']
+
+
+def record_key(county, case_number, filing_date):
+    """Stable key for (county, case number, hearing date); the date may be missing"""
+    date = filing_date.isoformat() if filing_date else ''
+    value = f"{county}|{case_number.strip().upper()}|{date}"
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+
+def content_hash(record):
+    """Hash of a record dict's content fields"""
+    content = {field: record.get(field) for field in CONTENT_FIELDS}
+    encoded = json.dumps(content, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Roster record extraction
+
+Roster tables are recognized by their header row (case number, party,
+date, status, ...). Rows are streamed out of the page one <tr> at a time
+and synced into CourtRecord by natural key with batched upserts: unchanged
+records are skipped, changed ones updated, and ones that dropped off the
+roster marked removed. Each difference from the roster's previous snapshot
+is stored as a RecordChange for the change feed.
+"""
+
+import io
+import logging
+from datetime import datetime
+from itertools import islice
+from bs4 import BeautifulSoup
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import CourtRecord, RecordChange
+from .record_keys import CONTENT_FIELDS, content_hash, record_key
+
+try:
+    from lxml import etree
+except ImportError:  # pragma: no cover - lxml is optional
+    etree = None
+
+logger = logging.getLogger(__name__)
+
+# CourtRecord field -> header labels seen on roster tables
+HEADER_ALIASES = {
+    'case_number': ['case number', 'case #', 'case no', 'case no.', 'case', 'warrant number', 'warrant #'],
+    'party_name': ['party', 'party name', 'name', 'defendant', 'defendant name', 'plaintiff', 'parties'],
+    'filing_date': ['filing date', 'filed', 'date filed', 'hearing date', 'court date', 'date'],
+    'status': ['status', 'case status', 'disposition'],
+    'record_type': ['case type', 'type', 'court type', 'court'],
+}
+
+HEADER_LOOKUP = {
+    alias: field
+    for field, aliases in HEADER_ALIASES.items()
+    for alias in aliases
+}
+
+DATE_FORMATS = ['%m/%d/%Y', '%m/%d/%y', '%Y-%m-%d', '%m-%d-%Y']
+
+DEFAULT_RECORD_TYPE = 'Roster'
+
+
+def normalize_text(text):
+    return ' '.join(text.split())
+
+
+def normalize_header(text):
+    return normalize_text(text).lower().rstrip(':').strip()
+
+
+def parse_date(value):
+    """Parse the date part of a roster cell (e.g. '01/02/2025 9:00 AM')"""
+    if not value:
+        return None
+    value = value.split()[0]
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+def header_columns(cells):
+    """Map CourtRecord fields to column indexes, or None if this isn't a roster header"""
+    columns = {}
+    for index, cell in enumerate(cells):
+        field = HEADER_LOOKUP.get(normalize_header(cell))
+        if field and field not in columns:
+            columns[field] = index
+
+    # A roster needs a case number plus at least one other known column
+    if 'case_number' in columns and len(columns) > 1:
+        return columns
+    return None
+
+
+class RosterTableReader:
+    """Turns a stream of (table, cells) rows into record dicts"""
+
+    def __init__(self):
+        # table key -> (header cells, field -> column index)
+        self.headers = {}
+
+    def feed(self, table_key, cells):
+        header = self.headers.get(table_key)
+
+        if header is None:
+            columns = header_columns(cells)
+            if columns:
+                self.headers[table_key] = (cells, columns)
+            return None
+
+        header_cells, columns = header
+        if cells == header_cells:
+            # Header repeated on paged rosters
+            return None
+
+        values = {
+            field: cells[index] if index < len(cells) else ''
+            for field, index in columns.items()
+        }
+        if not values.get('case_number'):
+            return None
+
+        return {
+            'case_number': values['case_number'],
+            'party_name': values.get('party_name', ''),
+            'filing_date': parse_date(values.get('filing_date')),
+            'status': values.get('status', ''),
+            'record_type': values.get('record_type') or DEFAULT_RECORD_TYPE,
+            'raw_data': dict(zip(header_cells, cells)),
+        }
+
+
+def iter_rows_lxml(html_content):
+    """Yield (table key, cell texts) for every <tr>, discarding rows once read"""
+    source = io.BytesIO(html_content.encode('utf-8'))
+    for _, row in etree.iterparse(source, events=('end',), tag='tr', html=True, encoding='utf-8'):
+        table = next(row.iterancestors('table'), None)
+        cells = [
+            normalize_text(''.join(cell.itertext()))
+            for cell in row
+            if cell.tag in ('td', 'th')
+        ]
+        # Yield the element itself: lxml keeps one proxy per node while it's
+        # referenced, so it is a stable key (id() of a proxy is not)
+        yield table, cells
+
+        # Free rows already read so large rosters stay small in memory
+        row.clear()
+        while row.getprevious() is not None:
+            del row.getparent()[0]
+
+
+def iter_rows_soup(html_content):
+    soup = BeautifulSoup(html_content, 'html.parser')
+    for row in soup.find_all('tr'):
+        table = row.find_parent('table')
+        # Like the lxml reader, which has cleared nested rows by the time it
+        # reads their parent, leave out the text of rows of nested tables
+        cells = [
+            normalize_text(''.join(text for text in cell.find_all(string=True) if text.find_parent('tr') is row))
+            for cell in row.find_all(['td', 'th'], recursive=False)
+        ]
+        yield id(table), cells
+
+
+def iter_roster_records(html_content):
+    """Yield a record dict for every data row of every roster table on the page"""
+    if not html_content:
+        return
+
+    rows = iter_rows_lxml(html_content) if etree is not None else iter_rows_soup(html_content)
+    reader = RosterTableReader()
+    for table_key, cells in rows:
+        record = reader.feed(table_key, cells)
+        if record:
+            yield record
+
+
+# Columns rewritten when an existing record changes (created_at is kept)
+UPSERT_FIELDS = ['session', 'roster', 'record_type', 'party_name', 'status', 'raw_data', 'content_hash',
+                 'updated_at', 'removed_at']
+
+
+def record_content(record):
+    return {field: record.get(field) for field in CONTENT_FIELDS}
+
+
+def content_diff(previous, current):
+    """{field: [old, new]} for the content fields that differ"""
+    return {
+        field: [previous.get(field), current.get(field)]
+        for field in CONTENT_FIELDS
+        if previous.get(field) != current.get(field)
+    }
+
+
+def sync_court_records(session, records, roster='', batch_size=None, mark_missing=True):
+    """Upsert one roster's record dicts for the session's county in one transaction
+    
+    Returns counts of created, updated, unchanged and removed records.
+    `roster` names the roster the records were listed on ('' for the
+    county's landing page). With mark_missing, active records last seen on
+    the same roster that weren't in `records` are marked removed, unless
+    nothing was extracted at all (an empty or unreadable page proves
+    nothing); records of other rosters are left alone. Every created,
+    updated or removed record also gets a RecordChange ('added',
+    'modified' or 'removed'; a removed record that comes back counts as
+    added).
+    """
+    batch_size = batch_size or getattr(settings, 'SCRAPER_RECORD_BATCH_SIZE', 500)
+    county = session.county
+    now = timezone.now()
+    records = iter(records)
+    seen = set()
+    result = {'created': 0, 'updated': 0, 'unchanged': 0, 'removed': 0}
+
+    with transaction.atomic():
+        while True:
+            batch = {}
+            for record in islice(records, batch_size):
+                key = record_key(county, record['case_number'], record['filing_date'])
+                # First occurrence of a key wins, within and across batches
+                if key not in seen:
+                    batch.setdefault(key, record)
+            if not batch:
+                break
+            seen.update(batch)
+
+            existing = {
+                row['record_key']: row
+                for row in CourtRecord.objects
+                .filter(record_key__in=list(batch))
+                .values('record_key', 'roster', 'content_hash', 'removed_at', *CONTENT_FIELDS)
+            }
+
+            upserts, changes = [], []
+            for key, record in batch.items():
+                digest = content_hash(record)
+                current = existing.get(key)
+                if (current and current['content_hash'] == digest and current['removed_at'] is None
+                        and current['roster'] == roster):
+                    result['unchanged'] += 1
+                    continue
+                result['updated' if current else 'created'] += 1
+                upserts.append(CourtRecord(
+                    session=session, county=county, roster=roster, record_key=key, content_hash=digest,
+                    created_at=now, updated_at=now, removed_at=None, **record
+                ))
+
+                if current and current['removed_at'] is None:
+                    if current['content_hash'] == digest:
+                        # Only moved to another roster: not a change to the record
+                        continue
+                    change_type, diff = RecordChange.MODIFIED, content_diff(current, record)
+                else:
+                    change_type, diff = RecordChange.ADDED, record_content(record)
+                changes.append(RecordChange(
+                    session=session, county=county, roster=roster, change_type=change_type, record_key=key,
+                    case_number=record['case_number'], filing_date=record['filing_date'],
+                    changes=diff, created_at=now,
+                ))
+
+            if upserts:
+                CourtRecord.objects.bulk_create(
+                    upserts, batch_size=batch_size,
+                    update_conflicts=True, unique_fields=['record_key'], update_fields=UPSERT_FIELDS,
+                )
+                RecordChange.objects.bulk_create(changes, batch_size=batch_size)
+
+        if mark_missing and seen:
+            result['removed'] = mark_removed(session, roster, seen, now, batch_size)
+
+    return result
+
+
+def mark_removed(session, roster, seen_keys, removed_at, batch_size):
+    """Flag the roster's active records whose keys weren't seen in this sync
+    
+    The missing rows are read in full before anything is updated, so the
+    update never runs under an open cursor over the same rows.
+    """
+    county = session.county
+    active = (CourtRecord.objects
+              .filter(county=county, roster=roster, removed_at__isnull=True)
+              .values('id', 'record_key', 'case_number', 'filing_date', *CONTENT_FIELDS)
+              .iterator(chunk_size=batch_size))
+    missing = [row for row in active if row['record_key'] not in seen_keys]
+    if not missing:
+        return 0
+
+    removed = CourtRecord.objects.filter(id__in=[row['id'] for row in missing]).update(
+        removed_at=removed_at, updated_at=removed_at
+    )
+    RecordChange.objects.bulk_create([
+        RecordChange(
+            session=session, county=county, roster=roster, change_type=RecordChange.REMOVED,
+            record_key=row['record_key'], case_number=row['case_number'],
+            filing_date=row['filing_date'], changes=record_content(row), created_at=removed_at,
+        )
+        for row in missing
+    ], batch_size=batch_size)
+    return removed
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Retry policy for fetches: exponential backoff with jitter, Retry-After and
+a total deadline
+
+A RetryPolicy decides which outcomes are worth another attempt (dropped
+connections, timeouts, 429 and 5xx) and which are final (any other
+status, bad URLs, TLS and proxy failures), waits a full-jitter
+exponential backoff between attempts (or the server's Retry-After), and
+never lets one job run past its deadline: each attempt's timeout is cut
+to the time that is left, and a wait that would overrun it ends the job
+instead. No Django dependency.
+"""
+
+import time
+import random
+import asyncio
+import logging
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import requests
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - httpx is optional
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Transient network failures
+RETRY_ERRORS = (requests.ConnectionError, requests.Timeout)
+if httpx is not None:
+    RETRY_ERRORS += (httpx.TransportError,)
+
+# Subclasses of RETRY_ERRORS that another attempt won't fix
+TERMINAL_ERRORS = (requests.exceptions.SSLError, requests.exceptions.ProxyError)
+if httpx is not None:
+    TERMINAL_ERRORS += (httpx.UnsupportedProtocol, httpx.ProxyError)
+
+
+def parse_retry_after(value, now=None):
+    """Seconds to wait for a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (when - now).total_seconds())
+
+
+class RetryPolicy:
+    """Which outcomes to retry, how long to wait, and when to give up
+
+    Attempt n (from 1) waits a random time between 0 and
+    min(max_backoff, backoff * 2 ** (n - 1)) before the next one, unless
+    the response carries a Retry-After. `deadline` caps the whole job,
+    attempts and waits included; None means no cap.
+    """
+
+    def __init__(self, max_attempts=3, backoff=0.5, max_backoff=30.0, deadline=60.0,
+                 retry_statuses=RETRY_STATUSES, retry_errors=RETRY_ERRORS, terminal_errors=TERMINAL_ERRORS,
+                 honor_retry_after=True):
+        self.max_attempts = max(1, max_attempts)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_errors = retry_errors
+        self.terminal_errors = terminal_errors
+        self.honor_retry_after = honor_retry_after
+
+    def retry_reason(self, result=None, error=None):
+        """Why an attempt is worth repeating, or None if its outcome is final"""
+        if error is not None:
+            if isinstance(error, self.terminal_errors) or not isinstance(error, self.retry_errors):
+                return None
+            return f"{type(error).__name__}: {error}"
+        if result is not None and result.status_code in self.retry_statuses:
+            return f"HTTP {result.status_code}"
+        return None
+
+    def backoff_delay(self, attempt):
+        """Full-jitter exponential backoff after the given attempt (from 1)"""
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+    def delay(self, attempt, result=None):
+        if self.honor_retry_after and result is not None:
+            retry_after = parse_retry_after(result.headers.get('Retry-After'))
+            if retry_after is not None:
+                return retry_after
+        return self.backoff_delay(attempt)
+
+    def attempt_timeout(self, timeout, start):
+        """The per-attempt timeout, cut to whatever is left of the deadline"""
+        if self.deadline is None:
+            return timeout
+        remaining = self.deadline - (time.monotonic() - start)
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def next_wait(self, number, start, result, error, label):
+        """Seconds to wait before another attempt, or None if attempt `number` was the last"""
+        reason = self.retry_reason(result, error)
+        if reason is None or number >= self.max_attempts:
+            return None
+
+        wait = self.delay(number, result)
+        if self.deadline is not None and time.monotonic() - start + wait >= self.deadline:
+            logger.warning(f"Giving up on {label} after {number} attempt(s): {reason} "
+                           f"(next try would pass the {self.deadline:g}s deadline)")
+            return None
+
+        logger.info(f"Retrying {label} in {wait:.1f}s (attempt {number}/{self.max_attempts}: {reason})")
+        return wait
+
+    def run(self, attempt, timeout=None, label='request'):
+        """Call attempt(timeout) until its outcome is final; return or raise the last one
+
+        `attempt` returns something with status_code and headers (or
+        raises). `timeout` is the per-attempt timeout, cut to whatever is
+        left of the deadline.
+        """
+        start = time.monotonic()
+        number = 0
+        while True:
+            number += 1
+            result = error = None
+            try:
+                result = attempt(self.attempt_timeout(timeout, start))
+            except Exception as e:
+                error = e
+
+            wait = self.next_wait(number, start, result, error, label)
+            if wait is None:
+                break
+            time.sleep(wait)
+
+        if error is not None:
+            raise error
+        return result
+
+    async def arun(self, attempt, timeout=None, label='request'):
+        """run() for a coroutine function `attempt`; backoff waits don't block the loop"""
+        start = time.monotonic()
+        number = 0
+        while True:
+            number += 1
+            result = error = None
+            try:
+                result = await attempt(self.attempt_timeout(timeout, start))
+            except Exception as e:
+                error = e
+
+            wait = self.next_wait(number, start, result, error, label)
+            if wait is None:
+                break
+            await asyncio.sleep(wait)
+
+        if error is not None:
+            raise error
+        return result
+
+
+# One attempt, no deadline: what fetching did before retry policies
+NO_RETRY = RetryPolicy(max_attempts=1, deadline=None)
+
+_retry_policy = None
+_retry_policy_lock = threading.Lock()
+
+
+def get_retry_policy():
+    """Process-wide fetch retry policy configured from Django settings"""
+    global _retry_policy
+    from django.conf import settings
+
+    with _retry_policy_lock:
+        if _retry_policy is None:
+            _retry_policy = RetryPolicy(
+                max_attempts=getattr(settings, 'SCRAPER_RETRY_MAX_ATTEMPTS', 3),
+                backoff=getattr(settings, 'SCRAPER_RETRY_BACKOFF', 0.5),
+                max_backoff=getattr(settings, 'SCRAPER_RETRY_MAX_BACKOFF', 30.0),
+                deadline=getattr(settings, 'SCRAPER_RETRY_DEADLINE', 60.0),
+                retry_statuses=getattr(settings, 'SCRAPER_RETRY_STATUSES', RETRY_STATUSES),
+            )
+        return _retry_policy
@@ -1,22 +1,41 @@
 #!/usr/bin/env python3
 """
 SC Courts Scraper Service for Django
+
+Sessions are scraped through the shared page pipeline (scraper.pipeline):
+fetch -> detect -> parse -> store -> crawl. One session runs inline;
+run_sessions streams several through the pipeline's worker pools. The
+crawl stage posts back every roster on a stored landing page, one page at
+a time through the same page stages, starting from the page and cookies
+the fetch stage got (see RosterCrawler).
 """
 
-import requests
-import time
 import uuid
 import logging
-from bs4 import BeautifulSoup
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
 from django.utils import timezone
-from .models import ScrapingSession, CourtRecord
+from .models import ScrapingSession
+from .counties import BASE_URL, DEFAULT_COUNTY, roster_url, validate_county
+from .async_client import get_async_engine
+from .crawler import RosterCrawler
+from .http_cache import get_http_cache
+from .http_pool import get_http_pool
+from .parsers import get_parser
+from .pipeline import PageJob, Pipeline, page_pipeline, page_pipeline_stages
+from .pipeline.store import RosterCrawlStage, SessionStoreStage
+from .protection import analyze_protection_page
+from .retry import get_retry_policy
+from .throttling import get_host_limiter, get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
 class SCCourtsScraperService:
-    def __init__(self):
-        self.base_url = "https://publicindex.sccourts.org"
-        self.target_url = "https://publicindex.sccourts.org/dorchester/courtrosters/RosterSelection.aspx"
+    def __init__(self, parser_backend=None, county=DEFAULT_COUNTY):
+        self.county = validate_county(county)
+        self.base_url = BASE_URL
+        self.target_url = roster_url(self.county)
         
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -30,12 +49,57 @@ class SCCourtsScraperService:
             'Sec-Fetch-Site': 'none',
             'Cache-Control': 'max-age=0',
         }
+        
+        self.parser = get_parser(parser_backend)
+        self.rate_limiter = get_rate_limiter()
+        self.http_cache = get_http_cache()
+        self.http_pool = get_http_pool()
+        self.retry_policy = get_retry_policy()
+        self.use_async = getattr(settings, 'SCRAPER_HTTP_MODE', 'sync') == 'async'
+        self.crawl_enabled = getattr(settings, 'SCRAPER_CRAWL_ROSTERS', True)
+    
+    def page_stage_options(self):
+        """Fetch / parse options shared by the session pipeline and roster crawls"""
+        return {
+            'headers': self.headers,
+            'parser_backend': self.parser.name,
+            'http_pool': self.http_pool,
+            'http_cache': self.http_cache,
+            'rate_limiter': self.rate_limiter,
+            'host_limiter': get_host_limiter(),
+            'retry_policy': self.retry_policy,
+            'use_async': self.use_async,
+            'async_engine': get_async_engine() if self.use_async else None,
+        }
+    
+    def build_pipeline(self, workers=1):
+        """fetch -> detect -> parse -> store (-> crawl), with `workers` fetch threads
+        
+        Parsing and storing are quick, so they get half as many threads. A
+        crawl holds its thread for all of a session's postbacks, so by
+        default every fetched session gets a crawl thread
+        (SCRAPER_CRAWL_WORKERS to change that).
+        """
+        page_stages = page_pipeline_stages(
+            fetch_workers=workers,
+            parse_workers=max(1, workers // 2),
+            **self.page_stage_options(),
+        )
+        extra_stages = [SessionStoreStage(defer_success=self.crawl_enabled, workers=max(1, workers // 2))]
+        if self.crawl_enabled:
+            # Crawls of different sessions run side by side; their postbacks
+            # go through the same page stages
+            crawl_rosters = partial(self.crawl_rosters, pipeline=Pipeline(page_stages))
+            crawl_workers = getattr(settings, 'SCRAPER_CRAWL_WORKERS', 0) or workers
+            extra_stages.append(RosterCrawlStage(crawl_rosters, workers=crawl_workers))
+        return Pipeline(page_stages + extra_stages)
     
     def create_session(self):
         """Create a new scraping session"""
         session_id = str(uuid.uuid4())
         session = ScrapingSession.objects.create(
             session_id=session_id,
+            county=self.county,
             status='pending'
         )
         return session
@@ -43,62 +107,34 @@ class SCCourtsScraperService:
     def get_current_ip(self):
         """Get current IP address"""
         try:
-            response = requests.get('http://httpbin.org/ip', timeout=10)
+            with self.http_pool.session() as session:
+                response = session.get('http://httpbin.org/ip', timeout=10)
             if response.status_code == 200:
                 return response.json().get('origin', '')
         except Exception as e:
             logger.error(f"Error getting IP: {e}")
         return None
     
-    def make_initial_request(self, session):
-        """Make initial request to establish session"""
-        try:
-            # First, try to access the main page
-            main_url = f"{self.base_url}/dorchester/courtrosters/"
-            
-            response = requests.get(main_url, headers=self.headers, timeout=30)
-            logger.info(f"Initial request status: {response.status_code}")
-            
-            if response.status_code == 200:
-                # Wait a bit before the main request
-                time.sleep(2)
-                return True
-            else:
-                logger.warning(f"Initial request failed with status: {response.status_code}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"Initial request error: {e}")
-            return False
+    def page_job(self, session, ip_address=None):
+        """Pipeline job for a session's roster page"""
+        return PageJob(roster_url(session.county), context={'session': session, 'ip_address': ip_address})
+    
+    def mark_running(self, session):
+        session.status = 'running'
+        session.claimed_at = timezone.now()
+        session.user_agent = self.headers.get('User-Agent', '')
+        session.save()
     
     def scrape_website(self, session):
         """Main scraping function using complete session approach"""
         try:
-            # Update session status
-            session.status = 'running'
-            session.ip_address = self.get_current_ip()
-            session.user_agent = self.headers.get('User-Agent', '')
-            session.save()
+            self.mark_running(session)
             
-            # Use complete session approach
-            result = self.run_complete_session()
-            
-            if result:
-                session.status = 'success'
-                session.raw_html = result.get('html', '')
-                session.parsed_data = result.get('data', {})
-                session.forms_count = len(result.get('data', {}).get('forms', []))
-                session.inputs_count = len(result.get('data', {}).get('inputs', []))
-                session.selects_count = len(result.get('data', {}).get('selects', []))
-                session.links_count = len(result.get('data', {}).get('links', []))
-                session.scripts_count = len(result.get('data', {}).get('scripts', []))
-                session.save()
-                return True
-            else:
-                session.status = 'blocked'
-                session.error_message = 'Complete session failed - likely IP blocking'
-                session.save()
-                return False
+            # The IP lookup overlaps the page fetch; the store stage waits for it
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                job = self.page_job(session, ip_address=executor.submit(self.get_current_ip))
+                self.build_pipeline().run_one(job)
+            return session.status == 'success'
                 
         except Exception as e:
             logger.error(f"Scraping error: {e}")
@@ -107,94 +143,39 @@ class SCCourtsScraperService:
             session.save()
             return False
     
-    def run_complete_session(self):
-        """Run the complete session sequence"""
-        try:
-            # Create session with proper headers
-            session = requests.Session()
-            session.headers.update(self.headers)
-            
-            # Make main request
-            response = session.get(self.target_url, timeout=30)
-            
-            if response.status_code == 200:
-                if 'Incapsula' in response.text:
-                    return False
-                else:
-                    # Parse successful response
-                    parsed_data = self.parse_content(response.text)
-                    return {
-                        'html': response.text,
-                        'data': parsed_data
-                    }
-            else:
-                return False
-                
-        except Exception as e:
-            logger.error(f"Complete session error: {e}")
-            return False
+    def run_sessions(self, sessions, workers=4):
+        """Scrape several claimed sessions through one streamed pipeline
+        
+        Yields (session, success) as each one is stored.
+        """
+        sessions = list(sessions)
+        for session in sessions:
+            self.mark_running(session)
+        
+        # Every page goes out from the same machine, so one lookup serves them all
+        ip_address = self.get_current_ip()
+        jobs = (self.page_job(session, ip_address=ip_address) for session in sessions)
+        for job in self.build_pipeline(workers=workers).run(jobs):
+            session = job.context['session']
+            yield session, session.status == 'success'
+    
+    def crawl_rosters(self, county=None, page=None, cookies=None, pipeline=None):
+        """Yield parsed pages for every roster on a county's roster selection page
+        
+        Starts from `page`, the landing page as already fetched, with the
+        `cookies` it was served under; without it the landing page is
+        fetched first. Pages go through `pipeline` (page stages only), or a
+        single-threaded page pipeline of the crawl's own.
+        """
+        target_url = roster_url(county) if county else self.target_url
+        if pipeline is None:
+            pipeline = page_pipeline(fetch_workers=1, parse_workers=1, **self.page_stage_options())
+        return RosterCrawler(target_url, pipeline, cookies=cookies).crawl(page)
     
     def analyze_protection_page(self, html_content):
         """Analyze the protection page to understand what's blocking access"""
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Look for common protection indicators
-            protection_indicators = {
-                'incapsula': 'Incapsula' in html_content,
-                'cloudflare': 'Cloudflare' in html_content,
-                'ddos_guard': 'DDoS-Guard' in html_content,
-                'sucuri': 'Sucuri' in html_content,
-                'recaptcha': 'reCAPTCHA' in html_content or 'recaptcha' in html_content.lower(),
-                'hcaptcha': 'hCaptcha' in html_content or 'hcaptcha' in html_content.lower(),
-                'challenge': 'challenge' in html_content.lower(),
-                'verification': 'verification' in html_content.lower(),
-                'robot_check': 'robot' in html_content.lower() or 'bot' in html_content.lower(),
-                'captcha': 'captcha' in html_content.lower(),
-            }
-            
-            # Look for specific elements
-            forms = soup.find_all('form')
-            inputs = soup.find_all('input')
-            buttons = soup.find_all('button')
-            scripts = soup.find_all('script')
-            
-            # Look for specific protection elements
-            protection_elements = {
-                'challenge_forms': [form for form in forms if any(keyword in form.get_text().lower() for keyword in ['challenge', 'verify', 'captcha', 'robot'])],
-                'captcha_inputs': [input_tag for input_tag in inputs if input_tag.get('type') in ['text', 'hidden'] and any(keyword in str(input_tag).lower() for keyword in ['captcha', 'challenge', 'verify'])],
-                'verification_buttons': [button for button in buttons if any(keyword in button.get_text().lower() for keyword in ['verify', 'continue', 'proceed', 'submit'])],
-                'protection_scripts': [script for script in scripts if any(keyword in script.get_text().lower() for keyword in ['incapsula', 'cloudflare', 'challenge', 'captcha'])],
-            }
-            
-            # Extract page title and meta information
-            title = soup.title.get_text(strip=True) if soup.title else ''
-            meta_description = soup.find('meta', attrs={'name': 'description'})
-            meta_description = meta_description.get('content', '') if meta_description else ''
-            
-            # Look for specific text content
-            page_text = soup.get_text()
-            protection_texts = {
-                'access_denied': 'access denied' in page_text.lower(),
-                'blocked': 'blocked' in page_text.lower(),
-                'forbidden': 'forbidden' in page_text.lower(),
-                'not_authorized': 'not authorized' in page_text.lower(),
-                'security_check': 'security check' in page_text.lower(),
-                'verification_required': 'verification required' in page_text.lower(),
-            }
-            
-            return {
-                'protection_indicators': protection_indicators,
-                'protection_elements': protection_elements,
-                'protection_texts': protection_texts,
-                'page_title': title,
-                'meta_description': meta_description,
-                'total_forms': len(forms),
-                'total_inputs': len(inputs),
-                'total_buttons': len(buttons),
-                'total_scripts': len(scripts),
-                'page_text_preview': page_text[:500] + '...' if len(page_text) > 500 else page_text,
-            }
+            return analyze_protection_page(html_content)
             
         except Exception as e:
             logger.error(f"Error analyzing protection page: {e}")
@@ -203,122 +184,18 @@ class SCCourtsScraperService:
     def parse_content(self, html_content):
         """Parse HTML content and extract useful data"""
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Extract forms
-            forms = []
-            for form in soup.find_all('form'):
-                form_data = {
-                    'action': form.get('action', ''),
-                    'method': form.get('method', ''),
-                    'id': form.get('id', ''),
-                    'class': form.get('class', []),
-                    'inputs': []
-                }
-                
-                # Extract form inputs
-                for input_tag in form.find_all('input'):
-                    input_data = {
-                        'type': input_tag.get('type', ''),
-                        'name': input_tag.get('name', ''),
-                        'value': input_tag.get('value', ''),
-                        'id': input_tag.get('id', ''),
-                        'class': input_tag.get('class', [])
-                    }
-                    form_data['inputs'].append(input_data)
-                
-                forms.append(form_data)
-            
-            # Extract all inputs
-            inputs = []
-            for input_tag in soup.find_all('input'):
-                input_data = {
-                    'type': input_tag.get('type', ''),
-                    'name': input_tag.get('name', ''),
-                    'value': input_tag.get('value', ''),
-                    'id': input_tag.get('id', ''),
-                    'class': input_tag.get('class', [])
-                }
-                inputs.append(input_data)
-            
-            # Extract select elements
-            selects = []
-            for select in soup.find_all('select'):
-                select_data = {
-                    'name': select.get('name', ''),
-                    'id': select.get('id', ''),
-                    'class': select.get('class', []),
-                    'options': []
-                }
-                
-                for option in select.find_all('option'):
-                    option_data = {
-                        'value': option.get('value', ''),
-                        'text': option.get_text(strip=True),
-                        'selected': option.get('selected') is not None
-                    }
-                    select_data['options'].append(option_data)
-                
-                selects.append(select_data)
-            
-            # Extract links
-            links = []
-            for link in soup.find_all('a'):
-                link_data = {
-                    'href': link.get('href', ''),
-                    'text': link.get_text(strip=True),
-                    'id': link.get('id', ''),
-                    'class': link.get('class', [])
-                }
-                links.append(link_data)
-            
-            # Extract scripts
-            scripts = []
-            for script in soup.find_all('script'):
-                script_data = {
-                    'src': script.get('src', ''),
-                    'type': script.get('type', ''),
-                    'content': script.get_text(strip=True)[:500] if script.get_text(strip=True) else ''
-                }
-                scripts.append(script_data)
-            
-            return {
-                'forms': forms,
-                'inputs': inputs,
-                'selects': selects,
-                'links': links,
-                'scripts': scripts,
-                'title': soup.title.get_text(strip=True) if soup.title else '',
-                'meta_description': soup.find('meta', attrs={'name': 'description'}).get('content', '') if soup.find('meta', attrs={'name': 'description'}) else ''
-            }
+            return self.parser.parse(html_content)
             
         except Exception as e:
             logger.error(f"Error parsing content: {e}")
             return {}
     
-    def extract_court_records(self, session, parsed_data):
-        """Extract court records from parsed data"""
-        try:
-            # This is a placeholder - you would implement actual record extraction
-            # based on the specific structure of the SC courts website
-            
-            # For now, create a sample record
-            if session.forms_count > 0:
-                CourtRecord.objects.create(
-                    session=session,
-                    record_type='Form Data',
-                    case_number='N/A',
-                    party_name='SC Courts Website',
-                    raw_data=parsed_data
-                )
-                
-        except Exception as e:
-            logger.error(f"Error extracting court records: {e}")
+    def extract_court_records(self, session, html_content, batch_size=None):
+        """Extract roster records from the page and sync them into the county's records"""
+        return SessionStoreStage(batch_size=batch_size).extract_court_records(session, html_content)
     
-    def run_scraping(self):
-        """Run the complete scraping process"""
-        session = self.create_session()
-        
+    def run_session(self, session):
+        """Run the scraping process for an existing (queued) session"""
         try:
             success = self.scrape_website(session)
             return session, success
@@ -328,3 +205,8 @@ class SCCourtsScraperService:
             session.error_message = str(e)
             session.save()
             return session, False
+    
+    def run_scraping(self):
+        """Run the complete scraping process"""
+        session = self.create_session()
+        return self.run_session(session)
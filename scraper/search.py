@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Ranked full-text search over sessions and court records
+
+On SQLite the FTS5 tables from migration 0008 are queried directly and
+results come back ordered by bm25 rank; triggers keep them in sync with
+every insert, update and delete (bulk_create and update() included). On
+other databases the same functions fall back to icontains filters.
+"""
+
+import re
+import logging
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from .models import CourtRecord, ScrapingSession
+
+logger = logging.getLogger(__name__)
+
+SESSION_FTS = 'scraper_session_fts'
+RECORD_FTS = 'scraper_record_fts'
+
+# Same token characters as the FTS5 tokenizer (word characters and '-')
+TOKEN_RE = re.compile(r"[\w-]+", re.UNICODE)
+
+
+def fts_enabled():
+    return connection.vendor == 'sqlite'
+
+
+def match_query(text):
+    """FTS5 MATCH expression for free text: every term, each as a prefix
+
+    Terms are quoted so user input can't inject FTS5 query syntax.
+    """
+    terms = [term.strip('-') for term in TOKEN_RE.findall(text or '')]
+    terms = [term for term in terms if term]
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def ranked_ids(fts_table, query, limit):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid, bm25({fts_table}) FROM {fts_table} "
+            f"WHERE {fts_table} MATCH %s ORDER BY bm25({fts_table}) LIMIT %s",
+            [query, limit],
+        )
+        return cursor.fetchall()
+
+
+def search_records(text, limit=50):
+    """[(CourtRecord, score)] best match first; lower scores rank higher"""
+    if fts_enabled():
+        query = match_query(text)
+        if query is None:
+            return []
+        ranked = ranked_ids(RECORD_FTS, query, limit)
+        records = CourtRecord.objects.select_related('session').in_bulk([pk for pk, _ in ranked])
+        return [(records[pk], score) for pk, score in ranked if pk in records]
+
+    records = CourtRecord.objects.select_related('session').filter(
+        Q(party_name__icontains=text) | Q(case_number__icontains=text)
+    )[:limit]
+    return [(record, 0.0) for record in records]
+
+
+def search_sessions(text, limit=50):
+    """[(ScrapingSession, score)] best match first"""
+    if fts_enabled():
+        query = match_query(text)
+        if query is None:
+            return []
+        ranked = ranked_ids(SESSION_FTS, query, limit)
+        sessions = ScrapingSession.objects.for_listing().in_bulk([pk for pk, _ in ranked])
+        return [(sessions[pk], score) for pk, score in ranked if pk in sessions]
+
+    sessions = filter_sessions(ScrapingSession.objects.for_listing(), text)[:limit]
+    return [(session, 0.0) for session in sessions]
+
+
+def filter_sessions(sessions, text):
+    """Narrow a session queryset to those matching the search text"""
+    if fts_enabled():
+        query = match_query(text)
+        if query is None:
+            return sessions.none()
+        return sessions.filter(id__in=RawSQL(
+            f"SELECT rowid FROM {SESSION_FTS} WHERE {SESSION_FTS} MATCH %s", [query]
+        ))
+
+    return sessions.filter(
+        Q(session_id__icontains=text) |
+        Q(status__icontains=text) |
+        Q(error_message__icontains=text)
+    )
@@ -0,0 +1,16 @@
+"""
+SQLite backend that starts transactions with BEGIN IMMEDIATE
+
+Django opens SQLite transactions as DEFERRED: they start as readers and
+upgrade to a write lock on their first write. When another connection is
+already writing, that upgrade fails at once with "database is locked"
+(busy_timeout does not apply to it). Taking the write lock at BEGIN makes
+concurrent writers queue on busy_timeout instead.
+"""
+
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+
+
+class DatabaseWrapper(SQLiteDatabaseWrapper):
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute("BEGIN IMMEDIATE")
@@ -0,0 +1,66 @@
+"""Fixtures shared by the scraper tests"""
+
+from datetime import date
+import requests
+
+from ..models import ScrapingSession
+
+
+def make_session(session_id, status='pending', county='dorchester', **fields):
+    session = ScrapingSession.objects.create(session_id=session_id, county=county, **fields)
+    if status != 'pending':
+        session.status = status
+        session.save()
+    return session
+
+
+def roster_record(case_number, party_name='Jane Roe', status='Scheduled', filing_date=date(2025, 1, 2)):
+    return {
+        'case_number': case_number,
+        'party_name': party_name,
+        'filing_date': filing_date,
+        'status': status,
+        'record_type': 'Roster',
+        'raw_data': {'Case Number': case_number, 'Party': party_name},
+    }
+
+
+ROSTER_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+  <title>Dorchester County Court Rosters</title>
+  <meta name="description" content="Daily court rosters">
+  <script src="/WebResource.axd?d=abc"></script>
+  <style>td { padding: 2px; }</style>
+</head>
+<body>
+  <form method="post" action="./Rosters.aspx" id="form1">
+    <input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="dDwtMTA4">
+    <input type="hidden" name="__EVENTVALIDATION" value="wEWAgL">
+    <input type="text" name="txtParty" class="search wide" placeholder="Party name">
+    <select name="ddlRoster" id="ddlRoster">
+      <option value="GS">General Sessions</option>
+      <option value="FAM" selected>Family Court</option>
+    </select>
+    <a href="javascript:__doPostBack('lnkNext','')">Next page</a>
+    <a href="/help.aspx">Help</a>
+    <script>var roster = 'FAM';</script>
+  </form>
+  <table id="gvRoster" class="grid">
+    <tr><th>Case Number</th><th>Party Name</th><th>Hearing Date</th><th>Status</th></tr>
+    <tr><td>2025-CV-0001</td><td>Roe,  Jane</td><td>01/02/2025 9:00 AM</td><td>Scheduled</td></tr>
+    <tr><td>2025-CV-0002</td><td>Doe &amp; Sons</td><td>1/3/25</td><td>Continued</td></tr>
+    <tr><td colspan="4"><table class="pager"><tr><td>1</td><td>2</td></tr></table></td></tr>
+    <tr><th>Case Number</th><th>Party Name</th><th>Hearing Date</th><th>Status</th></tr>
+    <tr><td>2025-CV-0003</td><td>Smith</td><td></td><td>Disposed</td></tr>
+  </table>
+</body>
+</html>"""
+
+
+def http_response(status, headers=None, body=b''):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response._content = body
+    return response
@@ -0,0 +1,120 @@
+import asyncio
+import tempfile
+import threading
+from pathlib import Path
+from unittest import mock, skipUnless
+from django.test import SimpleTestCase
+
+from ..async_client import AsyncHttpEngine, httpx, is_available
+from ..http_cache import HttpCache
+from ..pipeline import FetchStage, PageJob, Pipeline
+from ..retry import RetryPolicy
+from ..throttling import HostConcurrencyLimiter
+
+
+class MockEngine(AsyncHttpEngine):
+    """Engine whose clients answer through handler(request) instead of the network"""
+
+    def __init__(self, handler):
+        super().__init__()
+        self.handler = handler
+
+    def new_client(self, proxies):
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+
+
+@skipUnless(is_available(), 'httpx is not installed')
+class AsyncFetchTests(SimpleTestCase):
+
+    def setUp(self):
+        self.in_flight = 0
+        self.peak = 0
+        self.threads = set()
+        self.failures = {}
+        self.engine = MockEngine(self.handle)
+        self.addCleanup(self.engine.close)
+
+    async def handle(self, request):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        self.threads.update(thread.name for thread in threading.enumerate() if thread.name.startswith('pipeline-'))
+        try:
+            await asyncio.sleep(0.05)
+            path = request.url.path
+            if self.failures.get(path):
+                self.failures[path] -= 1
+                raise httpx.ConnectError('reset', request=request)
+            return httpx.Response(200, html=f'<p>{path}</p>', headers={'Set-Cookie': 'seen=1'})
+        finally:
+            self.in_flight -= 1
+
+    def fetch_stage(self, **options):
+        return FetchStage(use_async=True, async_engine=self.engine, **options)
+
+    def test_fetch_many_keeps_every_job_in_flight(self):
+        jobs = [PageJob(f'https://example.com/{n}', cookies={'session': 'abc'}) for n in range(6)]
+        stage = self.fetch_stage(workers=1)
+
+        fetched = stage.fetch_many(jobs)
+
+        self.assertEqual(fetched, jobs)
+        self.assertEqual(self.peak, 6)
+        # No pipeline threads: the calling thread waits on the loop
+        self.assertEqual(self.threads, set())
+        self.assertEqual([job.html for job in jobs], [f'<p>/{n}</p>' for n in range(6)])
+        self.assertEqual(jobs[0].response_cookies, {'session': 'abc', 'seen': '1'})
+
+    def test_pipeline_caps_jobs_in_flight_at_workers(self):
+        stage = self.fetch_stage(workers=3)
+
+        jobs = list(Pipeline([stage]).run(PageJob(f'https://example.com/{n}') for n in range(7)))
+
+        self.assertEqual(sorted(job.html for job in jobs), sorted(f'<p>/{n}</p>' for n in range(7)))
+        self.assertEqual(self.peak, 3)
+        # One thread hands jobs to the loop, another passes them on
+        self.assertEqual(self.threads, {'pipeline-fetch', 'pipeline-fetch-out'})
+        self.assertTrue(all(job.timings['fetch'] > 0 for job in jobs))
+
+    def test_host_limiter_applies_to_async_fetches(self):
+        stage = self.fetch_stage(host_limiter=HostConcurrencyLimiter(2))
+
+        stage.fetch_many(PageJob(f'https://example.com/{n}') for n in range(5))
+
+        self.assertEqual(self.peak, 2)
+
+    def test_rate_limiter_waits_without_a_thread(self):
+        limiter = mock.Mock(wait_async=mock.AsyncMock(return_value=0.0))
+        stage = self.fetch_stage(rate_limiter=limiter)
+
+        stage.fetch_many(PageJob(f'https://example.com/{n}') for n in range(3))
+
+        self.assertEqual(limiter.wait_async.await_args_list, [mock.call('example.com')] * 3)
+        limiter.wait.assert_not_called()
+
+    def test_fresh_cache_hit_takes_no_token(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        cache = HttpCache(Path(directory.name) / 'http_cache.sqlite3', default_ttl=3600)
+        limiter = mock.Mock(wait_async=mock.AsyncMock(return_value=0.0))
+        stage = self.fetch_stage(http_cache=cache, rate_limiter=limiter)
+
+        first = stage.fetch_many([PageJob('https://example.com/page')])[0]
+        hit = stage.fetch_many([PageJob('https://example.com/page')])[0]
+
+        self.assertEqual((first.html, hit.html), ('<p>/page</p>', '<p>/page</p>'))
+        self.assertEqual(limiter.wait_async.await_count, 1)
+
+    def test_retries_and_failures(self):
+        self.failures = {'/flaky': 1, '/down': 5}
+        stage = self.fetch_stage(retry_policy=RetryPolicy(max_attempts=2, backoff=0, deadline=None))
+
+        flaky, down = stage.fetch_many([PageJob('https://example.com/flaky'), PageJob('https://example.com/down')])
+
+        self.assertEqual((flaky.attempts, flaky.status_code, flaky.error), (2, 200, None))
+        self.assertEqual((down.attempts, down.status_code), (2, None))
+        self.assertEqual(down.error, 'fetch: reset')
+
+    def test_run_one_waits_for_the_fetch(self):
+        job = Pipeline([self.fetch_stage()]).run_one(PageJob('https://example.com/one'))
+
+        self.assertEqual((job.status_code, job.html), (200, '<p>/one</p>'))
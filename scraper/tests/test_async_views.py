@@ -0,0 +1,75 @@
+import io
+import asyncio
+from asgiref.sync import sync_to_async
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from .. import views
+from ..models import ScrapingSession
+from ..pagination import apaginate, paginate
+from .helpers import make_session
+
+API_VIEWS = ['api_start_scraping', 'api_session_events', 'api_session_status', 'api_session_data',
+             'api_session_fragment', 'api_sessions', 'api_records', 'api_changes', 'api_search']
+
+
+class AsyncApiViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for index in range(5):
+            make_session(f's{index}', status='success' if index % 2 else 'failed')
+
+    def test_api_views_are_coroutines(self):
+        for name in API_VIEWS:
+            view = getattr(views, name)
+            # Under ASGI Django awaits these on the event loop instead of using a worker thread
+            self.assertTrue(asyncio.iscoroutinefunction(view), name)
+            self.assertTrue(view.csrf_exempt, name)
+
+    async def test_status_lookup_uses_the_async_orm(self):
+        response = await self.async_client.get(reverse('scraper:api_session_status', args=['s1']))
+        missing = await self.async_client.get(reverse('scraper:api_session_status', args=['nope']))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'success')
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_wrong_method_is_rejected(self):
+        response = await self.async_client.post(reverse('scraper:api_session_status', args=['s1']))
+
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(response['Allow'], 'GET')
+
+    async def test_sessions_page_matches_the_sync_paginator(self):
+        sessions = ScrapingSession.objects.for_listing()
+
+        page = await apaginate(sessions, page_size=2)
+        expected = await sync_to_async(lambda: list(paginate(sessions, page_size=2)))()
+        response = await self.async_client.get(reverse('scraper:api_sessions'), {'limit': 2})
+
+        self.assertEqual([session.session_id for session in page], [session.session_id for session in expected])
+        self.assertEqual([row['session_id'] for row in response.json()['results']],
+                         [session.session_id for session in expected])
+
+    def test_sync_client_still_works(self):
+        # WSGI deployments call the same views through async_to_sync
+        response = self.client.get(reverse('scraper:api_session_status', args=['s0']))
+        self.assertEqual(response.json()['status'], 'failed')
+
+
+class BenchmarkApiCommandTests(TransactionTestCase):
+
+    def test_in_process_asgi_run(self):
+        out = io.StringIO()
+        call_command('benchmark_api', in_process='asgi', concurrency=2, requests=4, sessions=2,
+                     endpoint=['status'], stdout=out)
+
+        self.assertIn('status: 4 ok', out.getvalue())
+        self.assertFalse(ScrapingSession.objects.exists())
+
+    def test_needs_a_target(self):
+        with self.assertRaisesMessage(CommandError, 'Give either --url or --in-process'):
+            call_command('benchmark_api', stdout=io.StringIO())
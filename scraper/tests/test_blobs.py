@@ -0,0 +1,86 @@
+from unittest import skipUnless
+from django.test import SimpleTestCase, TestCase
+
+from ..blobs import CODEC_GZIP, CODEC_ZSTD, compress, decompress, decompress_prefix, zstandard
+from ..models import HtmlBlob, ScrapingSession
+
+
+class CodecTests(SimpleTestCase):
+
+    page = '<html>Résumé – ' + 'roster row ' * 2000 + '</html>'
+
+    def check_codec(self, codec):
+        stored_codec, data = compress(self.page, codec)
+
+        self.assertEqual(stored_codec, codec)
+        self.assertLess(len(data), len(self.page) // 10)
+        self.assertEqual(decompress(codec, data), self.page)
+        self.assertEqual(decompress_prefix(codec, data, 20), (self.page[:20], True))
+        # A few bytes may not hold enough text yet
+        text, complete = decompress_prefix(codec, data[:20], 10 ** 6)
+        self.assertFalse(complete)
+        self.assertTrue(self.page.startswith(text))
+
+    def test_gzip(self):
+        self.check_codec(CODEC_GZIP)
+        # Identical pages compress to identical bytes
+        self.assertEqual(compress(self.page, CODEC_GZIP), compress(self.page, CODEC_GZIP))
+
+    @skipUnless(zstandard is not None, 'zstandard is not installed')
+    def test_zstd(self):
+        self.check_codec(CODEC_ZSTD)
+
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError):
+            compress(self.page, 'lz4')
+        with self.assertRaises(ValueError):
+            decompress('lz4', b'')
+
+
+class HtmlBlobTests(TestCase):
+
+    def test_same_html_is_stored_once(self):
+        first = ScrapingSession(session_id='a')
+        first.set_raw_html('<html>same page</html>')
+        first.save()
+        second = ScrapingSession(session_id='b')
+        second.set_raw_html('<html>same page</html>')
+        second.save()
+
+        self.assertEqual(HtmlBlob.objects.count(), 1)
+        self.assertEqual(first.html_blob_id, second.html_blob_id)
+        self.assertEqual(ScrapingSession.objects.get(session_id='b').raw_html, '<html>same page</html>')
+
+    def test_preview_reads_a_prefix(self):
+        html = '<html>' + 'x' * 50000 + '</html>'
+        session = ScrapingSession(session_id='a')
+        session.set_raw_html(html)
+        session.save()
+
+        self.assertEqual(HtmlBlob.preview(session.html_blob_id, 100), html[:100])
+        self.assertEqual(HtmlBlob.preview(session.html_blob_id, 10 ** 6), html)
+
+    def test_blob_is_deleted_with_its_last_session(self):
+        sessions = []
+        for session_id in ('a', 'b'):
+            session = ScrapingSession(session_id=session_id)
+            session.set_raw_html('<html>shared</html>')
+            session.save()
+            sessions.append(session)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            sessions[0].delete()
+        self.assertEqual(HtmlBlob.objects.count(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            sessions[1].delete()
+        self.assertEqual(HtmlBlob.objects.count(), 0)
+
+    def test_prune_removes_only_orphans(self):
+        session = ScrapingSession(session_id='a')
+        session.set_raw_html('<html>kept</html>')
+        session.save()
+        HtmlBlob.store('<html>orphan</html>')
+
+        self.assertEqual(HtmlBlob.prune(), 1)
+        self.assertEqual(list(HtmlBlob.objects.values_list('digest', flat=True)), [session.html_blob_id])
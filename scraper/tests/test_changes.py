@@ -0,0 +1,84 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..changes import decode_change_cursor, encode_change_cursor, read_changes
+from ..models import RecordChange
+from ..records import sync_court_records
+from .helpers import make_session, roster_record
+
+
+class ChangeFeedTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        session = make_session('dorchester', status='success')
+        sync_court_records(session, [roster_record('2025-CV-1'), roster_record('2025-CV-2'),
+                                     roster_record('2025-CV-3')], roster='GS')
+        # 1 changes status, 3 drops off the roster
+        sync_court_records(session, [roster_record('2025-CV-1', status='Continued'), roster_record('2025-CV-2')],
+                           roster='GS')
+        sync_court_records(make_session('charleston', county='charleston'), [roster_record('2025-CV-9')])
+
+    def feed(self, **params):
+        return self.client.get(reverse('scraper:api_changes'), params)
+
+    def test_cursor_round_trip(self):
+        self.assertEqual(decode_change_cursor(encode_change_cursor(42)), 42)
+        for cursor in ('not-a-cursor', encode_change_cursor('x'), '!!'):
+            with self.assertRaisesMessage(ValueError, 'Invalid cursor'):
+                decode_change_cursor(cursor)
+
+    def test_pages_follow_the_cursor_oldest_first(self):
+        seen, cursor, more = [], None, True
+        while more:
+            changes, cursor, more = read_changes(cursor=cursor, limit=2)
+            seen.extend(change.id for change in changes)
+
+        self.assertEqual(seen, list(RecordChange.objects.order_by('id').values_list('id', flat=True)))
+        # An idle feed hands back the same cursor
+        self.assertEqual(read_changes(cursor=cursor), ([], cursor, False))
+
+    def test_roster_diff_events(self):
+        changes, _, _ = read_changes(county='dorchester')
+
+        self.assertEqual([(change.change_type, change.case_number, change.roster) for change in changes], [
+            ('added', '2025-CV-1', 'GS'), ('added', '2025-CV-2', 'GS'), ('added', '2025-CV-3', 'GS'),
+            ('modified', '2025-CV-1', 'GS'), ('removed', '2025-CV-3', 'GS'),
+        ])
+        self.assertEqual(changes[3].changes, {'status': ['Scheduled', 'Continued']})
+
+    def test_filters(self):
+        removed, _, _ = read_changes(change_type='removed')
+        self.assertEqual([change.case_number for change in removed], ['2025-CV-3'])
+        charleston, _, _ = read_changes(county='charleston')
+        self.assertEqual([change.case_number for change in charleston], ['2025-CV-9'])
+        with self.assertRaisesMessage(ValueError, 'Unknown change_type'):
+            read_changes(change_type='renamed')
+
+    def test_since_with_nothing_new_resumes_after_the_latest_change(self):
+        tomorrow = (timezone.now() + timedelta(days=1)).date().isoformat()
+        changes, cursor, more = read_changes(since=tomorrow)
+        self.assertEqual((changes, more), ([], False))
+
+        sync_court_records(make_session('later', status='success'), [roster_record('2025-CV-4')], roster='GS',
+                           mark_missing=False)
+        changes, _, _ = read_changes(cursor=cursor)
+        self.assertEqual([(change.change_type, change.case_number) for change in changes], [('added', '2025-CV-4')])
+
+    def test_api(self):
+        first = self.feed(limit=4, county='dorchester').json()
+        rest = self.feed(cursor=first['next_cursor'], county='dorchester').json()
+
+        self.assertTrue(first['has_more'])
+        self.assertEqual(len(first['results']), 4)
+        self.assertEqual([(change['change_type'], change['session_id']) for change in rest['results']],
+                         [('removed', 'dorchester')])
+        self.assertFalse(rest['has_more'])
+
+    def test_api_rejects_bad_parameters(self):
+        for params in ({'cursor': 'garbage'}, {'since': 'yesterday'}, {'change_type': 'renamed'}):
+            response = self.feed(**params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('error', response.json())
@@ -0,0 +1,148 @@
+from unittest import mock
+import requests
+from django.test import SimpleTestCase, TestCase
+
+from ..counties import roster_url
+from ..crawler import RosterCrawler
+from ..models import ScrapingSession
+from ..parsers import get_parser
+from ..pipeline import PageJob, Pipeline, page_pipeline_stages
+from ..pipeline.store import RosterCrawlStage, SessionStoreStage
+from .helpers import ROSTER_PAGE, http_response, make_session
+
+LANDING_URL = roster_url('dorchester')
+POSTBACK_URL = LANDING_URL.rsplit('/', 1)[0] + '/Rosters.aspx'
+
+
+class FakeHttpSession:
+    """Answers requests with `pages` ((status, html, cookies set)) in order, recording each one"""
+
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.requests = []
+        self.cookies = requests.cookies.RequestsCookieJar()
+
+    def request(self, method, url, data=None, cookies=None, **kwargs):
+        self.requests.append({'method': method, 'url': url, 'data': data, 'cookies': dict(cookies or {})})
+        status, html, set_cookies = self.pages.pop(0)
+        response = http_response(status, {'Content-Type': 'text/html; charset=utf-8'}, html.encode('utf-8'))
+        response.url = url
+        response.cookies = requests.cookies.cookiejar_from_dict(set_cookies)
+        return response
+
+    def close(self):
+        pass
+
+
+def fake_page_stages(http):
+    return page_pipeline_stages(session_factory=lambda: http, fetch_workers=1, parse_workers=1)
+
+
+def roster_page(viewstate):
+    return ROSTER_PAGE.replace('dDwtMTA4', viewstate)
+
+
+class RosterCrawlerTests(SimpleTestCase):
+
+    def crawl(self, http, page=None, cookies=None):
+        crawler = RosterCrawler(LANDING_URL, Pipeline(fake_page_stages(http)), cookies=cookies, delay=0)
+        return list(crawler.crawl(page))
+
+    def test_starts_from_the_given_page_and_cookies(self):
+        http = FakeHttpSession([
+            (200, roster_page('GS-STATE'), {'ASP.NET_SessionId': 'rotated'}),
+            (200, roster_page('FAM-STATE'), {}),
+        ])
+        landing = {'url': LANDING_URL, 'html': ROSTER_PAGE, 'data': get_parser().parse(ROSTER_PAGE)}
+
+        pages = self.crawl(http, page=landing, cookies={'ASP.NET_SessionId': 'first'})
+
+        self.assertEqual([page['roster'] and page['roster']['value'] for page in pages], [None, 'GS', 'FAM'])
+        self.assertTrue(all(page['error'] is None for page in pages))
+        # No second GET of the landing page
+        self.assertEqual([(request['method'], request['url']) for request in http.requests],
+                         [('POST', POSTBACK_URL), ('POST', POSTBACK_URL)])
+        first, second = http.requests
+        self.assertEqual(first['cookies'], {'ASP.NET_SessionId': 'first'})
+        self.assertEqual((first['data']['ddlRoster'], first['data']['__VIEWSTATE'], first['data']['__EVENTTARGET']),
+                         ('GS', 'dDwtMTA4', 'ddlRoster'))
+        # Each postback carries the page state and cookies of the one before
+        self.assertEqual(second['cookies'], {'ASP.NET_SessionId': 'rotated'})
+        self.assertEqual((second['data']['ddlRoster'], second['data']['__VIEWSTATE']), ('FAM', 'GS-STATE'))
+
+    def test_fetches_the_landing_page_without_one(self):
+        http = FakeHttpSession([
+            (200, ROSTER_PAGE, {'ASP.NET_SessionId': 'new'}),
+            (200, roster_page('GS-STATE'), {}),
+            (200, roster_page('FAM-STATE'), {}),
+        ])
+
+        pages = self.crawl(http)
+
+        self.assertEqual(len(pages), 3)
+        self.assertEqual([request['method'] for request in http.requests], ['GET', 'POST', 'POST'])
+        self.assertEqual(http.requests[1]['cookies'], {'ASP.NET_SessionId': 'new'})
+
+    def test_failed_postback_is_yielded_and_ends_the_crawl(self):
+        http = FakeHttpSession([(500, 'Server Error', {})])
+        landing = {'url': LANDING_URL, 'html': ROSTER_PAGE, 'data': get_parser().parse(ROSTER_PAGE)}
+
+        pages = self.crawl(http, page=landing)
+
+        self.assertEqual(len(pages), 2)
+        self.assertEqual(pages[1]['roster']['value'], 'GS')
+        self.assertEqual(pages[1]['error'], f"Roster request returned 500 (POST {POSTBACK_URL})")
+        self.assertIsNone(pages[1]['data'])
+        self.assertEqual(len(http.requests), 1)
+
+
+class RosterCrawlStageTests(TestCase):
+
+    def run_session(self, http):
+        session = make_session('crawled', status='running')
+        page_stages = fake_page_stages(http)
+
+        def crawl_rosters(county, page=None, cookies=None):
+            return RosterCrawler(roster_url(county), Pipeline(page_stages), cookies=cookies, delay=0).crawl(page)
+
+        pipeline = Pipeline(page_stages + [SessionStoreStage(defer_success=True), RosterCrawlStage(crawl_rosters)])
+        published = []
+        with mock.patch('scraper.models.publish_session_status',
+                        side_effect=lambda session: published.append((session.status, len(http.requests)))):
+            job = pipeline.run_one(PageJob(LANDING_URL, context={'session': session}))
+        return job, published
+
+    def test_session_finishes_after_the_crawl(self):
+        http = FakeHttpSession([
+            (200, ROSTER_PAGE, {'ASP.NET_SessionId': 'abc'}),
+            (200, roster_page('GS-STATE'), {}),
+            (503, 'Busy', {}),
+        ])
+
+        job, published = self.run_session(http)
+
+        self.assertIsNone(job.error)
+        # One landing GET, reused by the crawl; its cookies go with the postbacks
+        self.assertEqual([request['method'] for request in http.requests], ['GET', 'POST', 'POST'])
+        self.assertEqual(http.requests[1]['cookies'], {'ASP.NET_SessionId': 'abc'})
+        # 'success' (the end of the session's event stream) only once every roster is done
+        self.assertEqual(published, [('success', 3)])
+
+        session = ScrapingSession.objects.get(session_id='crawled')
+        self.assertEqual(session.status, 'success')
+        self.assertEqual(session.selects_count, 1)
+        self.assertEqual(session.roster_results, {
+            'GS': {'created': 0, 'updated': 3, 'unchanged': 0, 'removed': 0},
+            'FAM': {'error': f"Roster request returned 503 (POST {POSTBACK_URL})"},
+        })
+        self.assertEqual(job.context['rosters'], session.roster_results)
+
+    def test_blocked_page_is_not_crawled(self):
+        http = FakeHttpSession([(200, '<html><body>Incapsula incident</body></html>', {})])
+
+        job, published = self.run_session(http)
+
+        self.assertEqual(published, [('blocked', 1)])
+        session = ScrapingSession.objects.get(session_id='crawled')
+        self.assertEqual(session.status, 'blocked')
+        self.assertIsNone(session.roster_results)
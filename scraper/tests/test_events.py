@@ -0,0 +1,145 @@
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from .. import events
+from ..events import MemoryEventBroker, SQLiteEventBroker, get_event_broker, session_channel, session_event_stream
+from .helpers import make_session
+
+
+def temp_broker(test, **options):
+    """SQLite broker on a file that is removed after the test"""
+    directory = tempfile.TemporaryDirectory()
+    test.addCleanup(directory.cleanup)
+    return SQLiteEventBroker(Path(directory.name) / 'events.sqlite3', poll_interval=0.01, **options)
+
+
+def parse_stream(chunks):
+    """(event, id, data) for every SSE message, skipping the retry line and keepalives"""
+    messages = []
+    for chunk in chunks:
+        fields = dict(line.split(': ', 1) for line in chunk.strip().split('\n') if not line.startswith((':', 'retry')))
+        if fields:
+            messages.append((fields['event'], fields.get('id'), json.loads(fields['data'])))
+    return messages
+
+
+def status(session_id, value, updated_at):
+    return {'session_id': session_id, 'county': 'dorchester', 'status': value, 'error_message': None,
+            'updated_at': updated_at}
+
+
+class SQLiteEventBrokerTests(SimpleTestCase):
+
+    def test_subscription_resumes_after_last_event_id(self):
+        broker = temp_broker(self)
+        first = broker.publish(session_channel('a'), {'status': 'running'})
+        broker.publish(session_channel('b'), {'status': 'running'})
+        second = broker.publish(session_channel('a'), {'status': 'success'})
+
+        async def read():
+            subscription = broker.subscribe([session_channel('a')], last_event_id=0)
+            return [await subscription.next(1), await subscription.next(1), await subscription.next(0.05)]
+
+        replayed = asyncio.run(read())
+        self.assertEqual([event[0] for event in replayed[:2]], [first, second])
+        self.assertEqual(replayed[1][2], {'status': 'success'})
+        self.assertIsNone(replayed[2])
+
+    def test_new_subscription_starts_at_the_latest_event(self):
+        broker = temp_broker(self)
+        broker.publish(session_channel('a'), {'status': 'running'})
+
+        async def read():
+            subscription = broker.subscribe([session_channel('a')])
+            return await subscription.next(0.05)
+
+        self.assertIsNone(asyncio.run(read()))
+
+    def test_expired_events_are_pruned_on_an_interval(self):
+        broker = temp_broker(self, retention=10, prune_interval=60)
+        channel = session_channel('a')
+
+        def stored():
+            return [event[0] for event in broker.read([channel], 0)]
+
+        with mock.patch('scraper.events.time.time', return_value=1000.0):
+            old = broker.publish(channel, {'n': 1})
+        with mock.patch('scraper.events.time.time', return_value=1030.0):
+            # Expired, but the last prune was under a minute ago
+            recent = broker.publish(channel, {'n': 2})
+        self.assertEqual(stored(), [old, recent])
+
+        with mock.patch('scraper.events.time.time', return_value=1061.0):
+            latest = broker.publish(channel, {'n': 3})
+        self.assertEqual(stored(), [latest])
+
+
+class SessionEventStreamTests(SimpleTestCase):
+
+    def stream(self, broker, session_ids, snapshot, last_event_id=None):
+        async def collect():
+            subscription = broker.subscribe([session_channel(session_id) for session_id in session_ids],
+                                            last_event_id=last_event_id)
+            return [chunk async for chunk in session_event_stream(subscription, session_ids, snapshot, heartbeat=1)]
+        return parse_stream(asyncio.run(collect()))
+
+    def test_replayed_events_older_than_the_snapshot_are_dropped(self):
+        broker = temp_broker(self)
+        broker.publish(session_channel('a'), status('a', 'pending', '2025-01-02T12:00:00+00:00'))
+        broker.publish(session_channel('a'), status('a', 'running', '2025-01-02T12:00:05+00:00'))
+        done = broker.publish(session_channel('a'), status('a', 'success', '2025-01-02T12:00:09.500000+00:00'))
+
+        # Reconnect with Last-Event-ID 0 while the session was running
+        messages = self.stream(broker, ['a'], [status('a', 'running', '2025-01-02T12:00:05+00:00')],
+                               last_event_id=0)
+
+        self.assertEqual([(event, event_id, data.get('status')) for event, event_id, data in messages], [
+            ('status', None, 'running'),
+            ('status', str(done), 'success'),
+            ('done', None, None),
+        ])
+
+    def test_snapshot_covers_finished_and_missing_sessions(self):
+        messages = self.stream(temp_broker(self), ['a', 'gone'],
+                               [status('a', 'failed', '2025-01-02T12:00:00+00:00')])
+
+        self.assertEqual([(event, data) for event, _, data in messages], [
+            ('status', status('a', 'failed', '2025-01-02T12:00:00+00:00')),
+            ('missing', {'session_id': 'gone'}),
+            ('done', {'session_ids': ['a', 'gone']}),
+        ])
+
+
+class EventBrokerSettingsTests(TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(events, '_broker', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @override_settings(SCRAPER_EVENT_BROKER='memory')
+    def test_broker_is_picked_by_setting(self):
+        broker = get_event_broker()
+        self.assertIsInstance(broker, MemoryEventBroker)
+        self.assertIs(get_event_broker(), broker)
+
+    def test_status_is_published_once_the_transaction_commits(self):
+        broker = temp_broker(self)
+        events._broker = broker
+
+        with self.captureOnCommitCallbacks(execute=True):
+            session = make_session('a', status='running')
+            self.assertEqual(broker.latest_id(), 0)
+
+        published = broker.read([session_channel('a')], 0)
+        self.assertEqual([payload['status'] for _, _, payload in published], ['pending', 'running'])
+        self.assertEqual(published[-1][2]['updated_at'], session.updated_at.isoformat())
+
+    def test_events_endpoint_needs_asgi(self):
+        response = self.client.get(reverse('scraper:api_session_events'), {'sessions': 'a'})
+        self.assertEqual(response.status_code, 501)
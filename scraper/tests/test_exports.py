@@ -0,0 +1,91 @@
+import csv
+import io
+import json
+import tempfile
+from datetime import date
+from pathlib import Path
+from unittest import skipUnless
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..exports import EXPORT_COLUMNS, export_queryset, pyarrow, stream_export
+from ..records import sync_court_records
+from .helpers import make_session, roster_record
+
+
+class ExportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        dorchester = make_session('dorchester', status='success')
+        sync_court_records(dorchester, [
+            roster_record('2025-CV-0001', filing_date=date(2025, 1, 2)),
+            roster_record('2025-CV-0002', status='Continued', filing_date=date(2025, 2, 3)),
+            roster_record('2025-CV-0003', filing_date=date(2025, 3, 4)),
+        ])
+        # 0003 drops off the roster
+        sync_court_records(dorchester, [
+            roster_record('2025-CV-0001', filing_date=date(2025, 1, 2)),
+            roster_record('2025-CV-0002', status='Continued', filing_date=date(2025, 2, 3)),
+        ])
+        sync_court_records(make_session('aiken', status='success', county='aiken'), [
+            roster_record('2025-CV-0001', filing_date=date(2025, 1, 2)),
+        ])
+
+    def export(self, **params):
+        response = self.client.get(reverse('scraper:api_export_records'), params)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode('utf-8')
+
+    def test_csv(self):
+        response, body = self.export()
+
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="court_records.csv"')
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual(list(rows[0]), [column for column, _ in EXPORT_COLUMNS])
+        self.assertEqual(sorted((row['county'], row['case_number']) for row in rows),
+                         [('aiken', '2025-CV-0001'), ('dorchester', '2025-CV-0001'), ('dorchester', '2025-CV-0002')])
+        self.assertEqual(json.loads(rows[0]['raw_data'])['Case Number'], rows[0]['case_number'])
+
+    def test_filters(self):
+        _, body = self.export(format='ndjson', county='Dorchester', date_from='2025-02-01', include_removed='1')
+
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([(row['case_number'], row['filing_date']) for row in rows],
+                         [('2025-CV-0002', '2025-02-03'), ('2025-CV-0003', '2025-03-04')])
+        self.assertIsNotNone(rows[1]['removed_at'])
+
+        _, body = self.export(format='ndjson', status='continued', date_to='2025-02-03')
+        self.assertEqual([json.loads(line)['case_number'] for line in body.splitlines()], ['2025-CV-0002'])
+
+    def test_bad_parameters(self):
+        for params in ({'format': 'xlsx'}, {'county': 'atlantis'}, {'date_from': '02/01/2025'}):
+            with self.subTest(params=params):
+                response = self.client.get(reverse('scraper:api_export_records'), params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+
+    def test_one_chunk_per_fetch(self):
+        chunks = list(stream_export(export_queryset(include_removed=True), 'ndjson', chunk_size=2))
+
+        self.assertEqual([chunk.count('\n') for chunk in chunks], [2, 2])
+
+    def test_command_writes_a_file(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        output = Path(directory.name) / 'records.csv'
+
+        call_command('export_records', output=str(output), county='aiken', stderr=io.StringIO())
+
+        rows = list(csv.DictReader(output.open(encoding='utf-8', newline='')))
+        self.assertEqual([(row['county'], row['case_number']) for row in rows], [('aiken', '2025-CV-0001')])
+
+    @skipUnless(pyarrow is not None, 'pyarrow is not installed')
+    def test_parquet(self):
+        response = self.client.get(reverse('scraper:api_export_records'), {'format': 'parquet'})
+        body = b''.join(response.streaming_content)
+
+        self.assertTrue(body.startswith(b'PAR1') and body.endswith(b'PAR1'))
+        self.assertEqual(pyarrow.parquet.read_table(pyarrow.BufferReader(body)).num_rows, 3)
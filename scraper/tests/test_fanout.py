@@ -0,0 +1,89 @@
+import time
+import threading
+from unittest import mock
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ..fanout import run_counties
+from ..models import ScrapingSession
+from ..scraper_service import SCCourtsScraperService
+from ..throttling import HostConcurrencyLimiter
+
+
+class FanOutTests(TestCase):
+
+    def test_one_claimed_session_per_county(self):
+        calls = []
+
+        def run_sessions(service, sessions, workers=4):
+            calls.append(([session.county for session in sessions], workers))
+            # Sessions finish in any order
+            for session in reversed(sessions):
+                yield session, session.county != 'aiken'
+
+        with mock.patch.object(SCCourtsScraperService, 'run_sessions', run_sessions):
+            results = run_counties(['Dorchester', 'aiken', 'charleston'], concurrency=3)
+
+        self.assertEqual(calls, [(['dorchester', 'aiken', 'charleston'], 3)])
+        self.assertEqual([(session.county, success) for session, success in results],
+                         [('dorchester', True), ('aiken', False), ('charleston', True)])
+        # Claimed before scraping, so a queue worker can't take them too
+        self.assertEqual(set(ScrapingSession.objects.values_list('status', flat=True)), {'running'})
+
+    def test_unknown_county_queues_nothing(self):
+        with self.assertRaises(ValueError):
+            run_counties(['dorchester', 'atlantis'])
+        self.assertFalse(ScrapingSession.objects.exists())
+
+
+class PipelineSizingTests(SimpleTestCase):
+
+    def stage_workers(self, workers):
+        pipeline = SCCourtsScraperService().build_pipeline(workers=workers)
+        return {stage.name: stage.workers for stage in pipeline.stages}
+
+    def test_stages_scale_with_workers(self):
+        self.assertEqual(self.stage_workers(8), {'fetch': 8, 'detect': 1, 'parse': 4, 'store': 4, 'crawl': 8})
+        self.assertEqual(self.stage_workers(1), {'fetch': 1, 'detect': 1, 'parse': 1, 'store': 1, 'crawl': 1})
+
+    @override_settings(SCRAPER_CRAWL_WORKERS=3)
+    def test_crawl_workers_setting(self):
+        self.assertEqual(self.stage_workers(8)['crawl'], 3)
+
+    @override_settings(SCRAPER_CRAWL_ROSTERS=False)
+    def test_no_crawl_stage_when_disabled(self):
+        self.assertNotIn('crawl', self.stage_workers(4))
+
+
+class HostConcurrencyLimiterTests(SimpleTestCase):
+
+    def test_caps_requests_in_flight_per_host(self):
+        limiter = HostConcurrencyLimiter(2)
+        lock = threading.Lock()
+        release = threading.Event()
+        in_flight, peak = [0], [0]
+
+        def request():
+            with limiter.slot('publicindex.sccourts.org'):
+                with lock:
+                    in_flight[0] += 1
+                    peak[0] = max(peak[0], in_flight[0])
+                release.wait(1)
+                with lock:
+                    in_flight[0] -= 1
+
+        threads = [threading.Thread(target=request) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + 2
+        while in_flight[0] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # Give a third request the chance to get in if the cap didn't hold
+        time.sleep(0.05)
+        # Another host has slots of its own
+        with limiter.slot('example.com'):
+            pass
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(peak[0], 2)
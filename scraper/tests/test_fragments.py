@@ -0,0 +1,81 @@
+import re
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..fragments import MAX_VALUE_CHARS, truncate_values
+from ..models import ScrapingSession
+from .helpers import make_session
+
+
+def selects_column(sql, column):
+    """True if the query reads column whole (not just a JSON path or substring of it)"""
+    return re.search(rf'(SELECT |, ){re.escape(column)}(,| FROM)', sql) is not None
+
+
+class SessionFragmentTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        inputs = [{'name': f'field{index}', 'type': 'text', 'value': ''} for index in range(5)]
+        inputs.append({'name': '__VIEWSTATE', 'type': 'hidden', 'value': 'v' * 5000})
+        session = ScrapingSession(session_id='big', status='blocked', county='dorchester',
+                                  inputs_count=len(inputs), forms_count=1,
+                                  parsed_data={'inputs': inputs, 'forms': [{'action': './Rosters.aspx'}],
+                                               'page_title': 'Access denied', 'protection_indicators': ['incapsula']})
+        session.set_raw_html('<html>' + 'x' * 5000 + '</html>')
+        session.save()
+        make_session('empty')
+
+    def fragment(self, section, session_id='big', **params):
+        return self.client.get(reverse('scraper:api_session_fragment', args=[session_id, section]), params)
+
+    def test_sections_are_paged(self):
+        first = self.fragment('inputs', limit=4).json()
+        rest = self.fragment('inputs', offset=first['next_offset'], limit=4).json()
+
+        self.assertEqual([item['name'] for item in first['items']], ['field0', 'field1', 'field2', 'field3'])
+        self.assertEqual((first['total'], first['next_offset']), (6, 4))
+        self.assertEqual([item['name'] for item in rest['items']], ['field4', '__VIEWSTATE'])
+        self.assertIsNone(rest['next_offset'])
+
+    def test_long_values_are_cut(self):
+        viewstate = self.fragment('inputs', offset=5).json()['items'][0]['value']
+        self.assertEqual(len(viewstate), MAX_VALUE_CHARS + 1)
+        self.assertEqual(truncate_values({'a': ['xyz', 1]}, max_chars=2), {'a': ['xy…', 1]})
+
+    def test_raw_html_preview(self):
+        preview = self.fragment('raw-html', chars=100).json()
+
+        self.assertEqual(preview['html'], '<html>' + 'x' * 94)
+        self.assertEqual((preview['length'], preview['truncated']), (5013, True))
+        self.assertEqual(self.fragment('raw-html', session_id='empty').json(),
+                         {'length': 0, 'html': '', 'truncated': False})
+
+    def test_fragments_never_load_the_whole_document(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.fragment('inputs', limit=2)
+            self.fragment('raw-html', chars=10)
+
+        for query in queries:
+            self.assertFalse(selects_column(query['sql'], '"scraper_scrapingsession"."parsed_data"'), query['sql'])
+            self.assertFalse(selects_column(query['sql'], '"scraper_htmlblob"."data"'), query['sql'])
+
+    def test_bad_requests(self):
+        self.assertEqual(self.fragment('cookies').status_code, 400)
+        self.assertEqual(self.fragment('inputs', session_id='nope').status_code, 404)
+        self.assertEqual(self.fragment('raw-html', session_id='nope').status_code, 404)
+        # Out-of-range paging is clamped, not an error
+        self.assertEqual(self.fragment('inputs', offset=99, limit='lots').json()['items'], [])
+
+    def test_detail_page_renders_the_summary_only(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('scraper:session_detail', args=['big']))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Access denied')
+        self.assertNotContains(response, 'v' * 300)
+        for query in queries:
+            self.assertFalse(selects_column(query['sql'], '"scraper_scrapingsession"."parsed_data"'), query['sql'])
+            self.assertFalse(selects_column(query['sql'], '"scraper_htmlblob"."data"'), query['sql'])
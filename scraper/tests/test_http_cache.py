@@ -0,0 +1,133 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+import requests
+from django.test import SimpleTestCase, TestCase
+
+from ..http_cache import HttpCache, cached_get
+from ..pipeline import FetchStage, PageJob, Pipeline
+from ..throttling import HostConcurrencyLimiter
+from .helpers import http_response
+
+
+class HttpCacheTests(TestCase):
+
+    url = 'https://example.com/rosters.aspx'
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'http_cache.sqlite3'
+        self.sent = []
+
+    def cache(self, **kwargs):
+        return HttpCache(self.path, **kwargs)
+
+    def sender(self, *responses):
+        responses = list(responses)
+
+        def send(headers):
+            self.sent.append(headers)
+            return responses.pop(0)
+        return send
+
+    def test_stale_entry_is_revalidated_with_a_conditional_get(self):
+        cache = self.cache()
+        headers = {'ETag': '"v1"', 'Last-Modified': 'Thu, 02 Jan 2025 12:00:00 GMT', 'Content-Type': 'text/html'}
+
+        first = cached_get(cache, self.url, {'User-Agent': 'test'},
+                           self.sender(http_response(200, headers, b'<html>v1</html>')))
+        second = cached_get(cache, self.url, {'User-Agent': 'test'},
+                            self.sender(http_response(304, {'ETag': '"v1"'})))
+
+        self.assertFalse(first.from_cache)
+        self.assertEqual(self.sent[0], {'User-Agent': 'test'})
+        self.assertEqual(self.sent[1], {
+            'User-Agent': 'test',
+            'If-None-Match': '"v1"',
+            'If-Modified-Since': 'Thu, 02 Jan 2025 12:00:00 GMT',
+        })
+        self.assertTrue(second.from_cache)
+        self.assertEqual((second.status_code, second.content), (200, b'<html>v1</html>'))
+        self.assertEqual(second.headers['Content-Type'], 'text/html')
+
+    def test_changed_page_replaces_the_entry(self):
+        cache = self.cache()
+        cached_get(cache, self.url, None, self.sender(http_response(200, {'ETag': '"v1"'}, b'v1')))
+
+        changed = cached_get(cache, self.url, None, self.sender(http_response(200, {'ETag': '"v2"'}, b'v2')))
+        revalidated = cached_get(cache, self.url, None, self.sender(http_response(304)))
+
+        self.assertEqual(changed.content, b'v2')
+        self.assertEqual(self.sent[2]['If-None-Match'], '"v2"')
+        self.assertEqual(revalidated.content, b'v2')
+
+    def test_fresh_entry_skips_the_network(self):
+        cache = self.cache(ttl_rules=[(r'\.css$', 3600)])
+        url = 'https://example.com/site.css'
+        cached_get(cache, url, None, self.sender(http_response(200, {}, b'body {}')))
+
+        hit = cached_get(cache, url, None, self.sender())
+
+        self.assertEqual(len(self.sent), 1)
+        self.assertTrue(hit.from_cache)
+        self.assertEqual(hit.content, b'body {}')
+
+    def test_uncacheable_responses_are_not_stored(self):
+        cache = self.cache()
+        no_store = {'Cache-Control': 'no-store', 'ETag': '"v1"'}
+        cached_get(cache, self.url, None, self.sender(http_response(200, no_store, b'private')))
+        cached_get(cache, self.url, None, self.sender(http_response(503, {'ETag': '"v1"'}, b'busy')))
+        # Nothing to validate and no TTL: never reusable
+        cached_get(cache, self.url, None, self.sender(http_response(200, {}, b'plain')))
+
+        self.assertIsNone(cache.get(self.url))
+        self.assertEqual([headers for headers in self.sent if 'If-None-Match' in headers], [])
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = self.cache(max_bytes=10, default_ttl=3600)
+        for name in ('a', 'b'):
+            cached_get(cache, f'https://example.com/{name}', None, self.sender(http_response(200, {}, b'12345')))
+        cache.get('https://example.com/a')
+
+        cached_get(cache, 'https://example.com/c', None, self.sender(http_response(200, {}, b'12345')))
+
+        self.assertIsNotNone(cache.get('https://example.com/a'))
+        self.assertIsNone(cache.get('https://example.com/b'))
+
+
+class FetchStageCacheTests(SimpleTestCase):
+
+    url = 'https://example.com/site.css'
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = HttpCache(Path(directory.name) / 'http_cache.sqlite3', ttl_rules=[(r'\.css$', 3600)])
+        self.http = mock.Mock(cookies=requests.cookies.RequestsCookieJar())
+        self.http.request.return_value = http_response(200, {'Content-Type': 'text/css'}, b'body {}')
+        self.rate_limiter = mock.Mock()
+        self.host_limiter = mock.Mock(wraps=HostConcurrencyLimiter(1))
+
+    def fetch(self, job):
+        stage = FetchStage(session_factory=lambda: self.http, http_cache=self.cache, rate_limiter=self.rate_limiter,
+                           host_limiter=self.host_limiter)
+        return Pipeline([stage]).run_one(job)
+
+    def test_fresh_hit_takes_no_token_or_slot(self):
+        first = self.fetch(PageJob(self.url))
+        hit = self.fetch(PageJob(self.url))
+
+        self.assertEqual((first.error, hit.error), (None, None))
+        self.assertEqual((first.html, hit.html), ('body {}', 'body {}'))
+        self.assertEqual(self.http.request.call_count, 1)
+        self.rate_limiter.wait.assert_called_once_with('example.com')
+        self.host_limiter.slot.assert_called_once_with('example.com')
+
+    def test_posts_skip_the_cache(self):
+        self.fetch(PageJob(self.url))
+        post = self.fetch(PageJob(self.url, method='POST', data={'a': '1'}))
+
+        self.assertIsNone(post.error)
+        self.assertEqual(self.http.request.call_count, 2)
+        self.assertEqual(self.rate_limiter.wait.call_count, 2)
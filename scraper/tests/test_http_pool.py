@@ -0,0 +1,95 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from django.test import SimpleTestCase, override_settings
+
+from .. import http_pool
+from ..http_pool import HttpPool, get_http_pool, pool_key
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.clients.add(self.client_address)
+        body = b'ok'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Set-Cookie', f'path={self.path.strip("/")}')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class HttpPoolTests(SimpleTestCase):
+
+    def pool(self, **options):
+        pool = HttpPool(**options)
+        self.addCleanup(pool.close)
+        return pool
+
+    def pooled_hosts(self, pool):
+        return sorted(key.key_host for key in pool.adapters['https://'].poolmanager.pools.keys())
+
+    def test_pool_key(self):
+        self.assertEqual(pool_key('https://PublicIndex.SCCourts.org/Dorchester/'),
+                         ('https', 'publicindex.sccourts.org', 443))
+        self.assertEqual(pool_key('http://localhost:8000/x'), ('http', 'localhost', 8000))
+
+    def test_adapters_are_sized_from_the_options(self):
+        adapter = self.pool(hosts=3, maxsize=7, block=True).adapters['https://']
+        self.assertEqual((adapter._pool_connections, adapter._pool_maxsize, adapter._pool_block), (3, 7, True))
+
+    def test_sessions_share_connections_but_not_cookies(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+        server.clients = set()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f'http://127.0.0.1:{server.server_port}'
+
+        pool = self.pool()
+        first, second = pool.session(), pool.session()
+        # Straight to the local server, whatever proxy the environment sets
+        first.trust_env = second.trust_env = False
+        first.get(f'{url}/first').close()
+        first.close()
+        second.get(f'{url}/second').close()
+
+        # One TCP connection, kept open across the closed session
+        self.assertEqual(len(server.clients), 1)
+        self.assertEqual((dict(first.cookies), dict(second.cookies)), ({'path': 'first'}, {'path': 'second'}))
+
+    def test_idle_hosts_are_evicted(self):
+        with mock.patch('scraper.http_pool.time.monotonic', return_value=1000.0):
+            pool = self.pool(idle_timeout=60)
+            for host in ('a.example', 'b.example'):
+                pool.adapters['https://'].poolmanager.connection_from_url(f'https://{host}/')
+                pool.touch(f'https://{host}/')
+        with mock.patch('scraper.http_pool.time.monotonic', return_value=1040.0):
+            pool.touch('https://b.example/')
+        self.assertEqual(self.pooled_hosts(pool), ['a.example', 'b.example'])
+
+        with mock.patch('scraper.http_pool.time.monotonic', return_value=1075.0):
+            pool.touch('https://b.example/')
+        self.assertEqual(self.pooled_hosts(pool), ['b.example'])
+        self.assertEqual(list(pool.last_used), [('https', 'b.example', 443)])
+
+    def test_no_idle_timeout_keeps_every_host(self):
+        with mock.patch('scraper.http_pool.time.monotonic', return_value=1000.0):
+            pool = self.pool(idle_timeout=None)
+            pool.adapters['https://'].poolmanager.connection_from_url('https://a.example/')
+            pool.touch('https://a.example/')
+        with mock.patch('scraper.http_pool.time.monotonic', return_value=10 ** 6):
+            pool.touch('https://b.example/')
+        self.assertEqual(self.pooled_hosts(pool), ['a.example'])
+
+    @override_settings(SCRAPER_HTTP_POOL_HOSTS=4, SCRAPER_HTTP_POOL_MAXSIZE=2, SCRAPER_HTTP_POOL_IDLE_TIMEOUT=5)
+    def test_process_pool_comes_from_settings(self):
+        with mock.patch.object(http_pool, '_http_pool', None):
+            pool = get_http_pool()
+            self.addCleanup(pool.close)
+            self.assertIs(get_http_pool(), pool)
+        self.assertEqual((pool.hosts, pool.maxsize, pool.block, pool.idle_timeout), (4, 2, False, 5))
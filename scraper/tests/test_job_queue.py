@@ -0,0 +1,94 @@
+from concurrent.futures import Future
+from datetime import timedelta
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..job_queue import ScrapingWorker, claim_next_session, claim_session, enqueue_scraping
+from ..models import ScrapingSession, SessionStats
+
+
+class JobQueueTests(TestCase):
+
+    def test_claims_oldest_pending_first(self):
+        first = enqueue_scraping('dorchester')
+        second = enqueue_scraping('charleston')
+
+        self.assertEqual(claim_next_session().pk, first.pk)
+        self.assertEqual(claim_next_session().pk, second.pk)
+        self.assertIsNone(claim_next_session())
+
+    def test_claim_is_exclusive_and_stamped(self):
+        session = enqueue_scraping()
+
+        claimed = claim_session(session.pk)
+        self.assertEqual(claimed.status, 'running')
+        self.assertIsNotNone(claimed.claimed_at)
+        self.assertIsNone(claim_session(session.pk))
+
+        totals = SessionStats.totals()
+        self.assertEqual((totals.pending, totals.running), (0, 1))
+
+    @override_settings(SCRAPER_CLAIM_TIMEOUT=60)
+    def test_abandoned_running_session_is_reclaimed(self):
+        session = claim_session(enqueue_scraping().pk)
+        self.assertIsNone(claim_next_session())
+
+        ScrapingSession.objects.filter(pk=session.pk).update(claimed_at=timezone.now() - timedelta(minutes=5))
+        reclaimed = claim_next_session()
+
+        self.assertEqual(reclaimed.pk, session.pk)
+        self.assertGreater(reclaimed.claimed_at, timezone.now() - timedelta(minutes=1))
+        # Reclaiming isn't a status change
+        self.assertEqual(SessionStats.totals().running, 1)
+
+    @override_settings(SCRAPER_CLAIM_TIMEOUT=60)
+    def test_heartbeat_keeps_the_claim(self):
+        session = claim_session(enqueue_scraping().pk)
+        ScrapingSession.objects.filter(pk=session.pk).update(claimed_at=timezone.now() - timedelta(minutes=5))
+
+        session.heartbeat()
+
+        self.assertIsNone(claim_next_session())
+
+    def test_pending_sessions_go_before_abandoned_ones(self):
+        stale = claim_session(enqueue_scraping().pk)
+        ScrapingSession.objects.filter(pk=stale.pk).update(claimed_at=timezone.now() - timedelta(days=1))
+        pending = enqueue_scraping()
+
+        self.assertEqual(claim_next_session().pk, pending.pk)
+        self.assertEqual(claim_next_session().pk, stale.pk)
+
+
+class QueueingTests(TestCase):
+
+    def test_api_queues_without_scraping(self):
+        with mock.patch('scraper.job_queue.process_session') as process:
+            response = self.client.post(reverse('scraper:api_start_scraping'), {'county': 'charleston'})
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['status'], 'pending')
+        session = ScrapingSession.objects.get(session_id=response.json()['session_id'])
+        self.assertEqual((session.county, session.status), ('charleston', 'pending'))
+        process.assert_not_called()
+
+    def test_api_rejects_unknown_counties(self):
+        response = self.client.post(reverse('scraper:api_start_scraping'), {'county': 'atlantis'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ScrapingSession.objects.exists())
+
+    def test_worker_fills_its_slots_only(self):
+        sessions = [enqueue_scraping() for _ in range(3)]
+        worker = ScrapingWorker(concurrency=2, poll_interval=0.01)
+        self.addCleanup(worker.executor.shutdown)
+
+        # Jobs that never finish keep both slots busy
+        with mock.patch.object(worker.executor, 'submit', side_effect=lambda *args: Future()) as submit:
+            self.assertEqual(worker.fill_slots(), 2)
+            self.assertEqual(worker.fill_slots(), 0)
+
+        claimed = [call.args[1].pk for call in submit.call_args_list]
+        self.assertEqual(claimed, [session.pk for session in sessions[:2]])
+        self.assertEqual(ScrapingSession.objects.get(pk=sessions[2].pk).status, 'pending')
@@ -0,0 +1,44 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import ScrapingSession
+from .helpers import make_session
+
+
+class SessionListingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for n, status in enumerate(['success', 'failed', 'blocked', 'pending']):
+            session = make_session(f'session-{n}', status=status, user_agent='Mozilla/5.0')
+            session.set_raw_html(f'<html>{"page " * 1000}{n}</html>')
+            session.parsed_data = {'links': [{'href': f'/{i}'} for i in range(100)]}
+            session.save()
+
+    def test_listing_leaves_out_the_heavy_columns(self):
+        session = ScrapingSession.objects.for_listing().get(session_id='session-0')
+
+        self.assertTrue({'parsed_data', 'html_blob_id', 'user_agent', 'roster_results'} <= session.get_deferred_fields())
+        self.assertEqual(session.status, 'success')
+
+    def test_listing_pages_never_select_page_data(self):
+        for name in ('home', 'dashboard', 'sessions_list'):
+            with self.subTest(view=name):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(reverse(f'scraper:{name}'))
+
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, 'session-0')
+                for query in queries.captured_queries:
+                    self.assertNotIn('parsed_data', query['sql'])
+                    self.assertNotIn('scraper_htmlblob', query['sql'])
+
+    def test_listing_indexes(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, ScrapingSession._meta.db_table)
+        indexed = [info['columns'] for info in constraints.values() if info['index']]
+
+        for columns in (['status'], ['created_at'], ['status', 'created_at']):
+            self.assertIn(columns, indexed)
@@ -0,0 +1,76 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import ScrapingSession
+from ..pagination import paginate
+from .helpers import make_session
+
+
+class KeysetPaginationTests(TestCase):
+
+    def setUp(self):
+        now = timezone.now()
+        # Runs of equal timestamps, so pages split between rows that only id orders
+        for n in range(23):
+            make_session(f'session-{n}', created_at=now - timedelta(minutes=n // 4))
+        self.expected = list(ScrapingSession.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+
+    def walk(self, page_size):
+        pages = [paginate(ScrapingSession.objects.all(), page_size=page_size)]
+        while pages[-1].has_next:
+            pages.append(paginate(ScrapingSession.objects.all(), pages[-1].next_cursor, page_size))
+        return pages
+
+    def test_forward_pages_have_no_duplicates_or_gaps(self):
+        for page_size in (1, 4, 5, 23, 50):
+            with self.subTest(page_size=page_size):
+                pages = self.walk(page_size)
+                self.assertEqual([session.pk for page in pages for session in page], self.expected)
+                self.assertFalse(pages[0].has_previous)
+
+    def test_backward_pages_match_forward_pages(self):
+        pages = self.walk(5)
+
+        page = pages[-1]
+        backward = [[session.pk for session in page]]
+        while page.has_previous:
+            page = paginate(ScrapingSession.objects.all(), page.previous_cursor, 5)
+            backward.append([session.pk for session in page])
+
+        self.assertEqual(backward[::-1], [[session.pk for session in page] for page in pages])
+
+    def test_rows_added_while_paging_are_not_repeated(self):
+        first = paginate(ScrapingSession.objects.all(), page_size=5)
+        make_session('newest')
+
+        second = paginate(ScrapingSession.objects.all(), first.next_cursor, 5)
+
+        self.assertEqual([session.pk for session in second], self.expected[5:10])
+
+    def test_api_pages_and_rejects_bad_cursors(self):
+        url = reverse('scraper:api_sessions')
+        seen, cursor = [], None
+        while True:
+            params = {'limit': 6, 'include_total': 1}
+            if cursor:
+                params['cursor'] = cursor
+            body = self.client.get(url, params).json()
+            self.assertEqual(body['count'], 23)
+            seen.extend(item['session_id'] for item in body['results'])
+            cursor = body['next_cursor']
+            if cursor is None:
+                break
+
+        expected = ScrapingSession.objects.order_by('-created_at', '-id').values_list('session_id', flat=True)
+        self.assertEqual(seen, list(expected))
+        self.assertEqual(self.client.get(url, {'cursor': 'not-a-cursor'}).status_code, 400)
+
+    def test_sessions_page_restarts_on_a_bad_cursor(self):
+        response = self.client.get(reverse('scraper:sessions_list'), {'cursor': 'not-a-cursor'})
+
+        page = response.context['page_obj']
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([session.pk for session in page], self.expected[:len(page)])
+        self.assertFalse(page.has_previous)
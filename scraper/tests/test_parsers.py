@@ -0,0 +1,73 @@
+from unittest import mock, skipUnless
+from django.test import SimpleTestCase, override_settings
+
+from ..parsers import PARSER_BACKENDS, BeautifulSoupParser, LxmlParser, etree, get_parser
+from ..scraper_service import SCCourtsScraperService
+from .helpers import ROSTER_PAGE
+
+# Markup both backends read the same way; html.parser doesn't close <option>
+# or <a> implicitly, so unclosed tags are out of scope for parity
+EDGE_CASES = """<html><head><title> Roster &amp; Index </title>
+<meta name="Description" content="ignored: the name is matched as written">
+</head><body>
+<form action="/search"><input name="q" value="1 &lt; 2"><input type="checkbox" checked></form>
+<select name="empty"></select>
+<a href="/x"><b>bold</b> link</a>
+<script>if (a < b) { document.write('<table>'); }</script>
+<template><a href="/hidden">hidden</a></template>
+<table><tr><td>only</td></tr></table>
+</body></html>"""
+
+
+@skipUnless(etree is not None, 'lxml is not installed')
+class ParserParityTests(SimpleTestCase):
+
+    def test_backends_parse_the_same(self):
+        for html in (ROSTER_PAGE, EDGE_CASES, '', '<p>no structure at all'):
+            with self.subTest(html=html[:30]):
+                parsed = {name: backend().parse(html) for name, backend in PARSER_BACKENDS.items()}
+                self.assertEqual(parsed['lxml'], parsed['html.parser'])
+
+    def test_parsed_page(self):
+        parsed = PARSER_BACKENDS['lxml']().parse(ROSTER_PAGE)
+
+        self.assertEqual(parsed['title'], 'Dorchester County Court Rosters')
+        self.assertEqual(parsed['meta_description'], 'Daily court rosters')
+        self.assertEqual([inp['name'] for inp in parsed['inputs']], ['__VIEWSTATE', '__EVENTVALIDATION', 'txtParty'])
+        self.assertEqual([opt['value'] for opt in parsed['selects'][0]['options']], ['GS', 'FAM'])
+        self.assertEqual(len(parsed['links']), 2)
+        self.assertEqual(len(parsed['scripts']), 2)
+        # Rows of the nested pager table count towards the roster table too
+        self.assertEqual([table['rows'] for table in parsed['tables']], [7, 1])
+        self.assertEqual(parsed['tables'][0]['id'], 'gvRoster')
+
+    def test_edge_cases(self):
+        parsed = PARSER_BACKENDS['lxml']().parse(EDGE_CASES)
+
+        self.assertEqual(parsed['title'], 'Roster & Index')
+        self.assertEqual(parsed['inputs'][0]['value'], '1 < 2')
+        self.assertEqual(parsed['selects'][0]['options'], [])
+        # Text nodes are stripped and joined, as get_text(strip=True) does
+        self.assertEqual(parsed['links'][0]['text'], 'boldlink')
+        self.assertIn("document.write('<table>')", parsed['scripts'][0]['content'])
+
+
+class GetParserTests(SimpleTestCase):
+
+    @override_settings(SCRAPER_PARSER_BACKEND='html.parser')
+    def test_configured_backend(self):
+        self.assertIsInstance(get_parser(), BeautifulSoupParser)
+        self.assertEqual(SCCourtsScraperService().parser.name, 'html.parser')
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            get_parser('html5lib')
+
+    def test_falls_back_without_lxml(self):
+        with mock.patch('scraper.parsers.etree', None), self.assertLogs('scraper.parsers', 'WARNING'):
+            self.assertIsInstance(get_parser(LxmlParser.name), BeautifulSoupParser)
+
+    def test_service_parse_content_never_raises(self):
+        service = SCCourtsScraperService()
+        with mock.patch.object(service.parser, 'parse', side_effect=ValueError('broken')):
+            self.assertEqual(service.parse_content('<html>'), {})
@@ -0,0 +1,76 @@
+import gzip
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..payloads import cache_key, payload_cache
+from .helpers import make_session
+
+
+class SessionDataETagTests(TestCase):
+
+    def setUp(self):
+        payload_cache().clear()
+        self.session = make_session('done', status='success', parsed_data={'forms': [{'action': 'x' * 1000}]})
+        self.url = reverse('scraper:api_session_data', args=['done'])
+
+    def test_matching_etag_gets_304(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()['parsed_data'], self.session.parsed_data)
+
+        again = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b'')
+        self.assertEqual(again['ETag'], first['ETag'])
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+    def test_encodings_have_their_own_etag_but_share_validation(self):
+        plain = self.client.get(self.url)
+        gzipped = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(gzipped['Content-Encoding'], 'gzip')
+        self.assertEqual(gzipped['ETag'], plain['ETag'][:-1] + '-gzip"')
+        self.assertIn('Accept-Encoding', plain['Vary'])
+        # Weak comparison: a validator for one encoding matches any other
+        revalidated = self.client.get(self.url, HTTP_IF_NONE_MATCH='W/' + gzipped['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_changed_session_gets_a_new_etag(self):
+        first = self.client.get(self.url)
+        self.session.parsed_data = {'forms': []}
+        self.session.save()
+
+        changed = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+        self.assertEqual(changed.json()['parsed_data'], {'forms': []})
+
+    def test_only_compressed_copies_are_cached(self):
+        gzipped = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        plain = self.client.get(self.url)
+
+        cached = payload_cache().get(cache_key(self.session))
+        self.assertNotIn('identity', cached['encodings'])
+        self.assertIn('gzip', cached['encodings'])
+        # Identity is decompressed from the cached gzip copy
+        self.assertEqual(plain.content, gzip.decompress(gzipped.content))
+        self.assertFalse(plain.has_header('Content-Encoding'))
+
+    def test_small_bodies_are_not_compressed(self):
+        make_session('empty', status='success', parsed_data={})
+
+        response = self.client.get(reverse('scraper:api_session_data', args=['empty']), HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.json()['parsed_data'], {})
+
+    @override_settings(SCRAPER_PAYLOAD_CACHE_MAX_BYTES=10)
+    def test_payloads_over_the_cap_are_served_but_not_cached(self):
+        first = self.client.get(self.url)
+        again = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(first.json()['parsed_data'], self.session.parsed_data)
+        self.assertEqual(again.status_code, 304)
+        self.assertIsNone(payload_cache().get(cache_key(self.session)))
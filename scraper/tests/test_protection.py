@@ -0,0 +1,83 @@
+from pathlib import Path
+from unittest import mock
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from ..protection import analyze_protection_page, is_tiny_interstitial
+
+# The Incapsula challenge page the court index served (tracked in the repo)
+INCAPSULA_PAGE = Path(settings.BASE_DIR, 'response.html').read_text(encoding='utf-8')
+
+TINY_PAGES = [
+    INCAPSULA_PAGE,
+    '<html><body><!-- note -->Access Denied &amp; blocked by a <b>robot</b> check</body></html>',
+    '<html><head><style>p { color: red }</style><script src="/x.js"></script></head>'
+    '<body>\n  \n<p>Please wait&hellip;</p>\n</body></html>',
+    'plain text, no markup',
+    '',
+]
+
+FULL_PAGE = """<html><head><title>Security Check</title>
+<meta name="description" content="Checking your browser">
+<script>var incapsula = challenge();</script></head>
+<body>
+<form action="/verify"><p>Complete the challenge</p>
+<input type="hidden" name="captcha_token" value="x"><input type="text" name="q">
+<button>Verify</button><button>Cancel</button></form>
+</body></html>"""
+
+
+def analyze_with_soup(html_content):
+    with mock.patch('scraper.protection.is_tiny_interstitial', return_value=False):
+        return analyze_protection_page(html_content)
+
+
+class ProtectionClassifierTests(SimpleTestCase):
+
+    def test_interstitials_skip_the_tree_with_the_same_result(self):
+        for html_content in TINY_PAGES:
+            with self.subTest(html=html_content[:40]):
+                self.assertTrue(is_tiny_interstitial(html_content))
+                with mock.patch('scraper.protection.BeautifulSoup') as soup:
+                    fast = analyze_protection_page(html_content)
+                soup.assert_not_called()
+                self.assertEqual(fast, analyze_with_soup(html_content))
+
+    def test_incapsula_page(self):
+        result = analyze_protection_page(INCAPSULA_PAGE)
+
+        self.assertTrue(result['protection_indicators']['incapsula'])
+        self.assertFalse(result['protection_indicators']['cloudflare'])
+        self.assertEqual(result['total_scripts'], 1)
+
+    def test_pages_with_structure_get_a_tree(self):
+        self.assertFalse(is_tiny_interstitial(FULL_PAGE))
+        self.assertFalse(is_tiny_interstitial('<script>challenge()</script>'))
+        self.assertFalse(is_tiny_interstitial('x' * 5000))
+
+        result = analyze_protection_page(FULL_PAGE)
+
+        self.assertEqual(result['page_title'], 'Security Check')
+        self.assertEqual(result['meta_description'], 'Checking your browser')
+        elements = result['protection_elements']
+        self.assertEqual(len(elements['challenge_forms']), 1)
+        self.assertEqual(len(elements['captcha_inputs']), 1)
+        self.assertEqual(len(elements['verification_buttons']), 1)
+        self.assertEqual(len(elements['protection_scripts']), 1)
+        self.assertEqual((result['total_forms'], result['total_inputs'], result['total_buttons']), (1, 2, 2))
+        self.assertTrue(result['protection_texts']['security_check'])
+
+    def test_indicator_case_rules(self):
+        indicators = analyze_protection_page('<p>incapsula cloudflare ReCAPTCHA</p>')['protection_indicators']
+
+        # Vendor names must match as written; generic words match any case
+        self.assertFalse(indicators['incapsula'])
+        self.assertFalse(indicators['cloudflare'])
+        self.assertTrue(indicators['recaptcha'])
+        self.assertTrue(indicators['captcha'])
+
+    def test_long_text_is_previewed(self):
+        result = analyze_protection_page('<p>' + 'blocked ' * 200 + '</p>')
+
+        self.assertTrue(result['page_text_preview'].endswith('...'))
+        self.assertEqual(len(result['page_text_preview']), 503)
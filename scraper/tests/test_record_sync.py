@@ -0,0 +1,141 @@
+from unittest import skipUnless
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from ..exports import export_queryset
+from ..models import CourtRecord, RecordChange, ScrapingSession
+from ..records import sync_court_records
+from ..search import RECORD_FTS, SESSION_FTS
+from .helpers import make_session, roster_record
+
+
+class RecordSyncTests(TestCase):
+
+    def setUp(self):
+        self.session = make_session('first', status='success')
+
+    def changes(self):
+        return list(RecordChange.objects.order_by('id').values_list('change_type', 'case_number', 'roster'))
+
+    def test_counts_and_changes_across_syncs(self):
+        result = sync_court_records(self.session, [roster_record('2025-CV-1'), roster_record('2025-CV-2')])
+        self.assertEqual(result, {'created': 2, 'updated': 0, 'unchanged': 0, 'removed': 0})
+
+        second = make_session('second', status='success')
+        result = sync_court_records(second, [
+            roster_record('2025-CV-1'),
+            roster_record('2025-CV-3'),
+            roster_record('2025-CV-1', party_name='Duplicate row'),
+        ])
+        self.assertEqual(result, {'created': 1, 'updated': 0, 'unchanged': 1, 'removed': 1})
+
+        result = sync_court_records(second, [roster_record('2025-CV-1', status='Continued'), roster_record('2025-CV-3')])
+        self.assertEqual(result, {'created': 0, 'updated': 1, 'unchanged': 1, 'removed': 0})
+
+        self.assertEqual(self.changes(), [
+            ('added', '2025-CV-1', ''),
+            ('added', '2025-CV-2', ''),
+            ('added', '2025-CV-3', ''),
+            ('removed', '2025-CV-2', ''),
+            ('modified', '2025-CV-1', ''),
+        ])
+        modified = RecordChange.objects.get(change_type=RecordChange.MODIFIED)
+        self.assertEqual(modified.changes, {'status': ['Scheduled', 'Continued']})
+
+        record = CourtRecord.objects.get(case_number='2025-CV-1')
+        self.assertEqual((record.status, record.session_id), ('Continued', second.pk))
+        self.assertEqual(CourtRecord.objects.count(), 3)
+
+    def test_removed_record_that_returns_is_added(self):
+        sync_court_records(self.session, [roster_record('2025-CV-1'), roster_record('2025-CV-2')])
+        sync_court_records(self.session, [roster_record('2025-CV-1')])
+        result = sync_court_records(self.session, [roster_record('2025-CV-1'), roster_record('2025-CV-2')])
+
+        self.assertEqual(result['updated'], 1)
+        self.assertIsNone(CourtRecord.objects.get(case_number='2025-CV-2').removed_at)
+        self.assertEqual(self.changes()[-1], ('added', '2025-CV-2', ''))
+
+    def test_empty_page_removes_nothing(self):
+        sync_court_records(self.session, [roster_record('2025-CV-1')])
+
+        result = sync_court_records(self.session, [])
+
+        self.assertEqual(result['removed'], 0)
+        self.assertFalse(CourtRecord.objects.filter(removed_at__isnull=False).exists())
+
+    def test_removal_sweep_is_scoped_to_the_roster(self):
+        sync_court_records(self.session, [roster_record('A-1'), roster_record('A-2')], roster='general')
+        sync_court_records(self.session, [roster_record('B-1')], roster='family')
+
+        result = sync_court_records(self.session, [roster_record('A-1')], roster='general')
+
+        self.assertEqual(result['removed'], 1)
+        removed = CourtRecord.objects.filter(removed_at__isnull=False).values_list('case_number', 'roster')
+        self.assertEqual(list(removed), [('A-2', 'general')])
+        self.assertEqual(self.changes()[-1], ('removed', 'A-2', 'general'))
+
+    def test_record_moving_roster_is_not_a_change(self):
+        sync_court_records(self.session, [roster_record('A-1')], roster='general')
+
+        result = sync_court_records(self.session, [roster_record('A-1')], roster='family')
+
+        self.assertEqual(result['updated'], 1)
+        self.assertEqual(CourtRecord.objects.get().roster, 'family')
+        self.assertEqual(self.changes(), [('added', 'A-1', 'general')])
+
+    def test_counties_are_kept_apart(self):
+        other = make_session('other', status='success', county='charleston')
+        sync_court_records(self.session, [roster_record('2025-CV-1')])
+
+        result = sync_court_records(other, [roster_record('2025-CV-1')])
+
+        self.assertEqual(result['created'], 1)
+        self.assertEqual(CourtRecord.objects.filter(removed_at__isnull=True).count(), 2)
+
+    def test_small_batches_give_the_same_result(self):
+        records = [roster_record(f'2025-CV-{n}') for n in range(7)]
+
+        result = sync_court_records(self.session, records, batch_size=3)
+
+        self.assertEqual(result['created'], 7)
+        self.assertEqual(RecordChange.objects.count(), 7)
+
+    def test_deleting_a_session_keeps_its_records_and_changes(self):
+        sync_court_records(self.session, [roster_record('2025-CV-1'), roster_record('2025-CV-2')])
+
+        ScrapingSession.objects.filter(pk=self.session.pk).delete()
+
+        self.assertEqual(list(CourtRecord.objects.values_list('session', flat=True)), [None, None])
+        self.assertEqual(RecordChange.objects.filter(session__isnull=True).count(), 2)
+        # The next scrape picks the records up where they were
+        result = sync_court_records(make_session('next', status='success'), [roster_record('2025-CV-1')])
+        self.assertEqual(result, {'created': 0, 'updated': 0, 'unchanged': 1, 'removed': 1})
+
+    def test_records_of_deleted_sessions_are_listed_by_county(self):
+        sync_court_records(self.session, [roster_record('2025-CV-1')])
+        sync_court_records(make_session('other', county='charleston'), [roster_record('2025-CV-9')])
+        self.session.delete()
+
+        records = self.client.get(reverse('scraper:api_records'), {'county': 'dorchester'}).json()['results']
+        changes = self.client.get(reverse('scraper:api_changes'), {'county': 'dorchester'}).json()['results']
+
+        self.assertEqual([(record['case_number'], record['county'], record['session_id']) for record in records],
+                         [('2025-CV-1', 'dorchester', None)])
+        self.assertEqual([(change['case_number'], change['session_id']) for change in changes], [('2025-CV-1', None)])
+        self.assertEqual(list(export_queryset(county='dorchester').values_list('case_number', flat=True)),
+                         ['2025-CV-1'])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'full-text search tables are SQLite only')
+class FullTextSearchTests(TestCase):
+
+    def triggers(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s", [table])
+            return sorted(name for name, in cursor.fetchall())
+
+    def test_triggers_survive_every_migration(self):
+        # The test database was built by running every migration in order
+        for table, fts_table in (('scraper_courtrecord', RECORD_FTS), ('scraper_scrapingsession', SESSION_FTS)):
+            self.assertEqual(self.triggers(table), [f'{fts_table}_{suffix}' for suffix in ('ad', 'ai', 'au')])
@@ -0,0 +1,95 @@
+from datetime import date
+from unittest import mock, skipUnless
+from django.test import SimpleTestCase, TestCase
+
+from ..models import CourtRecord
+from ..records import RosterTableReader, etree, iter_roster_records, iter_rows_lxml, iter_rows_soup, parse_date
+from ..scraper_service import SCCourtsScraperService
+from .helpers import ROSTER_PAGE, make_session
+
+MIXED_TABLES = """<html><body>
+<table id="layout"><tr><td>Menu</td><td>Home</td></tr><tr><td>Case</td><td>ignored: no other known column</td></tr></table>
+<table id="family">
+  <tr><th>Case #</th><th>Defendant</th><th>Court Date</th><th>Case Type</th><th>Judge</th></tr>
+  <tr><td>2025-DR-0001</td><td>Able</td><td>2025-02-03</td><td>Family</td><td>Smith</td></tr>
+  <tr><td></td><td>no case number</td><td></td><td></td><td></td></tr>
+  <tr><td>2025-DR-0002</td><td>Baker</td></tr>
+</table>
+</body></html>"""
+
+
+def read_records(rows):
+    reader = RosterTableReader()
+    return [record for record in (reader.feed(table, cells) for table, cells in rows) if record]
+
+
+class RosterExtractionTests(SimpleTestCase):
+
+    @skipUnless(etree is not None, 'lxml is not installed')
+    def test_row_readers_agree(self):
+        for html_content in (ROSTER_PAGE, MIXED_TABLES):
+            with self.subTest(html=html_content[:40]):
+                self.assertEqual(read_records(iter_rows_lxml(html_content)),
+                                 read_records(iter_rows_soup(html_content)))
+
+    def test_roster_page(self):
+        records = list(iter_roster_records(ROSTER_PAGE))
+
+        self.assertEqual([record['case_number'] for record in records],
+                         ['2025-CV-0001', '2025-CV-0002', '2025-CV-0003'])
+        self.assertEqual(records[0]['party_name'], 'Roe, Jane')
+        self.assertEqual([record['filing_date'] for record in records], [date(2025, 1, 2), date(2025, 1, 3), None])
+        self.assertEqual(records[0]['raw_data'], {
+            'Case Number': '2025-CV-0001', 'Party Name': 'Roe, Jane',
+            'Hearing Date': '01/02/2025 9:00 AM', 'Status': 'Scheduled',
+        })
+
+    def test_only_roster_tables_are_read(self):
+        records = list(iter_roster_records(MIXED_TABLES))
+
+        self.assertEqual([(record['case_number'], record['record_type']) for record in records],
+                         [('2025-DR-0001', 'Family'), ('2025-DR-0002', 'Roster')])
+        self.assertEqual(records[0]['filing_date'], date(2025, 2, 3))
+        # Short rows leave the missing columns empty
+        self.assertEqual((records[1]['party_name'], records[1]['filing_date']), ('Baker', None))
+
+    def test_without_lxml(self):
+        expected = list(iter_roster_records(MIXED_TABLES))
+
+        with mock.patch('scraper.records.etree', None):
+            self.assertEqual(list(iter_roster_records(MIXED_TABLES)), expected)
+
+    def test_parse_date(self):
+        self.assertEqual(parse_date('01/02/2025 9:00 AM'), date(2025, 1, 2))
+        self.assertEqual(parse_date('1/2/25'), date(2025, 1, 2))
+        self.assertEqual(parse_date('2025-01-02'), date(2025, 1, 2))
+        self.assertEqual(parse_date('01-02-2025'), date(2025, 1, 2))
+        self.assertIsNone(parse_date('TBD'))
+        self.assertIsNone(parse_date(''))
+
+    def test_empty_page(self):
+        self.assertEqual(list(iter_roster_records('')), [])
+        self.assertEqual(list(iter_roster_records('<html><body>No rosters today</body></html>')), [])
+
+
+class ExtractCourtRecordsTests(TestCase):
+
+    def test_page_records_are_stored_in_batches(self):
+        session = make_session('first', status='success')
+
+        # Per batch of 2 and 1: one lookup plus the record and change inserts;
+        # then one read of the roster's active records, all in one savepoint
+        with self.assertNumQueries(9):
+            result = SCCourtsScraperService().extract_court_records(session, ROSTER_PAGE, batch_size=2)
+
+        self.assertEqual(result['created'], 3)
+        self.assertEqual(sorted(CourtRecord.objects.values_list('case_number', flat=True)),
+                         ['2025-CV-0001', '2025-CV-0002', '2025-CV-0003'])
+        self.assertTrue(all(record.county == 'dorchester' for record in CourtRecord.objects.all()))
+
+    def test_failures_are_logged_not_raised(self):
+        session = make_session('first', status='success')
+
+        with mock.patch('scraper.pipeline.store.sync_court_records', side_effect=RuntimeError('disk full')):
+            with self.assertLogs('scraper.pipeline.store', 'ERROR'):
+                self.assertIsNone(SCCourtsScraperService().extract_court_records(session, ROSTER_PAGE))
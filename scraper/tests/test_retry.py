@@ -0,0 +1,113 @@
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+import requests
+from django.test import TestCase
+
+from ..retry import RetryPolicy, parse_retry_after
+from .helpers import http_response
+
+
+class RetryPolicyTests(TestCase):
+
+    def run_policy(self, policy, outcomes, timeout=None):
+        """Run policy over scripted outcomes; returns (result or error, attempt timeouts, sleeps)"""
+        outcomes, timeouts = list(outcomes), []
+
+        def attempt(attempt_timeout):
+            timeouts.append(attempt_timeout)
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        with mock.patch('scraper.retry.time.sleep') as sleep:
+            try:
+                result = policy.run(attempt, timeout=timeout)
+            except Exception as e:
+                result = e
+        return result, timeouts, [call.args[0] for call in sleep.call_args_list]
+
+    def test_retry_reasons(self):
+        policy = RetryPolicy()
+
+        self.assertEqual(policy.retry_reason(http_response(503)), 'HTTP 503')
+        self.assertEqual(policy.retry_reason(http_response(429)), 'HTTP 429')
+        self.assertIsNone(policy.retry_reason(http_response(404)))
+        self.assertIsNone(policy.retry_reason(http_response(200)))
+        self.assertIn('ConnectionError', policy.retry_reason(error=requests.ConnectionError('reset')))
+        self.assertIsNotNone(policy.retry_reason(error=requests.Timeout()))
+        self.assertIsNone(policy.retry_reason(error=requests.exceptions.SSLError('bad certificate')))
+        self.assertIsNone(policy.retry_reason(error=requests.exceptions.InvalidURL('no host')))
+
+    def test_parse_retry_after(self):
+        now = datetime(2025, 1, 2, 12, 0, tzinfo=dt_timezone.utc)
+
+        self.assertEqual(parse_retry_after('120'), 120.0)
+        self.assertEqual(parse_retry_after('Thu, 02 Jan 2025 12:00:30 GMT', now), 30.0)
+        self.assertEqual(parse_retry_after('Thu, 02 Jan 2025 11:00:00 GMT', now), 0.0)
+        self.assertIsNone(parse_retry_after('soon'))
+        self.assertIsNone(parse_retry_after(None))
+
+    def test_retries_until_success(self):
+        policy = RetryPolicy(max_attempts=3, backoff=1.0, deadline=None)
+
+        result, timeouts, sleeps = self.run_policy(policy, [
+            http_response(503), requests.ConnectionError('reset'), http_response(200),
+        ], timeout=10)
+
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(timeouts, [10, 10, 10])
+        # Full jitter: at most backoff * 2 ** (attempt - 1)
+        self.assertEqual(len(sleeps), 2)
+        self.assertLessEqual(sleeps[0], 1.0)
+        self.assertLessEqual(sleeps[1], 2.0)
+
+    def test_final_outcomes_are_not_retried(self):
+        policy = RetryPolicy(max_attempts=5)
+
+        result, _, sleeps = self.run_policy(policy, [http_response(404)])
+        self.assertEqual((result.status_code, sleeps), (404, []))
+
+        error, _, sleeps = self.run_policy(policy, [requests.exceptions.SSLError('bad certificate')])
+        self.assertIsInstance(error, requests.exceptions.SSLError)
+        self.assertEqual(sleeps, [])
+
+    def test_gives_back_the_last_outcome_after_max_attempts(self):
+        policy = RetryPolicy(max_attempts=2, backoff=0, deadline=None)
+
+        result, timeouts, _ = self.run_policy(policy, [http_response(502), http_response(503)])
+        self.assertEqual((result.status_code, len(timeouts)), (503, 2))
+
+        error, _, _ = self.run_policy(policy, [requests.Timeout('first'), requests.Timeout('second')])
+        self.assertEqual(str(error), 'second')
+
+    def test_waits_for_retry_after(self):
+        policy = RetryPolicy(max_attempts=2, deadline=None)
+
+        result, _, sleeps = self.run_policy(policy, [http_response(429, {'Retry-After': '7'}), http_response(200)])
+
+        self.assertEqual((result.status_code, sleeps), (200, [7.0]))
+
+    def test_ignores_retry_after_when_told_to(self):
+        policy = RetryPolicy(max_attempts=2, backoff=0.5, deadline=None, honor_retry_after=False)
+
+        _, _, sleeps = self.run_policy(policy, [http_response(429, {'Retry-After': '7'}), http_response(200)])
+
+        self.assertLessEqual(sleeps[0], 0.5)
+
+    def test_deadline_caps_waits_and_attempt_timeouts(self):
+        policy = RetryPolicy(max_attempts=5, deadline=10.0)
+
+        # A Retry-After past the deadline ends the job with the response in hand
+        result, timeouts, sleeps = self.run_policy(policy, [http_response(503, {'Retry-After': '60'})], timeout=30)
+        self.assertEqual((result.status_code, sleeps), (503, []))
+        self.assertLessEqual(timeouts[0], 10.0)
+
+        with mock.patch('scraper.retry.time.monotonic', side_effect=[100.0, 100.0, 100.0, 106.0]):
+            result, timeouts, sleeps = self.run_policy(policy, [
+                http_response(503, {'Retry-After': '4'}), http_response(200),
+            ], timeout=30)
+        self.assertEqual((result.status_code, sleeps), (200, [4.0]))
+        # The second attempt only gets what is left of the 10s
+        self.assertEqual(timeouts, [10.0, 4.0])
+
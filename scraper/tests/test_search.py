@@ -0,0 +1,75 @@
+from unittest import skipUnless
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import CourtRecord
+from ..records import sync_court_records
+from ..search import search_records, search_sessions
+from .helpers import make_session, roster_record
+
+
+@skipUnless(connection.vendor == 'sqlite', 'full-text search tables are SQLite only')
+class FullTextSearchTests(TestCase):
+
+    def test_synced_records_are_searchable(self):
+        session = make_session('first', status='success')
+        sync_court_records(session, [roster_record('2025-CV-0001', party_name='Jane Roe')])
+        self.assertEqual([record.case_number for record, _ in search_records('roe')], ['2025-CV-0001'])
+        self.assertEqual(len(search_records('2025-CV')), 1)
+
+        # The upsert's update path goes through the update trigger
+        sync_court_records(session, [roster_record('2025-CV-0001', party_name='Richard Miles')])
+        self.assertEqual(search_records('roe'), [])
+        self.assertEqual([record.case_number for record, _ in search_records('miles')], ['2025-CV-0001'])
+
+        CourtRecord.objects.all().delete()
+        self.assertEqual(search_records('miles'), [])
+
+    def test_sessions_are_searchable_by_error(self):
+        session = make_session('blocked-run')
+        session.status = 'failed'
+        session.error_message = 'Incapsula challenge page'
+        session.save()
+        make_session('other', status='success')
+
+        self.assertEqual([found.session_id for found, _ in search_sessions('incapsula')], ['blocked-run'])
+
+    def test_results_are_ranked(self):
+        session = make_session('first', status='success')
+        sync_court_records(session, [
+            roster_record('2025-CV-0001', party_name='Roe Holdings'),
+            roster_record('2025-CV-0002', party_name='Jane Roe Roe'),
+            roster_record('2025-CV-0003', party_name='Smith'),
+        ])
+
+        results = search_records('roe')
+
+        # bm25: lower scores rank higher, so the party named twice comes first
+        self.assertEqual([record.case_number for record, _ in results], ['2025-CV-0002', '2025-CV-0001'])
+        scores = [score for _, score in results]
+        self.assertEqual(scores, sorted(scores))
+
+    def test_search_api(self):
+        session = make_session('blocked-run', status='failed', error_message='Roe county timeout')
+        sync_court_records(make_session('first', status='success'), [roster_record('2025-CV-0001')])
+
+        response = self.client.get(reverse('scraper:api_search'), {'q': 'roe'})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([record['case_number'] for record in data['records']], ['2025-CV-0001'])
+        self.assertEqual([found['session_id'] for found in data['sessions']], [session.session_id])
+
+        only_sessions = self.client.get(reverse('scraper:api_search'), {'q': 'roe', 'type': 'sessions'}).json()
+        self.assertNotIn('records', only_sessions)
+
+        for params in ({}, {'q': 'roe', 'type': 'parties'}):
+            self.assertEqual(self.client.get(reverse('scraper:api_search'), params).status_code, 400)
+
+    def test_search_page(self):
+        sync_court_records(make_session('first', status='success'), [roster_record('2025-CV-0001')])
+
+        response = self.client.get(reverse('scraper:search'), {'q': 'jane'})
+
+        self.assertContains(response, '2025-CV-0001')
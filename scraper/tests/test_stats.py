@@ -0,0 +1,63 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import ScrapingSession, SessionStats
+from .helpers import make_session
+
+
+class SessionStatsTests(TestCase):
+
+    def counters(self, period=SessionStats.TOTAL):
+        stats = SessionStats.objects.get(period=period)
+        return stats.sessions, stats.pending, stats.running, stats.success, stats.failed
+
+    def test_status_changes_move_counters(self):
+        session = make_session('a')
+        self.assertEqual(self.counters(), (1, 1, 0, 0, 0))
+
+        session.status = 'running'
+        session.save()
+        session.status = 'success'
+        session.save()
+        # Saving without a status change counts nothing
+        session.save()
+
+        self.assertEqual(self.counters(), (1, 0, 0, 1, 0))
+        self.assertEqual(self.counters(SessionStats.day_period(session.created_at)), (1, 0, 0, 1, 0))
+
+    def test_deletes_are_counted(self):
+        make_session('a', status='success')
+        make_session('b', status='failed')
+        make_session('c', status='failed')
+
+        ScrapingSession.objects.get(session_id='a').delete()
+        ScrapingSession.objects.filter(status='failed').delete()
+
+        self.assertEqual(self.counters(), (0, 0, 0, 0, 0))
+
+    def test_rebuild_matches_incremental_counts(self):
+        yesterday = timezone.now() - timedelta(days=1)
+        make_session('a', status='success')
+        make_session('b', status='failed', created_at=yesterday)
+        make_session('c')
+        ScrapingSession.objects.get(session_id='c').delete()
+        incremental = sorted(SessionStats.objects.values_list('period', 'sessions', 'success', 'failed'))
+
+        SessionStats.rebuild()
+        rebuilt = sorted(SessionStats.objects.values_list('period', 'sessions', 'success', 'failed'))
+
+        # Rebuild drops rows that count nothing
+        self.assertEqual([row for row in incremental if row[1]], rebuilt)
+
+    def test_dashboard_reads_the_counters(self):
+        make_session('a', status='success')
+        make_session('b', status='blocked')
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('scraper:dashboard'))
+
+        self.assertEqual(response.context['total_sessions'], 2)
+        self.assertEqual(response.context['successful_sessions'], 1)
+        self.assertEqual(response.context['blocked_sessions'], 1)
@@ -0,0 +1,74 @@
+import asyncio
+import tempfile
+import threading
+from pathlib import Path
+from unittest import mock
+from django.test import SimpleTestCase
+
+from ..throttling import TokenBucketRateLimiter
+
+
+class TokenBucketRateLimiterTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'ratelimit.sqlite3'
+
+    def limiter(self, **options):
+        return TokenBucketRateLimiter(self.path, **options)
+
+    def test_burst_then_rate(self):
+        limiter = self.limiter(rate=10, burst=2)
+
+        with mock.patch('scraper.throttling.time.time', return_value=1000.0):
+            delays = [limiter.reserve('a.example') for _ in range(4)]
+
+        # Two tokens up front, then one every 0.1s, queued behind each other
+        self.assertEqual(delays[:2], [0.0, 0.0])
+        self.assertAlmostEqual(delays[2], 0.1)
+        self.assertAlmostEqual(delays[3], 0.2)
+
+    def test_bucket_refills_and_hosts_are_separate(self):
+        limiter = self.limiter(rate=1, burst=1, host_rates={'slow.example': 0.5})
+
+        with mock.patch('scraper.throttling.time.time', return_value=1000.0):
+            self.assertEqual(limiter.reserve('a.example'), 0.0)
+            self.assertEqual(limiter.reserve('slow.example'), 0.0)
+            self.assertAlmostEqual(limiter.reserve('slow.example'), 2.0)
+        with mock.patch('scraper.throttling.time.time', return_value=1001.0):
+            self.assertEqual(limiter.reserve('a.example'), 0.0)
+
+    def test_processes_share_the_bucket(self):
+        with mock.patch('scraper.throttling.time.time', return_value=1000.0):
+            self.assertEqual(self.limiter(rate=1, burst=1).reserve('a.example'), 0.0)
+            # Another process: same file, new limiter
+            self.assertAlmostEqual(self.limiter(rate=1, burst=1).reserve('a.example'), 1.0)
+
+    def test_no_rate_means_no_wait(self):
+        limiter = self.limiter(rate=0)
+        self.assertEqual([limiter.reserve('a.example') for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertFalse(self.path.exists())
+
+    def test_wait_async_reserves_off_the_event_loop(self):
+        limiter = self.limiter(rate=1, burst=1)
+        reserved_on = []
+        reserve = limiter.reserve
+
+        def record_thread(host):
+            reserved_on.append(threading.current_thread())
+            return reserve(host)
+
+        async def wait_twice():
+            with mock.patch('scraper.throttling.asyncio.sleep') as sleep:
+                await limiter.wait_async('a.example')
+                delay = await limiter.wait_async('a.example')
+            return threading.current_thread(), delay, sleep
+
+        with mock.patch.object(limiter, 'reserve', side_effect=record_thread):
+            loop_thread, delay, sleep = asyncio.run(wait_twice())
+
+        self.assertEqual(len(reserved_on), 2)
+        self.assertNotIn(loop_thread, reserved_on)
+        self.assertGreater(delay, 0.9)
+        sleep.assert_awaited_once_with(delay)
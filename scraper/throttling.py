@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Per-host throttling shared by everything that talks to the court servers
+"""
+
+import time
+import asyncio
+import sqlite3
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from django.conf import settings
+
+
+class HostConcurrencyLimiter:
+    """Caps how many requests/jobs may hit one host at the same time
+
+    Threads and event-loop tasks share the same slots: slot() blocks its
+    thread, aslot() waits without blocking the loop.
+    """
+
+    # Seconds between a waiting task's tries for a free slot
+    poll_interval = 0.05
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.lock = threading.Lock()
+        self.semaphores = {}
+
+    def semaphore(self, host):
+        with self.lock:
+            if host not in self.semaphores:
+                self.semaphores[host] = threading.BoundedSemaphore(self.limit)
+            return self.semaphores[host]
+
+    @contextmanager
+    def slot(self, host):
+        """Hold one of the host's slots for the duration of the block"""
+        semaphore = self.semaphore(host)
+        semaphore.acquire()
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+    @asynccontextmanager
+    async def aslot(self, host):
+        """slot() for coroutines on an event loop"""
+        semaphore = self.semaphore(host)
+        while not semaphore.acquire(blocking=False):
+            await asyncio.sleep(self.poll_interval)
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+
+_host_limiter = None
+_host_limiter_lock = threading.Lock()
+
+
+def get_host_limiter():
+    """Process-wide limiter sized by SCRAPER_MAX_CONCURRENCY_PER_HOST"""
+    global _host_limiter
+    with _host_limiter_lock:
+        if _host_limiter is None:
+            _host_limiter = HostConcurrencyLimiter(getattr(settings, 'SCRAPER_MAX_CONCURRENCY_PER_HOST', 4))
+        return _host_limiter
+
+
+class TokenBucketRateLimiter:
+    """Per-host token bucket shared by every thread and process on the machine
+
+    Bucket state lives in a small SQLite file, so gunicorn workers and
+    run_scraper_worker processes draw from the same budget. Each call
+    reserves the next free slot in one short transaction and then sleeps
+    until that slot comes up, so callers never poll.
+    """
+
+    def __init__(self, path, rate=1.0, burst=1, host_rates=None):
+        self.path = str(path)
+        self.rate = rate
+        self.burst = burst
+        self.host_rates = host_rates or {}
+        self.initialized = False
+
+    def connect(self):
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        if not self.initialized:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS buckets ('
+                'host TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+            )
+            self.initialized = True
+        return connection
+
+    def rate_for(self, host):
+        return self.host_rates.get(host, self.rate)
+
+    def reserve(self, host):
+        """Take one token for host; returns seconds to wait before using it"""
+        rate = self.rate_for(host)
+        if not rate or rate <= 0:
+            return 0.0
+
+        connection = self.connect()
+        try:
+            # IMMEDIATE takes the write lock up front so two processes can't
+            # both read the same token count
+            connection.execute('BEGIN IMMEDIATE')
+            now = time.time()
+            row = connection.execute(
+                'SELECT tokens, updated FROM buckets WHERE host = ?', (host,)
+            ).fetchone()
+            tokens, updated = row if row else (self.burst, now)
+
+            # Refill, then spend one token; a negative balance is a queue of
+            # callers that already reserved future slots
+            tokens = min(self.burst, tokens + (now - updated) * rate) - 1
+            connection.execute(
+                'INSERT OR REPLACE INTO buckets (host, tokens, updated) VALUES (?, ?, ?)',
+                (host, tokens, now),
+            )
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        finally:
+            connection.close()
+
+        return -tokens / rate if tokens < 0 else 0.0
+
+    def wait(self, host):
+        """Block until a request to host is allowed"""
+        delay = self.reserve(host)
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    async def wait_async(self, host):
+        """Like wait(), without blocking the event loop (the reservation runs on a worker thread)"""
+        delay = await asyncio.to_thread(self.reserve, host)
+        if delay:
+            await asyncio.sleep(delay)
+        return delay
+
+
+_rate_limiter = None
+
+
+def get_rate_limiter():
+    """Process-wide rate limiter configured from settings"""
+    global _rate_limiter
+    with _host_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = TokenBucketRateLimiter(
+                getattr(settings, 'SCRAPER_RATE_LIMIT_DB', 'ratelimit.sqlite3'),
+                rate=getattr(settings, 'SCRAPER_REQUESTS_PER_SECOND', 1.0),
+                burst=getattr(settings, 'SCRAPER_RATE_LIMIT_BURST', 2),
+                host_rates=getattr(settings, 'SCRAPER_HOST_REQUESTS_PER_SECOND', {}),
+            )
+        return _rate_limiter
@@ -9,9 +9,18 @@ urlpatterns = [
     path('sessions/', views.sessions_list, name='sessions_list'),
     path('session/<str:session_id>/', views.session_detail, name='session_detail'),
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('search/', views.search, name='search'),
     
     # API endpoints
     path('api/start-scraping/', views.api_start_scraping, name='api_start_scraping'),
     path('api/session/<str:session_id>/status/', views.api_session_status, name='api_session_status'),
     path('api/session/<str:session_id>/data/', views.api_session_data, name='api_session_data'),
+    path('api/session/<str:session_id>/fragments/<str:section>/', views.api_session_fragment,
+         name='api_session_fragment'),
+    path('api/events/', views.api_session_events, name='api_session_events'),
+    path('api/sessions/', views.api_sessions, name='api_sessions'),
+    path('api/records/', views.api_records, name='api_records'),
+    path('api/search/', views.api_search, name='api_search'),
+    path('api/records/export/', views.api_export_records, name='api_export_records'),
+    path('api/changes/', views.api_changes, name='api_changes'),
 ]
@@ -1,28 +1,57 @@
 from django.shortcuts import render, redirect
-from django.http import JsonResponse
+from django.http import HttpResponse, HttpResponseNotAllowed, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.contrib import messages
-from django.core.paginator import Paginator
-from django.db.models import Q
 import json
 import logging
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
 
-from .models import ScrapingSession, CourtRecord
-from .scraper_service import SCCourtsScraperService
+from .models import ScrapingSession, CourtRecord, SessionStats
+from .changes import MAX_FEED_LIMIT, DEFAULT_FEED_LIMIT, aread_changes, change_summary
+from .counties import DEFAULT_COUNTY, validate_county
+from .events import get_event_broker, session_channel, session_event_stream
+from .exports import EXPORT_FORMATS, astream_chunks, export_queryset, stream_export
+from .fragments import (DEFAULT_FRAGMENT_LIMIT, DEFAULT_PREVIEW_CHARS, MAX_FRAGMENT_LIMIT, MAX_PREVIEW_CHARS,
+                        read_html_preview, read_section, summary_fields)
+from .job_queue import enqueue_scraping
+from .payloads import aget_payload, etag_for, etag_matches, negotiate_encoding, payload_body
+from .pagination import apaginate, page_size_from, paginate
+from .search import filter_sessions, search_records, search_sessions
 
 logger = logging.getLogger(__name__)
 
+def async_api_view(methods):
+    """csrf_exempt + require_http_methods for async views
+    
+    Django 4.2's decorators wrap views in sync functions, which would hide
+    that the view is a coroutine; under ASGI the view then runs on the event
+    loop instead of a worker thread.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            if request.method not in methods:
+                return HttpResponseNotAllowed(methods)
+            return await view(request, *args, **kwargs)
+        inner.csrf_exempt = True
+        return inner
+    return decorator
+
 def home(request):
     """Home page with scraping interface"""
     try:
         # Get recent sessions
-        recent_sessions = ScrapingSession.objects.all()[:5]
+        recent_sessions = ScrapingSession.objects.for_listing()[:5]
+        stats = SessionStats.totals()
         
         context = {
             'recent_sessions': recent_sessions,
-            'total_sessions': ScrapingSession.objects.count(),
-            'successful_sessions': ScrapingSession.objects.filter(status='success').count(),
+            'total_sessions': stats.sessions,
+            'successful_sessions': stats.success,
         }
     except Exception as e:
         # Handle database not ready
@@ -34,67 +63,75 @@ def home(request):
     
     return render(request, 'scraper/home.html', context)
 
+def requested_county(request):
+    """County slug from a form field or JSON body, defaulting to DEFAULT_COUNTY"""
+    county = request.POST.get('county')
+    if not county and request.body and request.content_type == 'application/json':
+        try:
+            county = json.loads(request.body).get('county')
+        except (ValueError, AttributeError):
+            county = None
+    return validate_county(county or DEFAULT_COUNTY)
+
 def start_scraping(request):
     """Start a new scraping session"""
     if request.method == 'POST':
         try:
-            scraper_service = SCCourtsScraperService()
-            session, success = scraper_service.run_scraping()
-            
-            if success:
-                messages.success(request, f'Scraping completed successfully! Session ID: {session.session_id}')
-                return redirect('session_detail', session_id=session.session_id)
-            else:
-                messages.error(request, f'Scraping failed: {session.error_message}')
-                return redirect('session_detail', session_id=session.session_id)
+            session = enqueue_scraping(requested_county(request))
+            messages.success(request, f'Scraping queued! Session ID: {session.session_id}')
+            return redirect('scraper:session_detail', session_id=session.session_id)
                 
         except Exception as e:
             logger.error(f"Error starting scraping: {e}")
             messages.error(request, f'Error starting scraping: {str(e)}')
-            return redirect('home')
+            return redirect('scraper:home')
     
-    return redirect('home')
+    return redirect('scraper:home')
 
 def session_detail(request, session_id):
-    """View details of a specific scraping session"""
+    """View details of a specific scraping session
+    
+    Renders the summary only: parsed_data and the page HTML stay in the
+    database, and the page fetches each section from api_session_fragment.
+    """
     try:
-        session = ScrapingSession.objects.get(session_id=session_id)
-        records = session.records.all()
+        session = (ScrapingSession.objects
+                   .defer('parsed_data')
+                   .select_related('html_blob')
+                   .defer('html_blob__data')
+                   .annotate(**summary_fields())
+                   .get(session_id=session_id))
         
         context = {
             'session': session,
-            'records': records,
         }
         
         return render(request, 'scraper/session_detail.html', context)
         
     except ScrapingSession.DoesNotExist:
         messages.error(request, 'Session not found')
-        return redirect('home')
+        return redirect('scraper:home')
 
 def sessions_list(request):
     """List all scraping sessions"""
     try:
-        sessions = ScrapingSession.objects.all()
+        sessions = ScrapingSession.objects.for_listing()
         
         # Search functionality
         search = request.GET.get('search', '')
         if search:
-            sessions = sessions.filter(
-                Q(session_id__icontains=search) |
-                Q(status__icontains=search) |
-                Q(error_message__icontains=search)
-            )
+            sessions = filter_sessions(sessions, search)
         
         # Status filter
         status_filter = request.GET.get('status', '')
         if status_filter:
             sessions = sessions.filter(status=status_filter)
         
-        # Pagination
-        paginator = Paginator(sessions, 20)
-        page_number = request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
+        # Keyset pagination (no COUNT / OFFSET); a bad cursor restarts at the top
+        try:
+            page_obj = paginate(sessions, request.GET.get('cursor'))
+        except ValueError:
+            page_obj = paginate(sessions)
         
         context = {
             'page_obj': page_obj,
@@ -113,31 +150,39 @@ def sessions_list(request):
     
     return render(request, 'scraper/sessions_list.html', context)
 
-@csrf_exempt
-@require_http_methods(["POST"])
-def api_start_scraping(request):
+def ensure_tables():
+    """Check if database tables exist, if not create them"""
+    from django.db import connection
+    from django.core.management import call_command
+    
+    # Check if tables exist (works on every database profile)
+    if ScrapingSession._meta.db_table not in connection.introspection.table_names():
+        # Tables don't exist, run migrations
+        call_command('migrate')
+
+@async_api_view(["POST"])
+async def api_start_scraping(request):
     """API endpoint to start scraping"""
     try:
-        # Check if database tables exist, if not create them
-        from django.db import connection
-        from django.core.management import call_command
+        await sync_to_async(ensure_tables)()
         
-        # Check if tables exist
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='scraper_scrapingsession';")
-            if not cursor.fetchone():
-                # Tables don't exist, run migrations
-                call_command('migrate')
+        try:
+            county = requested_county(request)
+        except ValueError as e:
+            return JsonResponse({
+                'success': False,
+                'error': str(e)
+            }, status=400)
         
-        scraper_service = SCCourtsScraperService()
-        session, success = scraper_service.run_scraping()
+        session = await sync_to_async(enqueue_scraping)(county)
         
         return JsonResponse({
-            'success': success,
+            'success': True,
             'session_id': session.session_id,
+            'county': session.county,
             'status': session.status,
-            'message': 'Scraping started' if success else session.error_message
-        })
+            'message': 'Scraping queued'
+        }, status=202)
         
     except Exception as e:
         logger.error(f"API scraping error: {e}")
@@ -146,76 +191,347 @@ def api_start_scraping(request):
             'error': str(e)
         }, status=500)
 
-@csrf_exempt
-@require_http_methods(["GET"])
-def api_session_status(request, session_id):
+# Sessions one events connection may follow
+MAX_EVENT_SESSIONS = 50
+
+@async_api_view(["GET"])
+async def api_session_events(request):
+    """Server-sent events with status changes for one or more sessions
+    
+    GET /api/events/?sessions=<id>,<id>,... streams each session's current
+    status, then every change, and ends once all of them have finished.
+    Needs an ASGI server; clients fall back to polling otherwise.
+    """
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI the stream would tie up a worker until every session ends
+        return JsonResponse({
+            'error': 'Event streams need the ASGI server (sc_courts_app.asgi)'
+        }, status=501)
+    
+    session_ids = [session_id for session_id in request.GET.get('sessions', '').split(',') if session_id]
+    if not session_ids:
+        return JsonResponse({
+            'error': 'Missing sessions parameter'
+        }, status=400)
+    session_ids = list(dict.fromkeys(session_ids))[:MAX_EVENT_SESSIONS]
+    
+    try:
+        last_event_id = int(request.headers['Last-Event-ID'])
+    except (KeyError, ValueError):
+        last_event_id = None
+    
+    # Subscribe before reading the current status so no change is missed in between
+    subscription = get_event_broker().subscribe(
+        [session_channel(session_id) for session_id in session_ids],
+        last_event_id=last_event_id,
+    )
+    rows = [
+        row async for row in ScrapingSession.objects
+        .filter(session_id__in=session_ids)
+        .values('session_id', 'county', 'status', 'error_message', 'updated_at')
+    ]
+    snapshot = [dict(row, updated_at=row['updated_at'].isoformat()) for row in rows]
+    
+    response = StreamingHttpResponse(
+        session_event_stream(subscription, session_ids, snapshot),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+def session_summary(session):
+    """JSON fields for a session (everything but the parsed data)"""
+    return {
+        'session_id': session.session_id,
+        'county': session.county,
+        'status': session.status,
+        'created_at': session.created_at.isoformat(),
+        'updated_at': session.updated_at.isoformat(),
+        'ip_address': session.ip_address,
+        'forms_count': session.forms_count,
+        'inputs_count': session.inputs_count,
+        'selects_count': session.selects_count,
+        'links_count': session.links_count,
+        'scripts_count': session.scripts_count,
+        'error_message': session.error_message,
+    }
+
+def record_summary(record):
+    return {
+        'id': record.id,
+        # None once the session that last saw the record is deleted
+        'session_id': record.session.session_id if record.session else None,
+        'county': record.county,
+        'case_number': record.case_number,
+        'party_name': record.party_name,
+        'filing_date': record.filing_date.isoformat() if record.filing_date else None,
+        'status': record.status,
+        'record_type': record.record_type,
+        'created_at': record.created_at.isoformat(),
+        'removed_at': record.removed_at.isoformat() if record.removed_at else None,
+    }
+
+@async_api_view(["GET"])
+async def api_session_status(request, session_id):
     """API endpoint to get session status"""
     try:
-        session = ScrapingSession.objects.get(session_id=session_id)
+        session = await ScrapingSession.objects.aget(session_id=session_id)
         
-        return JsonResponse({
-            'session_id': session.session_id,
-            'status': session.status,
-            'created_at': session.created_at.isoformat(),
-            'updated_at': session.updated_at.isoformat(),
-            'ip_address': session.ip_address,
-            'forms_count': session.forms_count,
-            'inputs_count': session.inputs_count,
-            'selects_count': session.selects_count,
-            'links_count': session.links_count,
-            'scripts_count': session.scripts_count,
-            'error_message': session.error_message,
-        })
+        return JsonResponse(session_summary(session))
         
     except ScrapingSession.DoesNotExist:
         return JsonResponse({
             'error': 'Session not found'
         }, status=404)
 
-@csrf_exempt
-@require_http_methods(["GET"])
-def api_session_data(request, session_id):
-    """API endpoint to get session data"""
+@async_api_view(["GET"])
+async def api_session_data(request, session_id):
+    """API endpoint to get session data
+    
+    The serialized (and compressed) payload is cached, carries a strong ETag
+    and is answered with 304 when the client already has it.
+    """
     try:
-        session = ScrapingSession.objects.get(session_id=session_id)
+        # Just enough to find the cached payload; parsed_data loads only on a miss
+        session = await ScrapingSession.objects.only('session_id', 'status', 'updated_at').aget(session_id=session_id)
         
         if session.status != 'success':
             return JsonResponse({
                 'error': 'Session not successful'
             }, status=400)
         
-        return JsonResponse({
-            'session_id': session.session_id,
-            'status': session.status,
-            'parsed_data': session.parsed_data,
-            'forms_count': session.forms_count,
-            'inputs_count': session.inputs_count,
-            'selects_count': session.selects_count,
-            'links_count': session.links_count,
-            'scripts_count': session.scripts_count,
-        })
+        payload = await aget_payload(session, lambda: ScrapingSession.objects.aget(pk=session.pk))
+        encoding = negotiate_encoding(request.headers.get('Accept-Encoding'), payload['encodings'])
+        
+        if etag_matches(request.headers.get('If-None-Match'), payload['digest']):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(payload_body(payload, encoding), content_type='application/json')
+            if encoding != 'identity':
+                response['Content-Encoding'] = encoding
+        
+        response['ETag'] = etag_for(payload['digest'], encoding)
+        response['Cache-Control'] = 'no-cache'
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
         
     except ScrapingSession.DoesNotExist:
         return JsonResponse({
             'error': 'Session not found'
         }, status=404)
 
+def int_param(request, name, default, low, high):
+    try:
+        return min(max(int(request.GET.get(name, default)), low), high)
+    except ValueError:
+        return default
+
+@async_api_view(["GET"])
+async def api_session_fragment(request, session_id, section):
+    """One section of the session detail page as JSON
+    
+    Sections forms, inputs, selects and links are paged with offset and
+    limit; raw-html returns the first `chars` characters of the page.
+    """
+    try:
+        if section == 'raw-html':
+            chars = int_param(request, 'chars', DEFAULT_PREVIEW_CHARS, 1, MAX_PREVIEW_CHARS)
+            fragment = await sync_to_async(read_html_preview)(session_id, chars)
+        else:
+            fragment = await read_section(
+                session_id, section,
+                offset=int_param(request, 'offset', 0, 0, 10 ** 9),
+                limit=int_param(request, 'limit', DEFAULT_FRAGMENT_LIMIT, 1, MAX_FRAGMENT_LIMIT),
+            )
+    except ValueError as e:
+        return JsonResponse({
+            'error': str(e)
+        }, status=400)
+    
+    if fragment is None:
+        return JsonResponse({
+            'error': 'Session not found'
+        }, status=404)
+    return JsonResponse(fragment)
+
+async def keyset_response(request, queryset, serialize):
+    """JSON page of a queryset: results plus opaque next/prev cursors"""
+    try:
+        page = await apaginate(
+            queryset,
+            cursor=request.GET.get('cursor'),
+            page_size=page_size_from(request.GET.get('limit')),
+            with_total=request.GET.get('include_total', '').lower() in ('1', 'true', 'yes'),
+        )
+    except ValueError as e:
+        return JsonResponse({
+            'error': str(e)
+        }, status=400)
+    
+    response = {
+        'results': [serialize(item) for item in page],
+        'next_cursor': page.next_cursor,
+        'prev_cursor': page.previous_cursor,
+    }
+    if page.total is not None:
+        response['count'] = page.total
+    return JsonResponse(response)
+
+@async_api_view(["GET"])
+async def api_sessions(request):
+    """API endpoint to page through sessions (filters: status, county)"""
+    sessions = ScrapingSession.objects.for_listing()
+    if request.GET.get('status'):
+        sessions = sessions.filter(status=request.GET['status'])
+    if request.GET.get('county'):
+        sessions = sessions.filter(county=request.GET['county'])
+    return await keyset_response(request, sessions, session_summary)
+
+@async_api_view(["GET"])
+async def api_records(request):
+    """API endpoint to page through court records (filters: session_id, county, status, include_removed)"""
+    records = CourtRecord.objects.select_related('session').only(
+        'id', 'county', 'case_number', 'party_name', 'filing_date', 'status', 'record_type', 'created_at',
+        'removed_at', 'session__session_id',
+    )
+    if request.GET.get('include_removed', '').lower() not in ('1', 'true', 'yes'):
+        records = records.filter(removed_at__isnull=True)
+    if request.GET.get('session_id'):
+        records = records.filter(session__session_id=request.GET['session_id'])
+    if request.GET.get('county'):
+        records = records.filter(county=request.GET['county'])
+    if request.GET.get('status'):
+        records = records.filter(status__iexact=request.GET['status'])
+    return await keyset_response(request, records, record_summary)
+
+@async_api_view(["GET"])
+async def api_changes(request):
+    """API endpoint for the record change feed (added / removed / modified), oldest first
+    
+    Query parameters: cursor (from the previous page), since (date or ISO
+    datetime, used when there is no cursor), county, change_type and limit.
+    """
+    try:
+        limit = min(max(int(request.GET.get('limit', DEFAULT_FEED_LIMIT)), 1), MAX_FEED_LIMIT)
+    except ValueError:
+        limit = DEFAULT_FEED_LIMIT
+    
+    try:
+        changes, cursor, more = await aread_changes(
+            cursor=request.GET.get('cursor'),
+            since=request.GET.get('since'),
+            limit=limit,
+            county=request.GET.get('county'),
+            change_type=request.GET.get('change_type'),
+        )
+    except ValueError as e:
+        return JsonResponse({
+            'error': str(e)
+        }, status=400)
+    
+    return JsonResponse({
+        'results': [change_summary(change) for change in changes],
+        'next_cursor': cursor,
+        'has_more': more,
+    })
+
+def search(request):
+    """Ranked search over parties, case numbers and session errors"""
+    query = request.GET.get('q', '').strip()
+    context = {
+        'query': query,
+        'records': search_records(query) if query else [],
+        'sessions': search_sessions(query, limit=20) if query else [],
+    }
+    return render(request, 'scraper/search.html', context)
+
+@async_api_view(["GET"])
+async def api_search(request):
+    """API endpoint for ranked full-text search (type: records, sessions or all)"""
+    query = request.GET.get('q', '').strip()
+    search_type = request.GET.get('type', 'all')
+    if not query:
+        return JsonResponse({
+            'error': 'Missing search query (q)'
+        }, status=400)
+    if search_type not in ('records', 'sessions', 'all'):
+        return JsonResponse({
+            'error': f'Unknown search type: {search_type}'
+        }, status=400)
+    
+    try:
+        limit = min(max(int(request.GET.get('limit', 50)), 1), 500)
+    except ValueError:
+        limit = 50
+    
+    response = {'query': query}
+    if search_type in ('records', 'all'):
+        response['records'] = [
+            dict(record_summary(record), score=score)
+            for record, score in await sync_to_async(search_records)(query, limit)
+        ]
+    if search_type in ('sessions', 'all'):
+        response['sessions'] = [{
+            'session_id': session.session_id,
+            'county': session.county,
+            'status': session.status,
+            'created_at': session.created_at.isoformat(),
+            'error_message': session.error_message,
+            'score': score,
+        } for session, score in await sync_to_async(search_sessions)(query, limit)]
+    
+    return JsonResponse(response)
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def api_export_records(request):
+    """Stream court records as CSV, NDJSON or Parquet
+    
+    Query parameters: format, county, date_from, date_to (filing date,
+    YYYY-MM-DD), status and include_removed. The export is a sync iterator
+    over a server-side cursor; under ASGI it is wrapped in an async
+    iterator, since Django would otherwise read it to the end before
+    sending the first byte.
+    """
+    export_format = request.GET.get('format', 'csv')
+    try:
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {export_format}")
+        records = export_queryset(
+            county=request.GET.get('county'),
+            date_from=request.GET.get('date_from'),
+            date_to=request.GET.get('date_to'),
+            status=request.GET.get('status'),
+            include_removed=request.GET.get('include_removed', '').lower() in ('1', 'true', 'yes'),
+        )
+        chunks = stream_export(records, export_format)
+        if isinstance(request, ASGIRequest):
+            chunks = astream_chunks(chunks)
+    except ValueError as e:
+        return JsonResponse({
+            'error': str(e)
+        }, status=400)
+    
+    content_type, extension = EXPORT_FORMATS[export_format]
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="court_records.{extension}"'
+    return response
+
 def dashboard(request):
     """Dashboard with statistics"""
     try:
-        total_sessions = ScrapingSession.objects.count()
-        successful_sessions = ScrapingSession.objects.filter(status='success').count()
-        failed_sessions = ScrapingSession.objects.filter(status='failed').count()
-        blocked_sessions = ScrapingSession.objects.filter(status='blocked').count()
+        # Counters are maintained as sessions change status (see SessionStats)
+        stats = SessionStats.totals()
         
         # Recent sessions
-        recent_sessions = ScrapingSession.objects.all()[:10]
+        recent_sessions = ScrapingSession.objects.for_listing()[:10]
         
         context = {
-            'total_sessions': total_sessions,
-            'successful_sessions': successful_sessions,
-            'failed_sessions': failed_sessions,
-            'blocked_sessions': blocked_sessions,
+            'total_sessions': stats.sessions,
+            'successful_sessions': stats.success,
+            'failed_sessions': stats.failed,
+            'blocked_sessions': stats.blocked,
             'recent_sessions': recent_sessions,
         }
     except Exception as e: